@@ -0,0 +1,424 @@
+import argparse
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'baseline.json')
+DEFAULT_TOLERANCE = 0.25  # 25% slower (or bigger) than the baseline is a regression
+
+KB = 1024
+MB = 1024 * KB
+SIZES = [1 * KB, 100 * KB, 1 * MB, 10 * MB, 50 * MB]
+QUICK_SIZES = [1 * KB, 100 * KB, 1 * MB]
+
+WORDS = ("the quick brown fox jumps over lazy dog teleprompter script camera "
+         "audience welcome today video subscribe channel story moment").split()
+
+BENCHMARKS = {}
+
+
+def benchmark(name, max_size=None):
+    def register(function):
+        BENCHMARKS[name] = (function, max_size)
+        return function
+    return register
+
+
+def size_label(size):
+    return f"{size // MB}MB" if size >= MB else f"{size // KB}KB"
+
+
+def generate_script(size, seed=0):
+    # Deterministic paragraphs of pseudo-words with blank lines between them
+    rng = random.Random(seed)
+    lines = []
+    length = 0
+    while length < size:
+        if rng.random() < 0.1:
+            line = ''
+        else:
+            line = ' '.join(rng.choice(WORDS) for _ in range(rng.randint(4, 16)))
+        lines.append(line)
+        length += len(line) + 1
+    return '\n'.join(lines)[:size]
+
+
+def percentile(samples, fraction):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+def timing_summary(samples):
+    return {
+        'mean_ms': statistics.fmean(samples) * 1000,
+        'p95_ms': percentile(samples, 0.95) * 1000,
+        'max_ms': max(samples) * 1000,
+    }
+
+
+def peak_rss_mb():
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return peak / MB if sys.platform == 'darwin' else peak / KB
+
+
+def wait_until(app, predicate, timeout=600):
+    deadline = time.perf_counter() + timeout
+    while not predicate():
+        if time.perf_counter() > deadline:
+            raise TimeoutError("benchmark step did not finish in time")
+        app.processEvents()
+        time.sleep(0.001)
+
+
+def make_app():
+    from PyQt6.QtCore import QStandardPaths
+    from PyQt6.QtWidgets import QApplication
+    # Settings, recovery journal and caches go to Qt's test locations, below
+    # the temporary HOME run_case_subprocess gives every case
+    QStandardPaths.setTestModeEnabled(True)
+    return QApplication.instance() or QApplication(sys.argv[:1])
+
+
+def isolated_environment(home):
+    # HOME and the XDG folders of a case point into home, so nothing it
+    # starts reads or writes the user's own settings and caches
+    environment = dict(os.environ)
+    environment['HOME'] = home
+    environment['USERPROFILE'] = home
+    for variable, folder in (('XDG_CONFIG_HOME', '.config'), ('XDG_CACHE_HOME', '.cache'),
+                             ('XDG_DATA_HOME', '.local/share'), ('XDG_STATE_HOME', '.local/state')):
+        environment[variable] = os.path.join(home, folder)
+    return environment
+
+
+def cpu_model():
+    try:
+        with open('/proc/cpuinfo', encoding='utf-8') as file:
+            for line in file:
+                if line.startswith('model name'):
+                    return line.split(':', 1)[1].strip()
+    except OSError:
+        pass
+    return platform.processor() or platform.machine()
+
+
+class FrameClock:
+    # Fixed 60 Hz clock so scroll benchmarks move the same distance every run
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+    def tick(self):
+        self.now += 1 / 60
+
+
+@benchmark('import')
+def bench_import(size):
+    app = make_app()
+    from teleprompter_control import TeleprompterControl
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'script.txt')
+        with open(path, 'w', encoding='utf-8') as file:
+            file.write(generate_script(size))
+
+        control = TeleprompterControl()
+        control.show()
+        app.processEvents()
+        start = time.perf_counter()
+        control.start_import(path)
+        wait_until(app, lambda: control.script_loader is None)
+        elapsed = time.perf_counter() - start
+        blocks = control.text_edit.blockCount()
+        control.close()
+    return {'seconds': elapsed, 'blocks': blocks}
+
+
+@benchmark('update_text')
+def bench_update_text(size):
+    app = make_app()
+    from PyQt6.QtGui import QTextCursor
+    from teleprompter_control import TeleprompterControl
+    from teleprompter_display import TeleprompterDisplay
+
+    from script_cache import ScriptCache
+
+    control = TeleprompterControl()
+    control.text_edit.setPlainText(generate_script(size))
+    display = TeleprompterDisplay(control.current_settings)
+    cache_directory = tempfile.TemporaryDirectory()
+    display.script_cache = ScriptCache(cache_directory.name)  # Cold cache: the same numbers on every run
+    display.show()
+    app.processEvents()
+
+    start = time.perf_counter()
+    display.sync_document(control.text_edit.document())
+    app.processEvents()
+    initial_sync = time.perf_counter() - start
+
+    # A one-word correction in the middle of the script, as during a live take
+    samples = []
+    document = control.text_edit.document()
+    for _ in range(5):
+        cursor = QTextCursor(document.findBlockByNumber(document.blockCount() // 2))
+        cursor.insertText('fix ')
+        start = time.perf_counter()
+        display.sync_document(document)
+        app.processEvents()
+        samples.append(time.perf_counter() - start)
+
+    # Full reload, as in the 'full' sync mode: the old path through one
+    # Python string of the whole script, then the editor's document copied
+    # chunk by chunk. Each into a cold cache of its own.
+    display.script_cache = ScriptCache(tempfile.mkdtemp(dir=cache_directory.name))
+    start = time.perf_counter()
+    display.update_text(document.toPlainText())
+    app.processEvents()
+    string_reload = time.perf_counter() - start
+
+    display.close()  # Waits for the cache writer
+    display.script_cache = ScriptCache(tempfile.mkdtemp(dir=cache_directory.name))
+    start = time.perf_counter()
+    display.load_document(document)
+    app.processEvents()
+    full = time.perf_counter() - start
+
+    # The same script again: large ones now come from the script cache
+    display.close()
+    start = time.perf_counter()
+    display.load_document(document)
+    app.processEvents()
+    cached = time.perf_counter() - start
+    display.complete_relayout()
+    display.close()
+    handover = handover_peak_mb(document)
+    cache_directory.cleanup()
+    control.is_modified = False
+    control.close()  # Discards the recovery journal, or the next run offers to restore it
+    return {'full_seconds': full, 'string_reload_seconds': string_reload, 'cached_seconds': cached,
+            'initial_sync_seconds': initial_sync, 'small_edit': timing_summary(samples),
+            'handover_peak_mb': handover}
+
+
+def handover_peak_mb(source):
+    # Peak Python memory of handing the script to a display document: the
+    # whole-text string (plus its cache key) against copy_document
+    import tracemalloc
+    from PyQt6.QtGui import QTextDocument
+    from document_sync import copy_document
+    from script_cache import ScriptHasher, script_key
+
+    peaks = {}
+    tracemalloc.start()
+    target = QTextDocument()
+    text = source.toPlainText()
+    target.setPlainText(text)
+    script_key(text)
+    del text
+    peaks['string'] = tracemalloc.get_traced_memory()[1] / MB
+    tracemalloc.reset_peak()
+    target = QTextDocument()
+    hasher = ScriptHasher()
+    copy_document(source, target, hasher.update)
+    hasher.key()
+    peaks['document'] = tracemalloc.get_traced_memory()[1] / MB
+    tracemalloc.stop()
+    return peaks
+
+
+@benchmark('scroll', max_size=10 * MB)
+def bench_scroll(size, frames=180):
+    app = make_app()
+    from teleprompter_display import TeleprompterDisplay
+    from settings_store import RENDER_MODE_TILED, RENDER_MODE_LIVE
+    from PyQt6.QtGui import QFont
+
+    text = generate_script(size)
+    results = {}
+    for render_mode in (RENDER_MODE_TILED, RENDER_MODE_LIVE):
+        for font_size in (48, 96, 200):
+            for speed in (50, 200):
+                display = TeleprompterDisplay({'font': QFont("Arial"), 'font_size': font_size,
+                                               'speed': speed, 'render_mode': render_mode})
+                display.resize(1280, 720)
+                display.show()
+                display.update_text(text)
+                display.complete_relayout()  # A script cache hit lays out in slices; measure frames only
+                app.processEvents()
+
+                clock = FrameClock()
+                display.scroll_engine.clock = clock
+                display.is_paused = False
+                display.sync_engine_from_view()
+                display.scroll_engine.start()
+                view = display.scroll_view()
+                samples = []
+                for _ in range(frames):
+                    clock.tick()
+                    start = time.perf_counter()
+                    display.scroll_text()
+                    view.repaint()
+                    app.processEvents()  # Tile prefetch runs in idle slots and is part of the cost
+                    samples.append(time.perf_counter() - start)
+                display.is_paused = True
+                display.close()
+                results[f"{render_mode}/{font_size}pt/{speed}px_s"] = timing_summary(samples)
+    return results
+
+
+@benchmark('keystroke', max_size=10 * MB)
+def bench_keystroke(size, keys=200):
+    app = make_app()
+    from PyQt6.QtCore import Qt
+    from PyQt6.QtTest import QTest
+    from teleprompter_control import TeleprompterControl
+
+    control = TeleprompterControl()
+    control.show()
+    control.text_edit.setPlainText(generate_script(size))
+    editor = control.text_edit
+    cursor = editor.textCursor()
+    cursor.setPosition(editor.document().characterCount() // 2)
+    editor.setTextCursor(cursor)
+    app.processEvents()
+
+    samples = []
+    for _ in range(keys):
+        start = time.perf_counter()
+        QTest.keyClick(editor, Qt.Key.Key_A)
+        editor.viewport().repaint()
+        editor.line_number_area.repaint()
+        samples.append(time.perf_counter() - start)
+    control.is_modified = False
+    control.close()
+    return timing_summary(samples)
+
+
+def run_case(name, size):
+    function, _ = BENCHMARKS[name]
+    result = function(size)
+    return {'metrics': result, 'peak_rss_mb': peak_rss_mb()}
+
+
+def run_case_subprocess(name, size):
+    # Every case runs in its own interpreter, so peak memory is per case and a
+    # 50 MB case cannot slow down the ones after it.
+    with tempfile.TemporaryDirectory() as home:
+        output = subprocess.run([sys.executable, os.path.abspath(__file__), '--case', name, '--size', str(size)],
+                                capture_output=True, text=True, check=True, env=isolated_environment(home))
+    return json.loads(output.stdout.strip().splitlines()[-1])
+
+
+def flatten(metrics, prefix=''):
+    flat = {}
+    for key, value in metrics.items():
+        name = f"{prefix}/{key}" if prefix else key
+        if isinstance(value, dict):
+            flat.update(flatten(value, name))
+        elif isinstance(value, (int, float)) and value is not None:
+            flat[name] = value
+    return flat
+
+
+def compare(results, baseline, tolerance):
+    # Every metric is "lower is better" (time, memory); counts are skipped
+    regressions = []
+    current = flatten(results['results'])
+    previous = flatten(baseline['results'])
+    for key, value in sorted(current.items()):
+        if key.endswith('/blocks') or key not in previous or not previous[key]:
+            continue
+        ratio = value / previous[key]
+        if ratio > 1 + tolerance:
+            regressions.append((key, previous[key], value, ratio))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Headless performance benchmarks for the teleprompter")
+    parser.add_argument('--quick', action='store_true', help="only run scripts up to 1 MB")
+    parser.add_argument('--only', action='append', choices=sorted(BENCHMARKS), help="run only this benchmark")
+    parser.add_argument('--output', help="write the JSON results to this file (default: stdout)")
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE, help="baseline JSON to compare against")
+    parser.add_argument('--save-baseline', action='store_true', help="store these results as the new baseline")
+    parser.add_argument('--tolerance', type=float, default=DEFAULT_TOLERANCE)
+    parser.add_argument('--notes', help="free-form notes on the machine and setup, stored with the results")
+    parser.add_argument('--case', help=argparse.SUPPRESS)
+    parser.add_argument('--size', type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.case:
+        print(json.dumps(run_case(args.case, args.size)))
+        return 0
+
+    from PyQt6.QtCore import PYQT_VERSION_STR, QT_VERSION_STR
+    results = {
+        'meta': {
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'cpu': cpu_model(),
+            'cpu_count': os.cpu_count(),
+            'qt': QT_VERSION_STR,
+            'pyqt': PYQT_VERSION_STR,
+            'qt_platform': os.environ['QT_QPA_PLATFORM'],
+            'sizes': 'quick' if args.quick else 'full',
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'notes': args.notes,
+        },
+        'results': {},
+    }
+    for name in args.only or sorted(BENCHMARKS):
+        _, max_size = BENCHMARKS[name]
+        for size in QUICK_SIZES if args.quick else SIZES:
+            if max_size and size > max_size:
+                continue
+            key = f"{name}/{size_label(size)}"
+            print(f"running {key}...", file=sys.stderr)
+            results['results'][key] = run_case_subprocess(name, size)
+
+    report = json.dumps(results, indent=2)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as file:
+            file.write(report)
+    else:
+        print(report)
+
+    if args.save_baseline:
+        with open(args.baseline, 'w', encoding='utf-8') as file:
+            file.write(report)
+        return 0
+
+    if os.path.exists(args.baseline):
+        with open(args.baseline, encoding='utf-8') as file:
+            baseline = json.load(file)
+        for key in ('cpu', 'cpu_count', 'qt', 'qt_platform'):
+            if baseline.get('meta', {}).get(key) != results['meta'][key]:
+                print(f"note: baseline {key} is {baseline.get('meta', {}).get(key)!r}, "
+                      f"this run {results['meta'][key]!r}; timings are not comparable", file=sys.stderr)
+        regressions = compare(results, baseline, args.tolerance)
+        for key, before, after, ratio in regressions:
+            print(f"REGRESSION {key}: {before:.3f} -> {after:.3f} ({ratio:.2f}x)", file=sys.stderr)
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
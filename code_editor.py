@@ -1,6 +1,12 @@
 from PyQt6.QtWidgets import QWidget, QPlainTextEdit, QTextEdit
-from PyQt6.QtCore import QRect, QSize, Qt
-from PyQt6.QtGui import QColor, QPainter, QTextCursor, QTextFormat, QPalette
+from PyQt6.QtCore import QRect, QRectF, QSize, QPointF, QEvent, Qt
+from PyQt6.QtGui import QColor, QPainter, QTextCursor, QTextFormat, QPalette, QStaticText, QTextCharFormat
+
+from cue_index import CueIndex
+
+LARGE_DOCUMENT_BLOCKS = 20000  # Mode dokumen besar aktif otomatis di atas jumlah baris ini
+MAX_CACHED_NUMBERS = 4096
+CUE_MARK_WIDTH = 3  # Strip di tepi kiri gutter untuk baris cue / heading
 
 class LineNumberArea(QWidget):
     def __init__(self, editor):
@@ -16,8 +22,21 @@ class LineNumberArea(QWidget):
 class CodeEditor(QPlainTextEdit):
     def __init__(self):
         super().__init__()
+        # None = otomatis berdasarkan jumlah baris, True/False = dipaksa
+        self.large_document_setting = None
+        self.large_document_mode = False
+        self.gutter_digits = 0
+        self.gutter_width = 0
+        self.number_cache = {}  # Line number string -> prepared QStaticText
+        self.highlighted_block = None  # (document, block number) of the current highlight
+        self.highlight_format = None
+
         self.line_number_area = LineNumberArea(self)
+        # Section / cue markers, diperbarui per edit (lihat CueIndex)
+        self.cue_index = CueIndex(self.document(), self)
+        self.cue_index.changed.connect(self.line_number_area.update)
         self.blockCountChanged.connect(self.update_line_number_area_width)
+        self.blockCountChanged.connect(self.update_large_document_mode)
         self.updateRequest.connect(self.update_line_number_area)
         self.cursorPositionChanged.connect(self.highlight_current_line)
         self.update_line_number_area_width(0)
@@ -29,6 +48,12 @@ class CodeEditor(QPlainTextEdit):
         self.set_editor_colors()
         self.highlight_current_line()
 
+    def setDocument(self, document, cues=None):
+        # cues: cue block numbers already known, e.g. from a preloaded script
+        self.cue_index.detach()  # The old document may be deleted by setDocument
+        super().setDocument(document)
+        self.cue_index.set_document(document, cues)
+
     def set_editor_colors(self):
         palette = self.palette()
         background_color = palette.color(QPalette.ColorRole.Base)
@@ -42,14 +67,43 @@ class CodeEditor(QPlainTextEdit):
             # Light theme
             self.setStyleSheet("background-color: white; color: black;")
             self.line_highlight_color = QColor(Qt.GlobalColor.yellow)
+        self.highlight_format = None
+
+    def set_large_document_mode(self, enabled):
+        # enabled=None kembali ke mode otomatis
+        self.large_document_setting = enabled
+        self.update_large_document_mode()
+
+    def update_large_document_mode(self, _=None):
+        if self.large_document_setting is None:
+            enabled = self.blockCount() >= LARGE_DOCUMENT_BLOCKS
+        else:
+            enabled = self.large_document_setting
+        if enabled != self.large_document_mode:
+            self.large_document_mode = enabled
+            self.number_cache.clear()
+            self.highlighted_block = None
+            self.line_number_area.update()
+
+    def changeEvent(self, event):
+        super().changeEvent(event)
+        if event.type() == QEvent.Type.FontChange:
+            # Cached widths and number layouts depend on the font
+            self.gutter_digits = 0
+            self.number_cache.clear()
+            self.update_line_number_area_width(0)
 
     def line_number_area_width(self):
         digits = len(str(self.blockCount())) + 1
-        space = 3 + self.fontMetrics().horizontalAdvance('9') * digits
-        return space
+        if digits != self.gutter_digits:
+            self.gutter_digits = digits
+            self.gutter_width = 3 + self.fontMetrics().horizontalAdvance('9') * digits
+        return self.gutter_width
 
     def update_line_number_area_width(self, _):
-        self.setViewportMargins(self.line_number_area_width(), 0, 0, 0)
+        width = self.line_number_area_width()
+        if width != self.viewportMargins().left():
+            self.setViewportMargins(width, 0, 0, 0)
 
     def update_line_number_area(self, rect, dy):
         if dy:
@@ -58,7 +112,7 @@ class CodeEditor(QPlainTextEdit):
             self.line_number_area.update(0, rect.y(), self.line_number_area.width(), rect.height())
 
         if rect.contains(self.viewport().rect()):
-            self.update_line_number_area_width(0)
+            self.update_line_number_area_width(0)  # Murah: lebar hanya dihitung ulang bila jumlah digit berubah
 
     def resizeEvent(self, event):
         super().resizeEvent(event)
@@ -66,6 +120,10 @@ class CodeEditor(QPlainTextEdit):
         self.line_number_area.setGeometry(QRect(cr.left(), cr.top(), self.line_number_area_width(), cr.height()))
 
     def line_number_area_paint_event(self, event):
+        if self.large_document_mode:
+            self.paint_visible_line_numbers(event)
+            return
+
         painter = QPainter(self.line_number_area)
         painter.fillRect(event.rect(), Qt.GlobalColor.lightGray)
 
@@ -80,6 +138,8 @@ class CodeEditor(QPlainTextEdit):
 
         while block.isValid() and top <= event.rect().bottom():
             if block.isVisible() and bottom >= event.rect().top():
+                if self.cue_index.is_cue(block_number):
+                    painter.fillRect(0, top, CUE_MARK_WIDTH, bottom - top, self.line_highlight_color)
                 number = str(block_number + 1)
                 painter.setPen(Qt.GlobalColor.black)
                 painter.drawText(0, top, self.line_number_area.width(), self.fontMetrics().height(),
@@ -90,24 +150,76 @@ class CodeEditor(QPlainTextEdit):
             bottom = top + int(self.blockBoundingRect(block).height())
             block_number += 1
 
-    def highlight_current_line(self):
-        extra_selections = []
+    def number_text(self, number):
+        static_text = self.number_cache.get(number)
+        if static_text is None:
+            if len(self.number_cache) >= MAX_CACHED_NUMBERS:
+                self.number_cache.clear()
+            static_text = QStaticText(str(number))
+            static_text.setTextFormat(Qt.TextFormat.PlainText)
+            static_text.prepare(font=self.font())
+            self.number_cache[number] = static_text
+        return static_text
+
+    def paint_visible_line_numbers(self, event):
+        # One pass over the visible blocks only: one geometry query per block,
+        # font metrics and number layouts taken from the caches.
+        painter = QPainter(self.line_number_area)
+        rect = event.rect()
+        painter.fillRect(rect, Qt.GlobalColor.lightGray)
+        painter.setFont(self.font())
+        painter.setPen(Qt.GlobalColor.black)
+        width = self.line_number_area.width()
 
-        if not self.isReadOnly():
-            selection = QTextEdit.ExtraSelection()
+        block = self.firstVisibleBlock()
+        offset = self.contentOffset()
+        top = self.blockBoundingGeometry(block).translated(offset).top()
+        while block.isValid() and top <= rect.bottom():
+            height = self.blockBoundingRect(block).height()
+            if block.isVisible() and top + height >= rect.top():
+                if self.cue_index.is_cue(block.blockNumber()):
+                    painter.fillRect(QRectF(0, top, CUE_MARK_WIDTH, height), self.line_highlight_color)
+                static_text = self.number_text(block.blockNumber() + 1)
+                painter.drawStaticText(QPointF(width - static_text.size().width(), top), static_text)
+            top += height
+            block = block.next()
+
+    def current_line_format(self):
+        if self.highlight_format is None:
+            text_format = QTextCharFormat()
 
             # Tentukan warna sorotan berdasarkan tema
             background_color = self.line_highlight_color.lighter(160)
 
             # Jika background adalah warna kuning dan tema adalah gelap, ubah teks menjadi hitam
             if self.line_highlight_color == QColor(Qt.GlobalColor.darkYellow):
-                selection.format.setForeground(Qt.GlobalColor.black)
+                text_format.setForeground(Qt.GlobalColor.black)
             else:
-                selection.format.setForeground(self.palette().color(QPalette.ColorRole.Text))
+                text_format.setForeground(self.palette().color(QPalette.ColorRole.Text))
+
+            text_format.setBackground(background_color)
+            text_format.setProperty(QTextFormat.Property.FullWidthSelection, True)
+            self.highlight_format = text_format
+        return self.highlight_format
 
-            selection.format.setBackground(background_color)
-            selection.format.setProperty(QTextFormat.FullWidthSelection, True)
-            selection.cursor = self.textCursor()
+    def highlight_current_line(self):
+        cursor = self.textCursor()
+        if self.large_document_mode and not self.isReadOnly():
+            # The extra selection cursor follows edits inside its block, so it
+            # only has to be rebuilt when the cursor moves to another block.
+            current = (self.document(), cursor.blockNumber())
+            if current == self.highlighted_block:
+                return
+            self.highlighted_block = current
+        else:
+            self.highlighted_block = None
+
+        extra_selections = []
+
+        if not self.isReadOnly():
+            selection = QTextEdit.ExtraSelection()
+            selection.format = self.current_line_format()
+            selection.cursor = cursor
             selection.cursor.clearSelection()
             extra_selections.append(selection)
 
@@ -0,0 +1,110 @@
+import re
+from bisect import bisect_left, bisect_right
+
+from PyQt6.QtCore import QObject, pyqtSignal
+
+# Section / cue markers: Markdown-style headings ("# Opening") and cue tags
+# anywhere in a line ("[CUE]", "[CUE: camera 2]", "[SECTION Q&A]")
+CUE_PATTERN = re.compile(r'^\s*#{1,6}\s+\S|\[(?:CUE|SECTION)\b[^\]]*\]', re.IGNORECASE)
+
+
+def is_cue_line(text):
+    return CUE_PATTERN.search(text) is not None
+
+
+def cue_title(text):
+    # The marker line without heading hashes, for menus and remote status
+    return text.strip().lstrip('#').strip()
+
+
+class CueIndex(QObject):
+    # Sorted block numbers of the cue lines of a QTextDocument. Kept up to
+    # date from contentsChange: only the blocks an edit touched are scanned
+    # again, and the cues below them are shifted by the change in block
+    # count. Lookups are a bisect over the list.
+
+    changed = pyqtSignal()
+
+    def __init__(self, document=None, parent=None):
+        super().__init__(parent)
+        self.document = None
+        self.blocks = []
+        self.block_count = 0
+        if document is not None:
+            self.set_document(document)
+
+    def set_document(self, document, blocks=None):
+        # blocks: cue block numbers already known for this text (script cache)
+        self.detach()
+        self.document = document
+        document.contentsChange.connect(self.update_blocks)
+        if blocks is None:
+            self.rebuild()
+        else:
+            self.blocks = list(blocks)
+            self.block_count = document.blockCount()
+            self.changed.emit()
+
+    def detach(self):
+        if self.document is not None:
+            self.document.contentsChange.disconnect(self.update_blocks)
+        self.document = None
+
+    def rebuild(self):
+        self.blocks = self.scan(0, self.document.blockCount())
+        self.block_count = self.document.blockCount()
+        self.changed.emit()
+
+    def scan(self, first, end):
+        cues = []
+        block = self.document.findBlockByNumber(first)
+        while block.isValid() and block.blockNumber() < end:
+            if is_cue_line(block.text()):
+                cues.append(block.blockNumber())
+            block = block.next()
+        return cues
+
+    def update_blocks(self, position, removed, added):
+        # Blocks [first, last] after the edit replace [first, last - delta]
+        document = self.document
+        last_position = max(0, document.characterCount() - 1)
+        first = document.findBlock(min(position, last_position)).blockNumber()
+        last = document.findBlock(min(position + added, last_position)).blockNumber()
+        delta = document.blockCount() - self.block_count
+        self.block_count = document.blockCount()
+
+        old_last = max(first, last - delta)
+        start = bisect_left(self.blocks, first)
+        stop = bisect_right(self.blocks, old_last)
+        scanned = self.scan(first, last + 1)
+        if not delta and self.blocks[start:stop] == scanned:
+            return  # Typing inside a line that neither was nor became a cue
+        shifted = [block + delta for block in self.blocks[stop:]] if delta else self.blocks[stop:]
+        self.blocks[start:] = scanned + shifted
+        self.changed.emit()
+
+    def is_cue(self, block_number):
+        index = bisect_left(self.blocks, block_number)
+        return index < len(self.blocks) and self.blocks[index] == block_number
+
+    def section_number(self, block_number):
+        # 1-based number of the section containing block_number, 0 before the first cue
+        return bisect_right(self.blocks, block_number)
+
+    def next_cue(self, block_number):
+        # First cue strictly after block_number, or None
+        index = bisect_right(self.blocks, block_number)
+        return self.blocks[index] if index < len(self.blocks) else None
+
+    def previous_cue(self, block_number):
+        # Last cue strictly before block_number, or None
+        index = bisect_left(self.blocks, block_number)
+        return self.blocks[index - 1] if index else None
+
+    def section_of(self, block_number):
+        # Cue block of the section containing block_number, or None before the first cue
+        index = bisect_right(self.blocks, block_number)
+        return self.blocks[index - 1] if index else None
+
+    def titles(self):
+        return [(block, cue_title(self.document.findBlockByNumber(block).text())) for block in self.blocks]
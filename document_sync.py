@@ -0,0 +1,250 @@
+from difflib import SequenceMatcher
+
+from PyQt6.QtCore import QObject, QPointF, Qt
+from PyQt6.QtGui import QTextCursor
+
+SYNC_MODE_INCREMENTAL = 'incremental'  # Patch only the blocks that differ
+SYNC_MODE_FULL = 'full'  # Reload the whole script, back to the top
+
+# Above this many blocks the trimmed range is patched as one replacement
+# instead of being matched block by block.
+MAX_DIFF_BLOCKS = 5000
+COPY_CHUNK_CHARS = 16 * 1024  # Largest piece of text copy_document holds as a Python string
+
+
+def changed_block_range(source, target, bounds=None):
+    # Trim the common leading and trailing blocks. Returns None when both
+    # documents are equal, otherwise (first, source_end, target_end): source
+    # blocks [first, source_end) replace target blocks [first, target_end).
+    # bounds, (first, tail) from ChangedBlocks.bounds, says the blocks
+    # before first and the last tail blocks are equal; only the blocks in
+    # between are compared.
+    first, tail = bounds or (0, 0)
+    source_block = source.findBlockByNumber(first)
+    target_block = target.findBlockByNumber(first)
+    while source_block.isValid() and target_block.isValid() and source_block.text() == target_block.text():
+        source_block = source_block.next()
+        target_block = target_block.next()
+    if not source_block.isValid() and not target_block.isValid():
+        return None
+
+    first = source_block.blockNumber() if source_block.isValid() else source.blockCount()
+    tail = min(tail, source.blockCount() - first, target.blockCount() - first)  # Not back into the leading blocks
+    source_block = source.findBlockByNumber(source.blockCount() - 1 - tail)
+    target_block = target.findBlockByNumber(target.blockCount() - 1 - tail)
+    while (source_block.blockNumber() >= first and target_block.blockNumber() >= first
+           and source_block.text() == target_block.text()):
+        source_block = source_block.previous()
+        target_block = target_block.previous()
+    source_end = source_block.blockNumber() + 1 if source_block.isValid() else first
+    target_end = target_block.blockNumber() + 1 if target_block.isValid() else first
+    return first, max(first, source_end), max(first, target_end)
+
+
+class ChangedBlocks(QObject):
+    # The blocks of a source document edited since mark(), from its
+    # contentsChange: the first edited block and the number of unedited
+    # blocks after the last one. While the target is the one marked and
+    # untouched since, a sync only compares that range instead of walking
+    # every block of both documents.
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.source = None
+        self.target = None
+        self.revision = None
+        self.first = None
+        self.tail = None
+
+    def mark(self, source, target):
+        # target holds the same text as source now
+        if source is not self.source:
+            self.detach()
+            self.source = source
+            source.contentsChange.connect(self.record)
+        self.target = target
+        self.revision = target.revision()
+        self.first = self.tail = source.blockCount()  # Nothing edited yet
+
+    def detach(self):
+        if self.source is not None:
+            self.source.contentsChange.disconnect(self.record)
+        self.source = self.target = None
+
+    def record(self, position, removed, added):
+        document = self.source
+        last = document.findBlock(min(position + added, document.characterCount() - 1))
+        self.first = min(self.first, document.findBlock(position).blockNumber())
+        self.tail = min(self.tail, document.blockCount() - 1 - last.blockNumber())
+
+    def bounds(self, source, target):
+        # bounds for changed_block_range, or None when target was loaded or
+        # changed some other way since mark() and has to be compared whole
+        if source is not self.source or target is not self.target or target.revision() != self.revision:
+            return None
+        return self.first, self.tail
+
+
+def block_texts(document, first, end):
+    texts = []
+    block = document.findBlockByNumber(first)
+    while block.isValid() and block.blockNumber() < end:
+        texts.append(block.text())
+        block = block.next()
+    return texts
+
+
+def copy_document(source, target, on_chunk=None, chunk_chars=COPY_CHUNK_CHARS):
+    # Replace the text of target with that of source, whole blocks at a
+    # time in chunks of about chunk_chars inside one edit block, so the
+    # script never exists as one Python string on the way. Characters are
+    # copied as they are (no toPlainText() conversion), which keeps the
+    # block numbers of both documents equal. on_chunk(text) sees every
+    # chunk in order, e.g. to hash the script.
+    cursor = QTextCursor(target)
+    cursor.beginEditBlock()
+    cursor.select(QTextCursor.SelectionType.Document)
+    cursor.removeSelectedText()
+    reader = QTextCursor(source)
+    end = source.characterCount() - 1  # Without the final paragraph separator
+    position = 0
+    while position < end:
+        stop = min(end, position + chunk_chars)
+        block = source.findBlock(stop)
+        if block.position() > position:
+            stop = block.position()  # Up to and including the separator before that block
+        else:
+            stop = min(end, block.position() + block.length() - 1)  # A block longer than a chunk
+        reader.setPosition(position)
+        reader.setPosition(stop, QTextCursor.MoveMode.KeepAnchor)
+        text = reader.selectedText().replace('\u2029', '\n')
+        cursor.insertText(text)
+        if on_chunk is not None:
+            on_chunk(text)
+        position = stop
+    cursor.endEditBlock()
+
+
+def replace_blocks(target, first, target_end, texts):
+    # Replace target blocks [first, target_end) with the given block texts
+    # inside a single edit block, so the layout is only redone once.
+    cursor = QTextCursor(target)
+    cursor.beginEditBlock()
+    block_count = target.blockCount()
+    if first == target_end:
+        # Pure insertion of whole blocks
+        if first < block_count:
+            cursor.setPosition(target.findBlockByNumber(first).position())
+            cursor.insertText('\n'.join(texts) + '\n')
+        else:
+            cursor.movePosition(QTextCursor.MoveOperation.End)
+            cursor.insertText('\n' + '\n'.join(texts))
+    elif not texts:
+        # Pure deletion of whole blocks, together with one separator
+        if target_end < block_count:
+            cursor.setPosition(target.findBlockByNumber(first).position())
+            cursor.setPosition(target.findBlockByNumber(target_end).position(), QTextCursor.MoveMode.KeepAnchor)
+        else:
+            previous = target.findBlockByNumber(first - 1)
+            cursor.setPosition(previous.position() + previous.length() - 1)
+            cursor.movePosition(QTextCursor.MoveOperation.End, QTextCursor.MoveMode.KeepAnchor)
+        cursor.removeSelectedText()
+    else:
+        last = target.findBlockByNumber(target_end - 1)
+        cursor.setPosition(target.findBlockByNumber(first).position())
+        cursor.setPosition(last.position() + last.length() - 1, QTextCursor.MoveMode.KeepAnchor)
+        cursor.insertText('\n'.join(texts))
+    cursor.endEditBlock()
+
+
+def block_changes(source, target, bounds=None):
+    # Non-equal block ranges as (target_start, target_end, source_start,
+    # source_end), in document order.
+    change = changed_block_range(source, target, bounds)
+    if change is None:
+        return []
+    first, source_end, target_end = change
+    if source_end - first > MAX_DIFF_BLOCKS or target_end - first > MAX_DIFF_BLOCKS:
+        return [(first, target_end, first, source_end)]
+
+    matcher = SequenceMatcher(None, block_texts(target, first, target_end),
+                              block_texts(source, first, source_end), autojunk=False)
+    return [(first + t_start, first + t_end, first + s_start, first + s_end)
+            for tag, t_start, t_end, s_start, s_end in matcher.get_opcodes() if tag != 'equal']
+
+
+def patch_document(source, target, bounds=None):
+    # Returns the applied changes (see block_changes); empty when in sync
+    if target.isEmpty():
+        changes = [(0, target.blockCount(), 0, source.blockCount())]
+        copy_document(source, target)
+        return changes
+
+    changes = block_changes(source, target, bounds)
+    # Back to front, so the block numbers of earlier changes stay valid
+    for t_start, t_end, s_start, s_end in reversed(changes):
+        replace_blocks(target, t_start, t_end, block_texts(source, s_start, s_end))
+    return changes
+
+
+def text_changes(texts, target):
+    # block_changes for a source given as its list of block texts, e.g. a
+    # file split at '\n', without building a QTextDocument for it
+    first = 0
+    block = target.begin()
+    while block.isValid() and first < len(texts) and block.text() == texts[first]:
+        block = block.next()
+        first += 1
+    if not block.isValid() and first == len(texts):
+        return []
+    source_end = len(texts)
+    block = target.lastBlock()
+    while block.blockNumber() >= first and source_end > first and block.text() == texts[source_end - 1]:
+        block = block.previous()
+        source_end -= 1
+    target_end = max(first, block.blockNumber() + 1 if block.isValid() else first)
+    if source_end - first > MAX_DIFF_BLOCKS or target_end - first > MAX_DIFF_BLOCKS:
+        return [(first, target_end, first, source_end)]
+
+    matcher = SequenceMatcher(None, block_texts(target, first, target_end), texts[first:source_end], autojunk=False)
+    return [(first + t_start, first + t_end, first + s_start, first + s_end)
+            for tag, t_start, t_end, s_start, s_end in matcher.get_opcodes() if tag != 'equal']
+
+
+def patch_document_texts(texts, target):
+    # patch_document from a list of block texts; the whole patch is one
+    # edit block, so it is also a single undo step in an editor
+    changes = text_changes(texts, target)
+    cursor = QTextCursor(target)
+    cursor.beginEditBlock()
+    for t_start, t_end, s_start, s_end in reversed(changes):
+        replace_blocks(target, t_start, t_end, texts[s_start:s_end])
+    cursor.endEditBlock()
+    return changes
+
+
+def reading_anchor(document, y):
+    # (block number, offset from the top of that block) for a document y
+    layout = document.documentLayout()
+    position = layout.hitTest(QPointF(0, y), Qt.HitTestAccuracy.FuzzyHit)
+    block = document.findBlock(max(0, position))
+    return block.blockNumber(), y - layout.blockBoundingRect(block).top()
+
+
+def anchor_position(document, anchor, changes):
+    # Map a reading anchor taken before a patch to a y in the patched document
+    block_number, offset = anchor
+    shift = 0
+    for t_start, t_end, s_start, s_end in changes:
+        if block_number < t_start:
+            break
+        if block_number < t_end:
+            # The anchored block itself was rewritten: stay at the same
+            # relative block within the new range, at most its last block
+            block_number = s_start + min(block_number - t_start, max(0, s_end - s_start - 1)) - shift
+            offset = 0
+            break
+        shift += (s_end - s_start) - (t_end - t_start)
+    block_number += shift
+    block = document.findBlockByNumber(min(block_number, document.blockCount() - 1))
+    return document.documentLayout().blockBoundingRect(block).top() + offset
@@ -0,0 +1,61 @@
+import os
+import tempfile
+
+from PyQt6.QtCore import QThread, pyqtSignal
+
+
+def file_signature(file_path):
+    # (modification time, size), or None while the file does not exist
+    try:
+        status = os.stat(file_path)
+    except OSError:
+        return None
+    return status.st_mtime_ns, status.st_size
+
+
+def atomic_write(file_path, text, encoding='utf-8'):
+    # Write next to the target and rename over it, so a crash mid-write
+    # leaves either the old file or the new one, never a truncated mix.
+    # text may also be bytes, which are written as they are.
+    directory = os.path.dirname(os.path.abspath(file_path))
+    handle, temp_path = tempfile.mkstemp(prefix='.' + os.path.basename(file_path) + '.', suffix='.tmp', dir=directory)
+    try:
+        data = text if isinstance(text, bytes) else text.encode(encoding)
+        with os.fdopen(handle, 'wb') as file:
+            file.write(data)
+            file.flush()
+            os.fsync(file.fileno())
+        try:
+            os.chmod(temp_path, os.stat(file_path).st_mode)
+        except OSError:
+            pass  # File baru: biarkan permission bawaan
+        os.replace(temp_path, file_path)
+    except BaseException:
+        try:
+            os.remove(temp_path)
+        except OSError:
+            pass
+        raise
+
+
+class SaveWorker(QThread):
+    saved = pyqtSignal(str)
+    save_failed = pyqtSignal(str, str)  # path, error message
+
+    def __init__(self, file_path, text, parent=None, text_format=None):
+        super().__init__(parent)
+        self.file_path = file_path
+        self.text = text
+        self.text_format = text_format  # script_loader.TextFormat of the file; None writes UTF-8
+        self.signature = None  # file_signature of what was written, to tell it from later writes
+
+    def run(self):
+        try:
+            # Encoded here, off the GUI thread, in the encoding the script was read in
+            data = self.text_format.encode(self.text) if self.text_format else self.text
+            atomic_write(self.file_path, data)
+            self.signature = file_signature(self.file_path)
+        except (OSError, UnicodeEncodeError) as error:
+            self.save_failed.emit(self.file_path, str(error))
+        else:
+            self.saved.emit(self.file_path)
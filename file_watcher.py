@@ -0,0 +1,102 @@
+import os
+
+from PyQt6.QtCore import QObject, QThread, QTimer, QFileSystemWatcher, pyqtSignal
+
+from file_saver import file_signature
+from script_loader import read_text_file
+
+RELOAD_DELAY_MS = 400  # Quiet time after the last write before the file is read
+
+
+class ScriptWatcher(QObject):
+    # Watches the current script for changes made by other programs.
+    # Editors that save by writing a new file and renaming it over the old
+    # one make QFileSystemWatcher drop the path, so the directory is watched
+    # too and the file is added again when it reappears. A burst of writes
+    # (autosave, several flushes) is reported once, RELOAD_DELAY_MS after
+    # the last one, and only if the file differs from the last state the
+    # application saved or read itself. That state only moves on when the
+    # application acknowledges it, so a change reported while the script is
+    # busy (saving, importing) is reported again by the next check.
+
+    file_changed = pyqtSignal(str)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.file_path = None
+        self.signature = None  # Last state of the file the application knows about
+        self.watcher = QFileSystemWatcher(self)
+        self.watcher.fileChanged.connect(self.schedule_check)
+        self.watcher.directoryChanged.connect(self.schedule_check)
+        self.timer = QTimer(self)
+        self.timer.setSingleShot(True)
+        self.timer.setInterval(RELOAD_DELAY_MS)
+        self.timer.timeout.connect(self.check)
+
+    def watch(self, file_path, signature=None):
+        if file_path == self.file_path:
+            self.acknowledge(signature)
+            return
+        self.unwatch()
+        self.file_path = file_path
+        if file_path:
+            self.watcher.addPath(os.path.dirname(os.path.abspath(file_path)))
+            self.add_file()
+            self.acknowledge(signature)
+
+    def unwatch(self):
+        self.timer.stop()
+        paths = self.watcher.files() + self.watcher.directories()
+        if paths:
+            self.watcher.removePaths(paths)
+        self.file_path = None
+        self.signature = None
+
+    def acknowledge(self, signature=None):
+        # The file as it is now is known, e.g. when a reload starts; or, with
+        # a signature, as it was when the application wrote or read it, so a
+        # write by another program since then is still reported
+        if not self.file_path:
+            signature = None
+        elif signature is None:
+            signature = file_signature(self.file_path)
+        self.signature = signature
+
+    def has_changed(self):
+        # Written by another program since the last acknowledged state
+        signature = file_signature(self.file_path) if self.file_path else None
+        return signature is not None and signature != self.signature
+
+    def add_file(self):
+        if os.path.exists(self.file_path) and self.file_path not in self.watcher.files():
+            self.watcher.addPath(self.file_path)
+
+    def schedule_check(self, path=None):
+        if self.file_path:
+            self.timer.start()  # Restart: wait for the writes to settle
+
+    def check(self):
+        if not self.file_path:
+            return
+        self.add_file()  # Replaced by a rename: watch the new file
+        if self.has_changed():  # Not deleted (possibly mid-save) and something new
+            self.file_changed.emit(self.file_path)
+
+
+class ReloadWorker(QThread):
+    # Reads a changed script off the GUI thread and splits it into block
+    # texts for document_sync.patch_document_texts
+    loaded = pyqtSignal(str, list, object)  # path, block texts, script_loader.TextFormat
+    load_failed = pyqtSignal(str, str)  # path, error message
+
+    def __init__(self, file_path, parent=None):
+        super().__init__(parent)
+        self.file_path = file_path
+
+    def run(self):
+        try:
+            text, text_format = read_text_file(self.file_path)
+        except (OSError, ValueError) as error:
+            self.load_failed.emit(self.file_path, str(error))
+            return
+        self.loaded.emit(self.file_path, text.split('\n'), text_format)
@@ -0,0 +1,121 @@
+import hashlib
+import json
+import os
+import sys
+import tempfile
+
+from PyQt6.QtCore import QStandardPaths, QStringListModel, QT_VERSION_STR
+from PyQt6.QtGui import QFont, QFontDatabase
+from PyQt6.QtWidgets import QComboBox, QListView, QStyledItemDelegate
+
+from file_saver import atomic_write
+
+CATALOGUE_VERSION = 1
+# Searched in addition to QStandardPaths' FontsLocation, where they exist
+SYSTEM_FONT_DIRECTORIES = ['/usr/share/fonts', '/usr/local/share/fonts', '/Library/Fonts', '/System/Library/Fonts',
+                           os.path.expanduser('~/.fonts'), os.path.expanduser('~/Library/Fonts')]
+VISIBLE_FONTS = 16  # Rows of the open list; only these are rendered in their font
+
+_families = None  # Per launch: the first Settings dialog reads it, later ones reuse it
+
+
+def catalogue_path():
+    base = QStandardPaths.writableLocation(QStandardPaths.StandardLocation.CacheLocation) or tempfile.gettempdir()
+    return os.path.join(base, 'font_catalogue.json')
+
+
+def font_directories():
+    directories = QStandardPaths.standardLocations(QStandardPaths.StandardLocation.FontsLocation)
+    directories += SYSTEM_FONT_DIRECTORIES
+    if sys.platform == 'win32' and os.environ.get('LOCALAPPDATA'):
+        directories.append(os.path.join(os.environ['LOCALAPPDATA'], 'Microsoft', 'Windows', 'Fonts'))
+    return sorted({os.path.abspath(directory) for directory in directories if os.path.isdir(directory)})
+
+
+def font_fingerprint():
+    # Installing or removing a font changes the modification time of the
+    # directory it is in, so every directory below the font folders is
+    # hashed; the font files themselves are not touched
+    fingerprint = hashlib.blake2b(f"{CATALOGUE_VERSION}|{QT_VERSION_STR}".encode('utf-8'), digest_size=16)
+    for root in font_directories():
+        for directory, subdirectories, _ in os.walk(root):
+            subdirectories.sort()
+            try:
+                mtime = os.stat(directory).st_mtime_ns
+            except OSError:
+                continue
+            fingerprint.update(f"|{directory}:{mtime}".encode('utf-8', 'surrogatepass'))
+    return fingerprint.hexdigest()
+
+
+def load_catalogue(fingerprint):
+    try:
+        with open(catalogue_path(), encoding='utf-8') as file:
+            data = json.load(file)
+    except (OSError, ValueError):
+        return None
+    if not isinstance(data, dict) or data.get('fingerprint') != fingerprint or not isinstance(data.get('families'), list):
+        return None
+    return data['families']
+
+
+def store_catalogue(fingerprint, families):
+    try:
+        os.makedirs(os.path.dirname(catalogue_path()), exist_ok=True)
+        atomic_write(catalogue_path(), json.dumps({'fingerprint': fingerprint, 'families': families}))
+    except OSError:
+        pass  # Only a cache: enumerated again next launch
+
+
+def font_families():
+    # Installed font families. The font database is only asked when the
+    # font folders changed since the list was last stored.
+    global _families
+    if _families is None:
+        fingerprint = font_fingerprint()
+        _families = load_catalogue(fingerprint)
+        if _families is None:
+            _families = [family for family in QFontDatabase.families() if not QFontDatabase.isPrivateFamily(family)]
+            store_catalogue(fingerprint, _families)
+    return _families
+
+
+class FontPreviewDelegate(QStyledItemDelegate):
+    # Draws each family name in its own font. The list view only paints the
+    # rows in sight, so a font is loaded when its row is scrolled into view.
+
+    def initStyleOption(self, option, index):
+        super().initStyleOption(option, index)
+        font = QFont(option.font)
+        font.setFamily(index.data())
+        option.font = font
+
+
+class FontFamilyComboBox(QComboBox):
+    # Stands in for QFontComboBox, which queries every family (writing
+    # systems, scalability) and sizes itself over all of them on creation.
+    # Uniform rows keep the view from measuring each row in its own font.
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        view = QListView(self)
+        view.setUniformItemSizes(True)
+        self.setView(view)
+        self.setItemDelegate(FontPreviewDelegate(view))
+        self.setModel(QStringListModel(font_families(), self))
+        self.setMaxVisibleItems(VISIBLE_FONTS)
+        self.setSizeAdjustPolicy(QComboBox.SizeAdjustPolicy.AdjustToMinimumContentsLengthWithIcon)
+        self.setMinimumContentsLength(20)
+
+    def currentFont(self):
+        return QFont(self.currentText())
+
+    def setCurrentFont(self, font):
+        index = self.findText(font.family())
+        if index < 0:
+            # E.g. a stored font that is no longer installed: keep showing it
+            model = self.model()
+            index = model.rowCount()
+            model.insertRows(index, 1)
+            model.setData(model.index(index), font.family())
+        self.setCurrentIndex(index)
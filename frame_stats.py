@@ -0,0 +1,138 @@
+import csv
+from collections import deque
+
+from scroll_engine import FRAME_INTERVAL_MS
+
+HISTORY_FRAMES = 600  # ~10 seconds at 60 fps
+LATE_FACTOR = 1.5  # A frame interval this many times the expected one counts as late
+LOG_FLUSH_ROWS = 120
+
+LOG_COLUMNS = ['time_s', 'interval_ms', 'tick_ms', 'paint_ms', 'position_px',
+               'requested_px_s', 'actual_px_s', 'dropped_frames']
+
+
+def percentile(values, fraction):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+class FrameLogger:
+    # Appends one CSV row per frame; rows are buffered and flushed in batches
+    # so logging does not add a write() to every frame.
+
+    def __init__(self, file_path):
+        self.file_path = file_path
+        self.file = open(file_path, 'w', newline='', encoding='utf-8')
+        self.writer = csv.writer(self.file)
+        self.writer.writerow(LOG_COLUMNS)
+        self.rows = []
+
+    def write(self, row):
+        self.rows.append(row)
+        if len(self.rows) >= LOG_FLUSH_ROWS:
+            self.flush()
+
+    def flush(self):
+        self.writer.writerows(self.rows)
+        self.rows = []
+        self.file.flush()
+
+    def close(self):
+        self.flush()
+        self.file.close()
+
+
+class FrameStats:
+    # Ring buffer of per-frame samples: timer interval (is the timer late?),
+    # tick and paint cost (is the repaint path slow?) and the resulting
+    # scroll velocity compared to the requested one.
+
+    def __init__(self, capacity=HISTORY_FRAMES, expected_interval=FRAME_INTERVAL_MS / 1000):
+        self.samples = deque(maxlen=capacity)
+        self.expected_interval = expected_interval
+        self.logger = None
+        self.start_time = None
+        self.reset()
+
+    def reset(self):
+        # Dipanggil saat pause: jeda bukan frame yang terlambat
+        self.last_time = None
+        self.last_position = None
+        self.samples.clear()
+        self.dropped_frames = 0
+        self.late_frames = 0
+        self.frame_count = 0
+
+    def set_expected_interval(self, seconds):
+        self.expected_interval = seconds
+
+    def start_log(self, file_path):
+        self.stop_log()
+        self.logger = FrameLogger(file_path)
+
+    def stop_log(self):
+        if self.logger:
+            self.logger.close()
+            self.logger = None
+
+    def record(self, now, position, requested_speed, tick_time, paint_time):
+        if self.start_time is None:
+            self.start_time = now
+        if self.last_time is None:
+            self.last_time = now
+            self.last_position = position
+            return
+
+        interval = now - self.last_time
+        if interval <= 0:
+            return
+        actual_speed = (position - self.last_position) / interval
+        dropped = 0
+        if interval > self.expected_interval * LATE_FACTOR:
+            self.late_frames += 1
+            dropped = max(1, round(interval / self.expected_interval) - 1)
+            self.dropped_frames += dropped
+        self.frame_count += 1
+        self.samples.append((now, interval, tick_time, paint_time, requested_speed, actual_speed))
+        self.last_time = now
+        self.last_position = position
+
+        if self.logger:
+            self.logger.write([f"{now - self.start_time:.4f}", f"{interval * 1000:.3f}", f"{tick_time * 1000:.3f}",
+                               f"{paint_time * 1000:.3f}", f"{position:.2f}", f"{requested_speed:.2f}",
+                               f"{actual_speed:.2f}", dropped])
+
+    def summary(self):
+        if not self.samples:
+            return None
+        intervals = [sample[1] for sample in self.samples]
+        span = self.samples[-1][0] - self.samples[0][0] + intervals[0]
+        # Velocity over the last second, averaged so single-frame noise cancels out
+        recent = [sample for sample in self.samples if sample[0] >= self.samples[-1][0] - 1.0]
+        recent_time = sum(sample[1] for sample in recent)
+        return {
+            'fps': len(intervals) / span if span > 0 else 0.0,
+            'p50_ms': percentile(intervals, 0.5) * 1000,
+            'p95_ms': percentile(intervals, 0.95) * 1000,
+            'p99_ms': percentile(intervals, 0.99) * 1000,
+            'max_ms': max(intervals) * 1000,
+            'tick_ms': percentile([sample[2] for sample in self.samples], 0.95) * 1000,
+            'paint_ms': percentile([sample[3] for sample in self.samples], 0.95) * 1000,
+            'late': self.late_frames,
+            'dropped': self.dropped_frames,
+            'frames': self.frame_count,
+            'requested_px_s': self.samples[-1][4],
+            'actual_px_s': sum(sample[5] * sample[1] for sample in recent) / recent_time if recent_time else 0.0,
+        }
+
+    def hud_text(self):
+        summary = self.summary()
+        if summary is None:
+            return "no frames yet"
+        return (f"{summary['fps']:5.1f} fps   frame p50 {summary['p50_ms']:.1f} / p95 {summary['p95_ms']:.1f}"
+                f" / p99 {summary['p99_ms']:.1f} / max {summary['max_ms']:.1f} ms\n"
+                f"tick p95 {summary['tick_ms']:.2f} ms   paint p95 {summary['paint_ms']:.2f} ms\n"
+                f"late {summary['late']}   dropped {summary['dropped']}   of {summary['frames']} frames\n"
+                f"speed {summary['actual_px_s']:.1f} / {summary['requested_px_s']:.1f} px/s")
@@ -0,0 +1,23 @@
+from PyQt6.QtGui import QIcon, QGuiApplication
+
+ICON_SIZES = (16, 24, 32)
+_icon_cache = {}
+
+
+def icon(name):
+    # qtawesome (and the icon font it loads) is only imported the first time an
+    # icon is needed. Glyphs are rendered once into plain pixmaps, so later
+    # lookups and repaints never go through the font engine again.
+    cached = _icon_cache.get(name)
+    if cached is None:
+        import qtawesome as qta
+
+        font_icon = qta.icon(name)
+        ratio = QGuiApplication.instance().devicePixelRatio() if QGuiApplication.instance() else 1.0
+        cached = QIcon()
+        for size in ICON_SIZES:
+            pixmap = font_icon.pixmap(int(size * ratio), int(size * ratio))
+            pixmap.setDevicePixelRatio(ratio)
+            cached.addPixmap(pixmap)
+        _icon_cache[name] = cached
+    return cached
@@ -0,0 +1,350 @@
+import os
+
+from PyQt6.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QListWidget, QListWidgetItem, QPushButton,
+                             QFileDialog, QPlainTextDocumentLayout)
+from PyQt6.QtCore import QObject, QThread, Qt, pyqtSignal
+from PyQt6.QtGui import QTextDocument, QFont
+
+from script_loader import read_text_file
+from file_watcher import file_signature
+from word_index import WordIndex, count_words
+from cue_index import is_cue_line
+from script_cache import CompiledScript, script_key, layout_key
+from progressive_layout import ProgressiveLayout, PROGRESSIVE_LAYOUT_CHARS
+from settings_store import DEFAULT_PRELOAD_COUNT, DEFAULT_PRELOAD_MB
+
+# Editor and display document with their layouts, measured on a 10 MB script
+PRELOAD_BYTES_PER_CHAR = 30
+
+
+class PreloadedScript:
+    # One playlist entry read ahead: a document for the editor, one for the
+    # display, and the word counts and cue blocks of its lines. Once the
+    # display document is laid out at the display's font and width (see
+    # ScriptPreloader.start_layout), compiled holds its metrics and
+    # word_index is built, so TeleprompterDisplay.swap_document only has to
+    # take them over.
+
+    def __init__(self, file_path, signature, text_format, characters, editor_document, display_document,
+                 words, cues, key):
+        self.file_path = file_path
+        self.signature = signature  # file_signature when read; a newer file is read again
+        self.text_format = text_format  # Kept for saving the script once it is current
+        self.characters = characters
+        self.editor_document = editor_document
+        self.display_document = display_document
+        self.words = words
+        self.cues = cues
+        self.key = key  # script_key for the script cache, None for short scripts
+        self.compiled = None
+        self.word_index = None
+        self.layout = None  # layout_key of display_document when compiled
+
+    def size_bytes(self):
+        return self.characters * PRELOAD_BYTES_PER_CHAR
+
+
+class PreloadWorker(QThread):
+    # Reads, decodes and indexes one script off the GUI thread. The text is
+    # put into plain QTextDocuments that are never laid out here (layout
+    # needs the GUI thread's font engines) and handed over to target_thread.
+    loaded = pyqtSignal(object)  # PreloadedScript
+    load_failed = pyqtSignal(str, str)  # path, error message
+
+    def __init__(self, file_path, target_thread, parent=None):
+        super().__init__(parent)
+        self.file_path = file_path
+        self.target_thread = target_thread
+
+    def run(self):
+        signature = file_signature(self.file_path)
+        try:
+            text, text_format = read_text_file(self.file_path)
+        except (OSError, ValueError) as error:
+            self.load_failed.emit(self.file_path, str(error))
+            return
+        if self.isInterruptionRequested():
+            return
+        lines = text.split('\n')
+        words = [count_words(line) for line in lines]
+        cues = [number for number, line in enumerate(lines) if is_cue_line(line)]
+        key = script_key(text) if len(text) > PROGRESSIVE_LAYOUT_CHARS else None
+        documents = []
+        for undo in (True, False):  # Editor, display (a read-only copy without undo history)
+            document = QTextDocument()
+            document.setUndoRedoEnabled(undo)
+            document.setPlainText(text)
+            document.moveToThread(self.target_thread)
+            documents.append(document)
+        self.loaded.emit(PreloadedScript(self.file_path, signature, text_format, len(text), documents[0], documents[1],
+                                         words, cues, key))
+
+
+class ScriptPreloader(QObject):
+    # Keeps the next playlist entries ready for an instant switch. One
+    # worker reads at a time; the display documents are laid out on the GUI
+    # thread in ProgressiveLayout slices, so the scroll keeps its frames.
+    # Entries are kept in playlist order as long as their estimated size
+    # fits the budget; what no longer fits or is no longer wanted is freed.
+
+    ready = pyqtSignal(str)  # path of an entry that can be switched to
+    dropped = pyqtSignal(str)
+
+    def __init__(self, count=DEFAULT_PRELOAD_COUNT, budget_mb=DEFAULT_PRELOAD_MB, parent=None):
+        super().__init__(parent)
+        self.count = count
+        self.budget_bytes = budget_mb * 1024 * 1024
+        self.wanted = []  # Paths to keep ready, most important first
+        self.entries = {}  # path -> PreloadedScript
+        self.failed = {}  # path -> file_signature of a file that could not be read
+        self.font = None  # Display font and wrap width, None without a tiled display
+        self.width = None
+        self.worker = None
+        self.layouter = ProgressiveLayout(self)
+        self.layouter.finished.connect(self.finish_layout)
+        self.laying_out = None  # Entry the layouter is working on
+
+    def set_limits(self, count, budget_mb):
+        self.count = count
+        self.budget_bytes = budget_mb * 1024 * 1024
+
+    def set_layout(self, layout):
+        # layout: (font, width) from TeleprompterDisplay.script_layout(), or None
+        font, width = layout if layout is not None else (None, None)
+        if font is not None and self.font is not None and font.key() == self.font.key() and width == self.width:
+            return
+        self.font = QFont(font) if font is not None else None
+        self.width = width
+        if self.laying_out is not None:
+            self.layouter.cancel()
+            self.laying_out = None
+        self.schedule()
+
+    def layout_of(self, entry):
+        # layout_key the display document would have at the current font and width
+        document = entry.display_document
+        if document.defaultFont().key() != self.font.key() or document.textWidth() != self.width:
+            return None
+        return layout_key(document)
+
+    def preload(self, paths):
+        self.wanted = list(paths[:self.count])
+        self.schedule()
+
+    def trim(self):
+        # Keep the wanted entries in order until the budget is used up
+        keep = set()
+        total = 0
+        for path in self.wanted:
+            entry = self.entries.get(path)
+            size = entry.size_bytes() if entry else self.estimated_bytes(path)
+            if total + size > self.budget_bytes:
+                break
+            keep.add(path)
+            total += size
+        for path in list(self.entries):
+            if path not in keep:
+                self.drop(path)
+        return keep
+
+    def estimated_bytes(self, path):
+        # Before reading: one character per byte at most for every supported encoding
+        signature = file_signature(path)
+        return signature[1] * PRELOAD_BYTES_PER_CHAR if signature else 0
+
+    def drop(self, path):
+        entry = self.entries.pop(path, None)
+        if entry is not None:
+            self.release(entry)
+
+    def release(self, entry):
+        if entry is self.laying_out:
+            self.layouter.cancel()
+            self.laying_out = None
+        self.dropped.emit(entry.file_path)  # The documents go with the last reference
+
+    def schedule(self):
+        keep = self.trim()
+        if self.worker is None:
+            for path in self.wanted:
+                if path in keep and path not in self.entries and self.failed.get(path, False) != file_signature(path):
+                    self.worker = PreloadWorker(path, self.thread(), self)
+                    self.worker.loaded.connect(self.add_entry)
+                    self.worker.load_failed.connect(self.mark_failed)
+                    self.worker.finished.connect(self.worker_finished)
+                    self.worker.start()
+                    break
+        if self.laying_out is None and self.font is not None:
+            for path in self.wanted:
+                entry = self.entries.get(path)
+                if entry is not None and (entry.compiled is None or entry.layout != self.layout_of(entry)):
+                    self.start_layout(entry)
+                    break
+
+    def add_entry(self, entry):
+        if entry.file_path not in self.wanted:
+            return  # Removed from the playlist while it was read
+        # Only the GUI thread may give the editor's document its layout
+        entry.editor_document.setDocumentLayout(QPlainTextDocumentLayout(entry.editor_document))
+        if len(entry.words) != entry.display_document.blockCount():
+            # Separators other than '\n' (U+2029) split blocks too: count per block instead
+            entry.words, entry.cues = [], []
+            block = entry.display_document.begin()
+            while block.isValid():
+                entry.words.append(count_words(block.text()))
+                if is_cue_line(block.text()):
+                    entry.cues.append(block.blockNumber())
+                block = block.next()
+        self.entries[entry.file_path] = entry
+        if self.font is None:
+            self.ready.emit(entry.file_path)  # Nothing to lay out for the display
+
+    def mark_failed(self, path, message):
+        # Not retried until the file changes; switching to it reports the error
+        self.failed[path] = file_signature(path)
+
+    def worker_finished(self):
+        self.worker.deleteLater()
+        self.worker = None
+        self.schedule()
+
+    def start_layout(self, entry):
+        document = entry.display_document
+        entry.compiled = None
+        entry.word_index = None
+        document.setDefaultFont(self.font)
+        document.setTextWidth(self.width)
+        self.laying_out = entry
+        self.layouter.start(document)
+
+    def finish_layout(self):
+        entry = self.laying_out
+        self.laying_out = None
+        document = entry.display_document
+        entry.compiled = CompiledScript(entry.words, entry.cues, self.layouter.top, self.layouter.heights,
+                                        document.documentLayout().documentSize().height())
+        entry.word_index = WordIndex()
+        entry.word_index.set_compiled(document, entry.words, self.layouter.top, self.layouter.heights)
+        entry.layout = layout_key(document)
+        self.ready.emit(entry.file_path)
+        self.schedule()
+
+    def take(self, path):
+        # The entry for path, handed over with its documents, or None when
+        # it was never read or the file changed since. A layout that is
+        # still running or out of date is finished here at once.
+        entry = self.entries.pop(path, None)
+        if entry is None:
+            return None
+        if entry.signature != file_signature(path):
+            self.release(entry)
+            return None
+        if self.font is not None and (entry.compiled is None or entry.layout != self.layout_of(entry)):
+            if entry is not self.laying_out:
+                if self.laying_out is not None:
+                    self.layouter.cancel()
+                self.start_layout(entry)
+            while self.laying_out is entry:
+                self.layouter.step()  # Ends in finish_layout, which fills in entry.compiled
+        elif entry is self.laying_out:
+            self.layouter.cancel()
+            self.laying_out = None
+        return entry
+
+    def stop(self):
+        self.layouter.cancel()
+        self.laying_out = None
+        if self.worker is not None:
+            self.worker.requestInterruption()
+            self.worker.wait()
+
+
+class RundownPanel(QWidget):
+    # The playlist in the control window: one row per script file, the
+    # current one in bold, preloaded ones marked as ready
+    changed = pyqtSignal()  # Entries added, removed or reordered
+    activated = pyqtSignal(int)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.paths = []
+        self.current = None
+        self.ready = set()
+
+        self.list_widget = QListWidget(self)
+        self.list_widget.itemActivated.connect(lambda item: self.activated.emit(self.list_widget.row(item)))
+
+        add_button = QPushButton("Add...", self)
+        add_button.clicked.connect(self.add_files)
+        remove_button = QPushButton("Remove", self)
+        remove_button.clicked.connect(self.remove_selected)
+        up_button = QPushButton("Up", self)
+        up_button.clicked.connect(lambda: self.move_selected(-1))
+        down_button = QPushButton("Down", self)
+        down_button.clicked.connect(lambda: self.move_selected(1))
+
+        buttons = QHBoxLayout()
+        for button in (add_button, remove_button, up_button, down_button):
+            buttons.addWidget(button)
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(0, 0, 0, 0)
+        layout.addWidget(self.list_widget)
+        layout.addLayout(buttons)
+
+    def set_paths(self, paths):
+        self.paths = list(dict.fromkeys(paths))  # Satu baris per file
+        self.refresh()
+
+    def set_current(self, path):
+        self.current = path
+        self.refresh()
+
+    def set_ready(self, path, ready):
+        if ready:
+            self.ready.add(path)
+        else:
+            self.ready.discard(path)
+        self.refresh()
+
+    def current_index(self):
+        return self.paths.index(self.current) if self.current in self.paths else -1
+
+    def refresh(self):
+        row = self.list_widget.currentRow()
+        self.list_widget.clear()
+        for path in self.paths:
+            name = os.path.basename(path)
+            item = QListWidgetItem(f"{name}   (ready)" if path in self.ready and path != self.current else name)
+            item.setToolTip(path)
+            if path == self.current:
+                font = item.font()
+                font.setBold(True)
+                item.setFont(font)
+            if not os.path.exists(path):
+                item.setForeground(Qt.GlobalColor.gray)
+            self.list_widget.addItem(item)
+        self.list_widget.setCurrentRow(min(row, len(self.paths) - 1))
+
+    def add_files(self):
+        file_paths, _ = QFileDialog.getOpenFileNames(self, "Add Scripts", "", "Text Files (*.txt);;All Files (*)")
+        added = [path for path in file_paths if path not in self.paths]
+        if added:
+            self.paths.extend(added)
+            self.refresh()
+            self.changed.emit()
+
+    def remove_selected(self):
+        row = self.list_widget.currentRow()
+        if 0 <= row < len(self.paths):
+            del self.paths[row]
+            self.refresh()
+            self.changed.emit()
+
+    def move_selected(self, delta):
+        row = self.list_widget.currentRow()
+        target = row + delta
+        if 0 <= row < len(self.paths) and 0 <= target < len(self.paths):
+            self.paths[row], self.paths[target] = self.paths[target], self.paths[row]
+            self.refresh()
+            self.list_widget.setCurrentRow(target)
+            self.changed.emit()
@@ -0,0 +1,107 @@
+import time
+
+from PyQt6.QtCore import QObject, QEvent, QTimer, pyqtSignal
+from PyQt6.QtGui import QTextDocument
+
+from document_sync import block_texts
+
+LAYOUT_SLICE_MS = 8  # GUI time per slice, leaves room for a 60 Hz frame in between
+PROGRESSIVE_LAYOUT_CHARS = 100_000  # Below this a relayout is quick enough to do at once
+PREVIEW_CHARS_BEFORE = 2_000
+PREVIEW_CHARS_AFTER = 30_000  # Minutes of reading, far more than a full layout takes
+
+
+def preview_range(document, block_number, before=PREVIEW_CHARS_BEFORE, after=PREVIEW_CHARS_AFTER):
+    # Blocks [first, end) around block_number covering the given characters
+    block = document.findBlockByNumber(block_number)
+    first_block = block
+    length = 0
+    while first_block.previous().isValid() and length < before:
+        first_block = first_block.previous()
+        length += first_block.length()
+    end_block = block
+    length = 0
+    while end_block.isValid() and length < after:
+        length += end_block.length()
+        end_block = end_block.next()
+    end = end_block.blockNumber() if end_block.isValid() else document.blockCount()
+    return first_block.blockNumber(), end
+
+
+def make_preview(document, first, end, font, parent=None):
+    # A small document holding only the blocks around the reader, laid out
+    # with the new font while the full document is still being laid out
+    preview = QTextDocument(parent)
+    preview.setDocumentMargin(document.documentMargin())
+    preview.setDefaultFont(font)
+    preview.setTextWidth(document.textWidth())
+    preview.setPlainText('\n'.join(block_texts(document, first, end)))
+    return preview
+
+
+class ProgressiveLayout(QObject):
+    # Lays out a QTextDocument block by block in LAYOUT_SLICE_MS slices on
+    # the GUI thread. QTextDocumentLayout only lays out up to the block that
+    # is asked for, so walking the blocks in order spreads a full relayout
+    # over many event loop passes instead of one long freeze. The block
+    # heights are collected on the way for the WordIndex.
+    #
+    # QTextDocumentLayout also lays out lazily from its own timer, but in
+    # steps of up to 200k characters (~80 ms); those timer events are held
+    # back while this runs.
+
+    progress = pyqtSignal(float)
+    finished = pyqtSignal()
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.document = None
+        self.block = None
+        self.top = 0.0
+        self.heights = []
+        self.timer = QTimer(self)
+        self.timer.setSingleShot(True)
+        self.timer.timeout.connect(self.step)
+
+    def is_running(self):
+        return self.document is not None
+
+    def eventFilter(self, watched, event):
+        return event.type() == QEvent.Type.Timer
+
+    def start(self, document):
+        self.cancel()
+        self.document = document
+        document.documentLayout().installEventFilter(self)
+        self.block = document.begin()
+        self.top = document.documentLayout().blockBoundingRect(self.block).top()
+        self.heights = []
+        self.timer.start(0)
+
+    def cancel(self):
+        self.timer.stop()
+        if self.document is not None:
+            self.document.documentLayout().removeEventFilter(self)
+        self.document = None
+        self.block = None
+
+    def step(self):
+        deadline = time.perf_counter() + LAYOUT_SLICE_MS / 1000
+        layout = self.document.documentLayout()
+        block = self.block
+        heights = self.heights
+        while block.isValid():
+            heights.append(layout.blockBoundingRect(block).height())
+            block = block.next()
+            if time.perf_counter() >= deadline:
+                break
+        self.block = block
+        if block.isValid():
+            self.progress.emit(block.position() / max(1, self.document.characterCount()))
+            self.timer.start(0)
+        else:
+            # The size is normally announced from the held back timer; the
+            # QTextEdit scroll range follows documentSizeChanged
+            layout.documentSizeChanged.emit(layout.documentSize())
+            self.cancel()
+            self.finished.emit()
@@ -0,0 +1,262 @@
+import json
+import os
+import re
+import shutil
+import tempfile
+import time
+
+from PyQt6.QtCore import QCoreApplication, QObject, QTimer, QStandardPaths, QLockFile
+from PyQt6.QtGui import QTextDocument, QTextCursor
+
+from file_saver import SaveWorker
+
+FLUSH_INTERVAL_MS = 1000
+COMPACT_OPS = 5000  # Journal dipadatkan menjadi snapshot baru setelah sekian perubahan
+COMPACT_BYTES = 4 * 1024 * 1024
+
+JOURNAL_PATTERN = re.compile(r'journal-(\d+)\.log$')
+SESSION_PREFIX = 'session-'
+
+
+def recovery_directory():
+    base = QStandardPaths.writableLocation(QStandardPaths.StandardLocation.AppDataLocation) or tempfile.gettempdir()
+    path = os.path.join(base, 'recovery')
+    os.makedirs(path, exist_ok=True)
+    return path
+
+
+def session_lock(directory):
+    # Next to the session directory, so it is held before the directory
+    # exists and a starting instance is never taken for a crashed one.
+    # Only a dead owner makes it stale (not its age): the owner never
+    # touches it again while it runs.
+    lock = QLockFile(directory + '.lock')
+    lock.setStaleLockTime(0)
+    return lock
+
+
+class EditJournal(QObject):
+    # Append-only log of editor changes on top of a snapshot. Every journal
+    # generation N is snapshot-N.txt plus journal-N.log, whose first line is
+    # a JSON header and every further line one [position, removed, added]
+    # change. Compaction writes snapshot-N+1 on a worker thread and only
+    # then starts journal-N+1, so a crash at any point leaves a complete
+    # generation behind.
+    #
+    # Every running instance journals into its own session directory,
+    # locked for as long as it runs. Recovery is only offered from
+    # sessions whose lock is free: their instance crashed.
+
+    def __init__(self, parent=None, directory=None):
+        super().__init__(parent)
+        self.root = directory or recovery_directory()
+        self.directory = os.path.join(self.root, f'{SESSION_PREFIX}{os.getpid()}-{time.time_ns()}')
+        self.lock = session_lock(self.directory)
+        self.lock.tryLock(0)
+        os.makedirs(self.directory, exist_ok=True)
+        self.recovered_session = None  # (directory, lock) of a crashed session, see find_recovery
+        self.document = None
+        self.file_path = None
+        self.generation = 0  # The session directory is new
+        self.journal_file = None
+        self.pending = []  # Serialized changes not yet written
+        self.op_count = 0
+        self.byte_count = 0
+        self.compact_worker = None
+
+        self.flush_timer = QTimer(self)
+        self.flush_timer.setSingleShot(True)
+        self.flush_timer.setInterval(FLUSH_INTERVAL_MS)
+        self.flush_timer.timeout.connect(self.flush)
+
+    def generations(self, directory=None):
+        found = []
+        for name in os.listdir(directory or self.directory):
+            match = JOURNAL_PATTERN.match(name)
+            if match:
+                found.append(int(match.group(1)))
+        return found
+
+    def journal_path(self, generation, directory=None):
+        return os.path.join(directory or self.directory, f'journal-{generation}.log')
+
+    def snapshot_path(self, generation):
+        return os.path.join(self.directory, f'snapshot-{generation}.txt')
+
+    def attach(self, document):
+        self.detach()
+        self.document = document
+        self.document.contentsChange.connect(self.record_change)
+
+    def detach(self):
+        self.finish_compaction()  # Its snapshot is of the document being detached
+        if self.document is not None:
+            self.document.contentsChange.disconnect(self.record_change)
+            self.document = None
+
+    def record_change(self, position, removed, added):
+        # Qt may count the final paragraph separator, so clamp to the document
+        end = min(position + added, self.document.characterCount() - 1)
+        cursor = QTextCursor(self.document)
+        cursor.setPosition(position)
+        cursor.setPosition(max(position, end), QTextCursor.MoveMode.KeepAnchor)
+        text = cursor.selectedText().replace('\u2029', '\n')
+
+        line = json.dumps([position, removed, text], ensure_ascii=False) + '\n'
+        self.pending.append(line)
+        self.op_count += 1
+        self.byte_count += len(line)
+        if self.op_count >= COMPACT_OPS or self.byte_count >= COMPACT_BYTES:
+            self.compact(modified=True)
+        elif not self.flush_timer.isActive():
+            self.flush_timer.start()
+
+    def flush(self):
+        # While a compaction is running the changes belong to the next
+        # generation, so they wait in memory until its journal exists.
+        if self.compact_worker or self.journal_file is None or not self.pending:
+            return
+        self.journal_file.write(''.join(self.pending))
+        self.journal_file.flush()
+        self.pending = []
+
+    def reset(self, file_path, modified):
+        # Start over from the current document, e.g. after open or save
+        self.finish_compaction()  # Otherwise it is skipped and the old generation stays current
+        self.file_path = file_path
+        self.compact(modified)
+
+    def compact(self, modified):
+        if self.compact_worker or self.document is None:
+            return
+        self.flush()
+        self.pending = []
+        self.op_count = 0
+        self.byte_count = 0
+        generation = self.generation + 1
+        self.compact_worker = SaveWorker(self.snapshot_path(generation), self.document.toPlainText(), self)
+        self.compact_worker.saved.connect(lambda _: self.start_generation(generation, modified))
+        self.compact_worker.save_failed.connect(self.abandon_compaction)
+        self.compact_worker.finished.connect(self.compact_worker.deleteLater)
+        self.compact_worker.start()
+
+    def finish_compaction(self):
+        # Wait for a running compaction and take its result now
+        if self.compact_worker:
+            self.compact_worker.wait()
+            QCoreApplication.sendPostedEvents()  # Delivers its queued saved / save_failed
+            if self.compact_worker:  # Ended without either
+                self.abandon_compaction()
+
+    def abandon_compaction(self):
+        # The old generation is still complete; keep appending to it
+        self.compact_worker = None
+        self.flush()
+
+    def start_generation(self, generation, modified):
+        header = {'snapshot': os.path.basename(self.snapshot_path(generation)),
+                  'file': self.file_path, 'modified': modified}
+        with open(self.journal_path(generation), 'w', encoding='utf-8') as file:
+            file.write(json.dumps(header) + '\n')
+            file.flush()
+            os.fsync(file.fileno())
+        if self.journal_file:
+            self.journal_file.close()
+        self.journal_file = open(self.journal_path(generation), 'a', encoding='utf-8')
+        self.generation = generation
+        self.compact_worker = None
+        self.remove_generations(below=generation)
+        self.release_recovery()  # A restored text is now safe in this session
+        self.flush()
+
+    def remove_generations(self, below=None):
+        for name in os.listdir(self.directory):
+            match = re.match(r'(?:journal|snapshot)-(\d+)\.(?:log|txt)$', name)
+            if match and (below is None or int(match.group(1)) < below):
+                try:
+                    os.remove(os.path.join(self.directory, name))
+                except OSError:
+                    pass
+
+    def discard(self):
+        # Clean exit: nothing to recover next time
+        self.flush_timer.stop()
+        self.finish_compaction()  # Not a generation written after the directory is gone
+        if self.journal_file:
+            self.journal_file.close()
+            self.journal_file = None
+        self.pending = []
+        self.release_recovery()
+        shutil.rmtree(self.directory, ignore_errors=True)
+        self.lock.unlock()
+
+    def crashed_sessions(self):
+        # Session directories of instances that are no longer running,
+        # newest first, each with its lock now held by this instance
+        sessions = []
+        for name in os.listdir(self.root):
+            path = os.path.join(self.root, name)
+            if not name.startswith(SESSION_PREFIX) or path == self.directory or not os.path.isdir(path):
+                continue
+            lock = session_lock(path)
+            if lock.tryLock(0):
+                sessions.append((os.path.getmtime(path), path, lock))
+        sessions.sort(key=lambda session: session[0], reverse=True)
+        return [(path, lock) for _, path, lock in sessions]
+
+    def find_recovery(self):
+        # Returns (text, file_path) when a crashed instance left unsaved
+        # work. One session is offered per start; other crashed sessions
+        # with unsaved work stay for the next one, empty ones are removed.
+        found = None
+        for directory, lock in self.crashed_sessions():
+            recovered = None if found else self.read_recovery(directory)
+            if recovered:
+                found = recovered
+                self.recovered_session = directory, lock
+            elif found and self.read_recovery(directory):
+                lock.unlock()
+            else:
+                shutil.rmtree(directory, ignore_errors=True)
+                lock.unlock()
+        return found
+
+    def release_recovery(self):
+        # The offered session, restored into this one or declined
+        if self.recovered_session:
+            directory, lock = self.recovered_session
+            self.recovered_session = None
+            shutil.rmtree(directory, ignore_errors=True)
+            lock.unlock()
+
+    def read_recovery(self, directory):
+        for generation in sorted(self.generations(directory), reverse=True):
+            try:
+                with open(self.journal_path(generation, directory), encoding='utf-8') as file:
+                    header = json.loads(file.readline())
+                    changes = []
+                    for line in file:
+                        try:
+                            changes.append(json.loads(line))
+                        except ValueError:
+                            break  # Baris terakhir terpotong saat crash
+                with open(os.path.join(directory, header['snapshot']), encoding='utf-8', newline='') as file:
+                    snapshot = file.read()
+            except (OSError, ValueError, KeyError):
+                continue
+            if not changes and not header.get('modified'):
+                return None
+            return self.replay(snapshot, changes), header.get('file')
+        return None
+
+    def replay(self, snapshot, changes):
+        # Positions are QTextDocument positions, so replay on a QTextDocument
+        document = QTextDocument()
+        document.setPlainText(snapshot)
+        cursor = QTextCursor(document)
+        for position, removed, text in changes:
+            last = document.characterCount() - 1
+            cursor.setPosition(min(position, last))
+            cursor.setPosition(min(position + removed, last), QTextCursor.MoveMode.KeepAnchor)
+            cursor.insertText(text)
+        return document.toPlainText()
@@ -0,0 +1,114 @@
+import argparse
+import json
+import socket
+import statistics
+import sys
+import time
+
+from remote_control import DEFAULT_HOST, DEFAULT_PORT, LATENCY_TARGET_MS
+
+# Test client for the remote control server, e.g.
+#   python remote_client.py play
+#   python remote_client.py speed delta=-5
+#   python remote_client.py jump lines=3
+#   python remote_client.py --latency 200
+# Without a command it reads one command per line from stdin.
+
+
+def parse_value(text):
+    try:
+        return json.loads(text)
+    except ValueError:
+        return text
+
+
+def build_request(words, request_id):
+    request = {'id': request_id, 'cmd': words[0]}
+    for word in words[1:]:
+        key, _, value = word.partition('=')
+        request[key] = parse_value(value)
+    return request
+
+
+class RemoteClient:
+    def __init__(self, host=DEFAULT_HOST, port=DEFAULT_PORT, timeout=5.0):
+        self.socket = socket.create_connection((host, port), timeout=timeout)
+        self.socket.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)  # Latensi, bukan throughput
+        self.reader = self.socket.makefile('r', encoding='utf-8')
+        self.next_id = 1
+
+    def send(self, words):
+        request = build_request(words, self.next_id)
+        self.next_id += 1
+        self.socket.sendall(json.dumps(request).encode('utf-8') + b'\n')
+        line = self.reader.readline()
+        if not line:
+            raise ConnectionError("server closed the connection")
+        return json.loads(line)
+
+    def close(self):
+        self.reader.close()
+        self.socket.close()
+
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+def measure_latency(client, count, words):
+    round_trips = []
+    frames = []
+    for _ in range(count):
+        start = time.perf_counter()
+        response = client.send(words)
+        round_trips.append((time.perf_counter() - start) * 1000)
+        if not response.get('ok'):
+            print(f"error: {response.get('error')}", file=sys.stderr)
+            return 1
+        frame = response['latency_ms']['frame']
+        if frame is not None:
+            frames.append(frame)
+
+    print(f"round trip  p50 {percentile(round_trips, 0.5):.2f}  p95 {percentile(round_trips, 0.95):.2f}"
+          f"  mean {statistics.fmean(round_trips):.2f} ms")
+    if not frames:
+        print("no frames painted; is the teleprompter screen open and visible?")
+        return 1
+    p95 = percentile(frames, 0.95)
+    print(f"to frame    p50 {percentile(frames, 0.5):.2f}  p95 {p95:.2f}  max {max(frames):.2f} ms"
+          f"  ({len(frames)}/{count} painted)")
+    print(f"target p95 <= {LATENCY_TARGET_MS} ms: {'ok' if p95 <= LATENCY_TARGET_MS else 'MISSED'}")
+    return 0 if p95 <= LATENCY_TARGET_MS else 1
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Send commands to the teleprompter remote control server")
+    parser.add_argument('--host', default=DEFAULT_HOST)
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT)
+    parser.add_argument('--latency', type=int, metavar='N', help="send the command N times and report latency")
+    parser.add_argument('command', nargs='*', help="command and key=value arguments")
+    args = parser.parse_args()
+
+    try:
+        client = RemoteClient(args.host, args.port)
+    except OSError as error:
+        print(f"cannot connect to {args.host}:{args.port}: {error}", file=sys.stderr)
+        return 1
+
+    try:
+        if args.latency:
+            return measure_latency(client, args.latency, args.command or ['status'])
+        if args.command:
+            print(json.dumps(client.send(args.command), indent=2))
+            return 0
+        for line in sys.stdin:
+            if line.strip():
+                print(json.dumps(client.send(line.split())))
+        return 0
+    finally:
+        client.close()
+
+
+if __name__ == '__main__':
+    sys.exit(main())
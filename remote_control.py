@@ -0,0 +1,151 @@
+import asyncio
+import json
+import threading
+import time
+
+from PyQt6.QtCore import QObject, pyqtSignal
+
+DEFAULT_HOST = '127.0.0.1'  # Hanya localhost: tidak ada autentikasi
+DEFAULT_PORT = 8765
+COMMAND_TIMEOUT_S = 2.0
+MAX_LINE_BYTES = 64 * 1024
+LATENCY_TARGET_MS = 50  # Command received -> first frame painted with it, ~3 frames at 60 Hz
+
+
+class RemoteCommand:
+    # One request line. Created on the server thread, handled on the GUI
+    # thread, answered with reply()/fail() from there.
+
+    def __init__(self, request, loop, future):
+        self.id = request.get('id')
+        self.name = request.get('cmd', '')
+        self.args = request
+        self.received = time.perf_counter()
+        self.loop = loop
+        self.future = future
+
+    def reply(self, result):
+        self.loop.call_soon_threadsafe(self._resolve, result)
+
+    def fail(self, message):
+        self.reply({'ok': False, 'error': message})
+
+    def _resolve(self, result):
+        if not self.future.done():
+            self.future.set_result(result)
+
+
+def parse_request(line):
+    # JSON objects, or a bare word ("play") for the simplest pedal scripts
+    line = line.strip()
+    if line.startswith('{'):
+        request = json.loads(line)
+        if not isinstance(request, dict):
+            raise ValueError("request must be a JSON object")
+        return request
+    return {'cmd': line}
+
+
+class RemoteControlServer(QObject):
+    # Newline-delimited JSON over TCP, served by asyncio on its own thread so
+    # a slow or stuck client can never stall the Qt event loop. Commands
+    # reach the GUI thread through the queued command_received signal.
+
+    command_received = pyqtSignal(object)  # RemoteCommand
+    client_count_changed = pyqtSignal(int)
+
+    def __init__(self, host=DEFAULT_HOST, port=DEFAULT_PORT, parent=None):
+        super().__init__(parent)
+        self.host = host
+        self.port = port
+        self.loop = None
+        self.server = None
+        self.thread = None
+        self.clients = set()
+
+    def is_running(self):
+        return self.thread is not None
+
+    def start(self):
+        # Raises OSError when the port cannot be bound
+        started = threading.Event()
+        errors = []
+
+        def run():
+            self.loop = asyncio.new_event_loop()
+            try:
+                self.server = self.loop.run_until_complete(
+                    asyncio.start_server(self.handle_client, self.host, self.port, limit=MAX_LINE_BYTES))
+            except OSError as error:
+                errors.append(error)
+                self.loop.close()
+                started.set()
+                return
+            self.port = self.server.sockets[0].getsockname()[1]  # Port 0: pilih port bebas
+            started.set()
+            self.loop.run_forever()
+            self.loop.run_until_complete(self.loop.shutdown_asyncgens())
+            self.loop.close()
+
+        self.thread = threading.Thread(target=run, name='remote-control', daemon=True)
+        self.thread.start()
+        started.wait()
+        if errors:
+            self.thread.join()
+            self.thread = None
+            raise errors[0]
+
+    def stop(self):
+        if not self.thread:
+            return
+        self.loop.call_soon_threadsafe(self.shutdown)
+        self.thread.join()
+        self.thread = None
+        self.clients.clear()
+
+    def shutdown(self):
+        self.server.close()
+        for writer in list(self.clients):
+            writer.close()
+        self.loop.stop()
+
+    async def handle_client(self, reader, writer):
+        self.clients.add(writer)
+        self.client_count_changed.emit(len(self.clients))
+        try:
+            while True:
+                try:
+                    line = await reader.readline()
+                except (ValueError, ConnectionError):
+                    break  # Baris terlalu panjang atau koneksi putus
+                if not line:
+                    break
+                response = await self.dispatch(line.decode('utf-8', 'replace'))
+                if response is None:
+                    continue
+                writer.write(json.dumps(response).encode('utf-8') + b'\n')
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            self.clients.discard(writer)
+            self.client_count_changed.emit(len(self.clients))
+            writer.close()
+
+    async def dispatch(self, line):
+        if not line.strip():
+            return None
+        try:
+            request = parse_request(line)
+        except ValueError as error:
+            return {'ok': False, 'error': f"invalid request: {error}"}
+
+        command = RemoteCommand(request, self.loop, self.loop.create_future())
+        self.command_received.emit(command)
+        try:
+            response = await asyncio.wait_for(command.future, COMMAND_TIMEOUT_S)
+        except asyncio.TimeoutError:
+            response = {'ok': False, 'error': "timed out waiting for the GUI"}
+        if command.id is not None:
+            response['id'] = command.id
+        return response
@@ -0,0 +1,189 @@
+import hashlib
+import json
+import os
+import tempfile
+from array import array
+
+from PyQt6.QtCore import QThread, QStandardPaths, QT_VERSION_STR
+
+from file_saver import atomic_write
+
+CACHE_VERSION = 1  # Naikkan bila format entri berubah; entri lama tidak akan cocok lagi
+SCRIPT_CACHE_MB = 128
+ENTRY_SUFFIX = '.script'
+
+
+def script_cache_directory():
+    base = QStandardPaths.writableLocation(QStandardPaths.StandardLocation.CacheLocation) or tempfile.gettempdir()
+    return os.path.join(base, 'scripts')
+
+
+def script_key(text):
+    # Content hash of the script text: an edited or replaced source file
+    # simply hashes to a different key
+    hasher = ScriptHasher()
+    hasher.update(text)
+    return hasher.key()
+
+
+class ScriptHasher:
+    # script_key of a text that arrives in pieces, e.g. from copy_document
+
+    def __init__(self):
+        self.hash = hashlib.blake2b(digest_size=16)
+
+    def update(self, text):
+        self.hash.update(text.encode('utf-8', 'surrogatepass'))
+
+    def key(self):
+        return self.hash.hexdigest()
+
+
+def layout_key(document):
+    # Everything the block heights depend on: font (incl. size), wrap width,
+    # margin, and the Qt version that laid the text out
+    return (f"{document.defaultFont().key()}|{document.textWidth()}|"
+            f"{document.documentMargin()}|{QT_VERSION_STR}")
+
+
+class CompiledScript:
+    # What a full pass over a laid-out script produces: word counts and
+    # heights per block (WordIndex), cue block numbers (CueIndex) and the
+    # document height (TileCache)
+
+    def __init__(self, words, cues, top, heights, document_height):
+        self.words = words
+        self.cues = cues
+        self.top = top
+        self.heights = heights
+        self.document_height = document_height
+
+    def block_count(self):
+        return len(self.words)
+
+    def encode(self, script, layout):
+        # A JSON header line followed by the raw arrays
+        words = array('I', self.words)
+        cues = array('I', self.cues)
+        heights = array('d', self.heights)
+        header = {
+            'version': CACHE_VERSION,
+            'script': script,
+            'layout': layout,
+            'blocks': len(words),
+            'cues': len(cues),
+            'top': self.top,
+            'document_height': self.document_height,
+        }
+        return b''.join([json.dumps(header).encode('utf-8'), b'\n',
+                         words.tobytes(), cues.tobytes(), heights.tobytes()])
+
+    @classmethod
+    def decode(cls, data, script, layout):
+        # None unless the entry is complete and really is (script, layout)
+        header_end = data.index(b'\n')
+        header = json.loads(data[:header_end])
+        if (header.get('version') != CACHE_VERSION or header.get('script') != script
+                or header.get('layout') != layout):
+            return None
+        blocks = header['blocks']
+        words, cues, heights = array('I'), array('I'), array('d')
+        offset = header_end + 1
+        for values, count in ((words, blocks), (cues, header['cues']), (heights, blocks)):
+            end = offset + count * values.itemsize
+            if end > len(data):
+                return None
+            values.frombytes(data[offset:end])
+            offset = end
+        if offset != len(data):
+            return None
+        return cls(words.tolist(), cues.tolist(), header['top'], heights.tolist(), header['document_height'])
+
+
+class ScriptCache:
+    # Compiled scripts on disk, one file per (script content, layout). The
+    # modification time doubles as the LRU clock: a hit touches the file,
+    # and after every store the oldest entries go until the directory fits
+    # the budget. Entries are only ever replaced whole (atomic_write), so a
+    # reader sees a complete old or new file; anything unreadable is a miss.
+
+    def __init__(self, directory=None, budget_mb=SCRIPT_CACHE_MB):
+        self.directory = directory or script_cache_directory()
+        self.budget_bytes = budget_mb * 1024 * 1024
+
+    def entry_path(self, script, layout):
+        name = hashlib.blake2b(f"{script}|{layout}".encode('utf-8'), digest_size=16).hexdigest()
+        return os.path.join(self.directory, name + ENTRY_SUFFIX)
+
+    def contains(self, script, layout):
+        return os.path.exists(self.entry_path(script, layout))
+
+    def load(self, script, layout):
+        path = self.entry_path(script, layout)
+        try:
+            with open(path, 'rb') as file:
+                compiled = CompiledScript.decode(file.read(), script, layout)
+            if compiled is not None:
+                os.utime(path)  # Baru dipakai: paling akhir dibuang
+        except (OSError, ValueError, KeyError, TypeError):
+            return None
+        return compiled
+
+    def store(self, script, layout, compiled):
+        os.makedirs(self.directory, exist_ok=True)
+        atomic_write(self.entry_path(script, layout), compiled.encode(script, layout))
+        self.evict()
+
+    def entries(self):
+        # [(mtime, size, path)] oldest first
+        found = []
+        try:
+            with os.scandir(self.directory) as scan:
+                for entry in scan:
+                    if entry.name.endswith(ENTRY_SUFFIX):
+                        try:
+                            stat = entry.stat()
+                        except OSError:
+                            continue  # Removed meanwhile by another instance
+                        found.append((stat.st_mtime, stat.st_size, entry.path))
+        except FileNotFoundError:
+            pass  # Nothing stored yet
+        found.sort()
+        return found
+
+    def evict(self):
+        entries = self.entries()
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in entries:
+            if total <= self.budget_bytes:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            total -= size
+
+    def clear(self):
+        for _, _, path in self.entries():
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+
+class CacheWriter(QThread):
+    # Encodes and stores one compiled script off the GUI thread; the cache
+    # is only an optimisation, so failures are dropped
+
+    def __init__(self, cache, script, layout, compiled, parent=None):
+        super().__init__(parent)
+        self.cache = cache
+        self.script = script
+        self.layout = layout
+        self.compiled = compiled
+
+    def run(self):
+        try:
+            self.cache.store(self.script, self.layout, self.compiled)
+        except OSError:
+            pass
@@ -0,0 +1,162 @@
+import codecs
+import io
+import mmap
+import os
+import re
+
+from PyQt6.QtCore import QThread, QSemaphore, pyqtSignal
+
+from file_saver import file_signature
+
+CHUNK_SIZE = 64 * 1024
+SNIFF_SIZE = 64 * 1024
+FALLBACK_ENCODING = 'cp1252'
+MAX_PENDING_CHUNKS = 4  # Chunks emitted but not yet inserted by the GUI thread
+
+# UTF-32 LE BOM starts with the UTF-16 LE one, so it has to be checked first
+BOMS = [
+    (codecs.BOM_UTF32_LE, 'utf-32'),
+    (codecs.BOM_UTF32_BE, 'utf-32'),
+    (codecs.BOM_UTF8, 'utf-8-sig'),
+    (codecs.BOM_UTF16_LE, 'utf-16'),
+    (codecs.BOM_UTF16_BE, 'utf-16'),
+]
+
+# Codec that writes the text after a BOM without adding one of its own
+BOM_CODECS = {
+    codecs.BOM_UTF32_LE: 'utf-32-le',
+    codecs.BOM_UTF32_BE: 'utf-32-be',
+    codecs.BOM_UTF8: 'utf-8',
+    codecs.BOM_UTF16_LE: 'utf-16-le',
+    codecs.BOM_UTF16_BE: 'utf-16-be',
+}
+NEWLINE_NAMES = {'\r\n': 'CRLF', '\r': 'CR'}
+LINE_BREAK = re.compile('\r\n|\r|\n')
+
+
+class TextFormat:
+    # How a script file is stored: its encoding, byte order mark and line
+    # ending. The editor only ever sees '\n', so saving goes through
+    # encode() to write the same kind of file that was read.
+
+    def __init__(self, encoding='utf-8', bom=b'', newline='\n'):
+        self.encoding = encoding
+        self.bom = bom
+        self.newline = newline
+
+    def __str__(self):
+        return self.encoding if self.newline == '\n' else f"{self.encoding}, {NEWLINE_NAMES[self.newline]}"
+
+    def encode(self, text):
+        if self.newline != '\n':
+            text = text.replace('\n', self.newline)
+        return self.bom + text.encode(BOM_CODECS.get(self.bom, self.encoding))
+
+
+def detect_encoding(data):
+    for bom, encoding in BOMS:
+        if data[:len(bom)] == bom:
+            return encoding
+
+    sample = bytes(data[:SNIFF_SIZE])
+    try:
+        # final=False so a multi-byte character cut at the sample edge is not an error
+        codecs.getincrementaldecoder('utf-8')().decode(sample, final=len(data) <= SNIFF_SIZE)
+        return 'utf-8'
+    except UnicodeDecodeError:
+        pass
+
+    # UTF-16 without BOM: ASCII text leaves every other byte zero
+    if sample and sample.count(b'\x00') * 3 > len(sample):
+        return 'utf-16-le' if sample[1::2].count(0) > sample[0::2].count(0) else 'utf-16-be'
+    return FALLBACK_ENCODING
+
+
+def detect_text_format(data, encoding=None):
+    encoding = encoding or detect_encoding(data)
+    bom = next((bom for bom, name in BOMS if name == encoding and data[:len(bom)] == bom), b'')
+    # The first line break in the sample decides; a file without one gets '\n'
+    sample = codecs.decode(bytes(data[:SNIFF_SIZE]), encoding, errors='replace')
+    line_break = LINE_BREAK.search(sample)
+    return TextFormat(encoding, bom, line_break.group() if line_break else '\n')
+
+
+def make_decoder(encoding):
+    # Bad bytes become U+FFFD instead of aborting the whole import; newlines
+    # are translated to '\n' like open(..., 'r') does.
+    decoder = codecs.getincrementaldecoder(encoding)(errors='replace')
+    return io.IncrementalNewlineDecoder(decoder, translate=True)
+
+
+def iter_file_chunks(file_path, encoding=None, chunk_size=CHUNK_SIZE):
+    # Yields (text_format, text, bytes_done, bytes_total) per chunk of the file
+    with open(file_path, 'rb') as file:
+        total = os.fstat(file.fileno()).st_size
+        if total == 0:
+            yield TextFormat(encoding or 'utf-8'), '', 0, 0
+            return
+
+        with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            text_format = detect_text_format(data, encoding)
+            decoder = make_decoder(text_format.encoding)
+            for start in range(0, total, chunk_size):
+                end = min(start + chunk_size, total)
+                text = decoder.decode(data[start:end], final=end == total)
+                yield text_format, text, end, total
+
+
+def read_text_file(file_path, encoding=None):
+    # Returns (text, text_format)
+    parts = []
+    for text_format, text, _, _ in iter_file_chunks(file_path, encoding):
+        parts.append(text)
+    return ''.join(parts), text_format
+
+
+def read_text_format(file_path):
+    # The format of a file on disk without decoding all of it
+    with open(file_path, 'rb') as file:
+        return detect_text_format(file.read(SNIFF_SIZE))
+
+
+class ScriptLoader(QThread):
+    encoding_detected = pyqtSignal(str)
+    chunk_loaded = pyqtSignal(str)
+    progress_changed = pyqtSignal(int)  # 0-100
+    load_failed = pyqtSignal(str)
+
+    def __init__(self, file_path, parent=None):
+        super().__init__(parent)
+        self.file_path = file_path
+        self.text_format = None
+        self.signature = None  # file_signature before reading, to notice writes during the import
+        self.pending_chunks = QSemaphore(MAX_PENDING_CHUNKS)
+
+    def chunk_consumed(self):
+        # Dipanggil dari GUI thread setelah satu chunk dimasukkan ke editor
+        self.pending_chunks.release()
+
+    def cancel(self):
+        self.requestInterruption()
+        self.pending_chunks.release(MAX_PENDING_CHUNKS)
+
+    def run(self):
+        self.signature = file_signature(self.file_path)
+        try:
+            for text_format, text, done, total in iter_file_chunks(self.file_path):
+                if self.text_format is None:
+                    self.text_format = text_format
+                    self.encoding_detected.emit(str(text_format))
+                # Back-pressure: never run more than a few chunks ahead of the GUI
+                while not self.pending_chunks.tryAcquire(1, 50):
+                    if self.isInterruptionRequested():
+                        return
+                if self.isInterruptionRequested():
+                    return
+                if text:
+                    self.chunk_loaded.emit(text)
+                else:
+                    self.pending_chunks.release()
+                self.progress_changed.emit(int(done * 100 / total) if total else 100)
+        except (OSError, ValueError) as error:
+            self.load_failed.emit(str(error))
@@ -0,0 +1,183 @@
+import time
+
+from PyQt6.QtWidgets import QTextEdit
+from PyQt6.QtCore import QRectF, pyqtSignal
+from PyQt6.QtGui import QPainter, QPalette, QAbstractTextDocumentLayout, QFontMetricsF
+
+from speed_profile import SpeedProfile, SpeedCurve
+
+FRAME_INTERVAL_MS = 16  # ~60 fps; the position comes from the clock, not from this interval
+
+SCROLL_MODE_SMOOTH = 'smooth'  # time-based; sub-pixel motion in the tiled render mode
+SCROLL_MODE_TICK = 'tick'  # legacy: 1 px per timer tick, interval 1000 // speed
+
+SPEED_UNIT_PIXELS = 'px'
+SPEED_UNIT_LINES = 'lines'
+SPEED_UNIT_WORDS = 'wpm'  # Converted with the script's word density, see WordIndex
+
+
+def pixels_per_second(speed, unit, font):
+    if unit == SPEED_UNIT_LINES:
+        return speed * QFontMetricsF(font).lineSpacing()
+    return float(speed)
+
+
+def speed_in_unit(pixels, unit, font):
+    # Inverse of pixels_per_second
+    if unit == SPEED_UNIT_LINES:
+        return pixels / QFontMetricsF(font).lineSpacing()
+    return float(pixels)
+
+
+class ScrollEngine:
+    # Scroll position as a function of time. The speed comes from a
+    # SpeedProfile (one speed, or one per section); every change of profile,
+    # ramp or position is turned into a SpeedCurve from the current position
+    # and velocity, so the velocity eases into the new target instead of
+    # stepping to it.
+
+    def __init__(self, speed=50.0, clock=time.perf_counter, ramp=0.0):
+        self.clock = clock
+        self.speed = float(speed)  # pixels per second (base speed of the profile)
+        self.profile = SpeedProfile.flat(self.speed)
+        self.ramp = float(ramp)  # seconds per speed change, 0 = instant
+        self.maximum = 0.0
+        self.position = 0.0
+        self.running = False
+        self._anchor_time = 0.0
+        self._curve = None
+
+    def _reanchor(self, now, velocity=None):
+        # velocity None: at the target speed at once
+        self._anchor_time = now
+        self._curve = SpeedCurve(self.profile, self.position, velocity, self.ramp, self.maximum)
+
+    def start(self):
+        self.running = True
+        self._reanchor(self.clock(), 0.0 if self.ramp > 0 else None)  # Mulai dari diam, tanpa sentakan
+
+    def pause(self):
+        if self.running:
+            self.position = self._position_at(self.clock())
+            self.running = False
+
+    def _pin(self):
+        # Fix the position at the current time before the curve changes;
+        # returns (now, velocity), velocity None while paused
+        now = self.clock()
+        if not self.running:
+            return now, None
+        velocity = self._velocity_at(now)
+        self.position = self._position_at(now)
+        return now, velocity
+
+    def set_speed(self, speed):
+        self.speed = float(speed)
+        self.set_profile(SpeedProfile.flat(self.speed))
+
+    def set_profile(self, profile):
+        now, velocity = self._pin()
+        self.profile = profile
+        if self.running:
+            self._reanchor(now, velocity)
+
+    def set_ramp(self, ramp):
+        now, velocity = self._pin()
+        self.ramp = max(0.0, float(ramp))
+        if self.running:
+            self._reanchor(now, velocity)
+
+    def set_maximum(self, maximum):
+        maximum = max(0.0, float(maximum))
+        if maximum == self.maximum:
+            return
+        now, velocity = self._pin()
+        self.maximum = maximum
+        self.position = min(self.position, maximum)
+        if self.running:
+            self._reanchor(now, velocity)  # Sections past the old end may be reachable now
+
+    def set_position(self, position):
+        now, velocity = self._pin()
+        self.position = min(max(0.0, float(position)), self.maximum)
+        if self.running:
+            self._reanchor(now, velocity)
+
+    def _position_at(self, now):
+        # Computed from the anchor every frame, so timer jitter or a busy GUI
+        # thread never accumulates into drift.
+        position = self._curve.position_at(now - self._anchor_time)
+        return min(max(0.0, position), self.maximum)
+
+    def _velocity_at(self, now):
+        if self._position_at(now) >= self.maximum:
+            return 0.0
+        return self._curve.velocity_at(now - self._anchor_time)
+
+    def velocity(self):
+        # Current speed in px/s, 0 while paused
+        return self._velocity_at(self.clock()) if self.running else 0.0
+
+    def target_speed(self):
+        return self.profile.speed_at(self.position)
+
+    def advance(self):
+        if self.running:
+            self.position = self._position_at(self.clock())
+        return self.position
+
+    def at_end(self):
+        return self.position >= self.maximum
+
+
+class SmoothTextEdit(QTextEdit):
+    # QTextEdit for the live render mode. The position keeps its fraction
+    # for the scroll engine, but text is drawn on whole pixels (glyphs are
+    # placed on the pixel grid vertically anyway), so it scrolls by blitting
+    # and only paints the rows that scroll in. Sub-pixel motion is the
+    # tiled view's job, see TileCache.draw.
+
+    painted = pyqtSignal()  # After every frame, e.g. for input-to-frame latency
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.fractional_offset = 0.0
+        self.last_paint_time = 0.0  # Seconds spent in the last paintEvent
+
+    def scroll_position(self):
+        return self.verticalScrollBar().value() + self.fractional_offset
+
+    def maximum_scroll(self):
+        return self.verticalScrollBar().maximum()
+
+    def set_scroll_position(self, position):
+        whole = int(position)
+        self.fractional_offset = position - whole
+        scrollbar = self.verticalScrollBar()
+        if scrollbar.value() != whole:
+            scrollbar.setValue(whole)  # QTextEdit blits and exposes the new rows
+
+    def paintEvent(self, event):
+        start = time.perf_counter()
+        painter = QPainter(self.viewport())
+        offset_x = self.horizontalScrollBar().value()
+        offset_y = self.verticalScrollBar().value()
+        painter.translate(-offset_x, -offset_y)
+
+        rect = QRectF(event.rect()).translated(offset_x, offset_y)
+        context = QAbstractTextDocumentLayout.PaintContext()
+        context.palette = self.palette()
+        context.clip = rect
+
+        cursor = self.textCursor()
+        if cursor.hasSelection():
+            selection = QAbstractTextDocumentLayout.Selection()
+            selection.cursor = cursor
+            selection.format.setBackground(self.palette().brush(QPalette.ColorRole.Highlight))
+            selection.format.setForeground(self.palette().brush(QPalette.ColorRole.HighlightedText))
+            context.selections = [selection]
+
+        self.document().documentLayout().draw(painter, context)
+        painter.end()
+        self.last_paint_time = time.perf_counter() - start
+        self.painted.emit()
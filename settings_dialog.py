@@ -1,14 +1,46 @@
-from PyQt6.QtWidgets import QDialog, QFormLayout, QFontComboBox, QSpinBox, QPushButton
-from PyQt6.QtCore import pyqtSignal
+from PyQt6.QtWidgets import (QDialog, QFormLayout, QSpinBox, QDoubleSpinBox, QComboBox, QPushButton,
+                             QHBoxLayout, QInputDialog, QMessageBox)
+from PyQt6.QtCore import QTimer, pyqtSignal
 from PyQt6.QtGui import QFont
 
+from scroll_engine import SCROLL_MODE_SMOOTH, SCROLL_MODE_TICK, SPEED_UNIT_PIXELS, SPEED_UNIT_LINES, SPEED_UNIT_WORDS
+from speed_profile import DEFAULT_SPEED_RAMP, SPEED_LIMITS
+from settings_store import (DEFAULT_PRELOAD_COUNT, DEFAULT_PRELOAD_MB, DEFAULT_STALL_THRESHOLD_MS, RENDER_MODE_TILED,
+                            RENDER_MODE_LIVE, same_value)
+from font_catalogue import FontFamilyComboBox
+
+LIVE_APPLY_DELAY_MS = 300  # Quiet time after the last edit before it is applied
+
 class SettingsDialog(QDialog):
+    # Kept open next to the prompter: edits are applied live, after
+    # LIVE_APPLY_DELAY_MS so that stepping through fonts or typing a number
+    # relayouts the script once rather than per step. Only the fields that
+    # were edited are sent: the spin boxes clamp values the remote or the
+    # nudge keys may set, and an untouched field must not overwrite them.
     settings_changed = pyqtSignal(dict)
 
-    def __init__(self, parent=None, settings=None):
+    def __init__(self, parent=None, settings=None, store=None, convert_speed=None):
         super().__init__(parent)
         self.current_settings = settings or {}
+        self.store = store  # SettingsStore untuk preset presenter
+        # (speed, from_unit, to_unit) -> speed or None; keeps the scroll
+        # speed when only the unit changes instead of reusing the number
+        self.convert_speed = convert_speed
+        self.speed_unit = self.current_settings.get('speed_unit', SPEED_UNIT_PIXELS)  # Unit the speed field is in
+        self.apply_timer = QTimer(self)
+        self.apply_timer.setSingleShot(True)
+        self.apply_timer.setInterval(LIVE_APPLY_DELAY_MS)
+        self.apply_timer.timeout.connect(self.apply_settings)
+        self.edited = set()  # Keys edited since the last apply
         self.initUI()
+        self.fields = [(self.font_selector, 'font'), (self.font_size_selector, 'font_size'),
+                       (self.speed_unit_selector, 'speed_unit'), (self.speed_selector, 'speed'),
+                       (self.speed_ramp_selector, 'speed_ramp'), (self.scroll_mode_selector, 'scroll_mode'),
+                       (self.render_mode_selector, 'render_mode'), (self.preload_count_selector, 'preload_count'),
+                       (self.preload_mb_selector, 'preload_mb'), (self.stall_threshold_selector, 'stall_threshold_ms')]
+        for widget, key in self.fields:
+            signal = widget.currentIndexChanged if isinstance(widget, QComboBox) else widget.valueChanged
+            signal.connect(lambda _, key=key: self.schedule_apply(key))
 
     def initUI(self):
         self.setWindowTitle("Settings")
@@ -16,7 +48,21 @@ class SettingsDialog(QDialog):
 
         layout = QFormLayout()
 
-        self.font_selector = QFontComboBox(self)
+        if self.store is not None:
+            self.preset_selector = QComboBox(self)
+            self.update_preset_list()
+            self.preset_selector.activated.connect(self.load_preset)
+            save_preset_button = QPushButton("Save...", self)
+            save_preset_button.clicked.connect(self.save_preset)
+            delete_preset_button = QPushButton("Delete", self)
+            delete_preset_button.clicked.connect(self.delete_preset)
+            preset_layout = QHBoxLayout()
+            preset_layout.addWidget(self.preset_selector, 1)
+            preset_layout.addWidget(save_preset_button)
+            preset_layout.addWidget(delete_preset_button)
+            layout.addRow("Preset:", preset_layout)
+
+        self.font_selector = FontFamilyComboBox(self)
         self.font_selector.setCurrentFont(self.current_settings.get('font', QFont("Arial")))
         layout.addRow("Font:", self.font_selector)
 
@@ -26,23 +72,190 @@ class SettingsDialog(QDialog):
         self.font_size_selector.setValue(self.current_settings.get('font_size', 48))
         layout.addRow("Font Size:", self.font_size_selector)
 
-        self.speed_selector = QSpinBox(self)
-        self.speed_selector.setMinimum(10)
-        self.speed_selector.setMaximum(200)
+        self.speed_unit_selector = QComboBox(self)
+        self.speed_unit_selector.addItem("Pixels / second", SPEED_UNIT_PIXELS)
+        self.speed_unit_selector.addItem("Lines / second", SPEED_UNIT_LINES)
+        self.speed_unit_selector.addItem("Words / minute", SPEED_UNIT_WORDS)
+        self.speed_unit_selector.setCurrentIndex(
+            self.speed_unit_selector.findData(self.current_settings.get('speed_unit', SPEED_UNIT_PIXELS)))
+        self.speed_unit_selector.currentIndexChanged.connect(self.change_speed_unit)
+        layout.addRow("Speed Unit:", self.speed_unit_selector)
+
+        self.speed_selector = QDoubleSpinBox(self)
+        self.update_speed_range()
         self.speed_selector.setValue(self.current_settings.get('speed', 50))
         layout.addRow("Scroll Speed:", self.speed_selector)
 
-        apply_button = QPushButton("Apply", self)
-        apply_button.clicked.connect(self.apply_settings)
-        layout.addWidget(apply_button)
+        # Detik untuk berpindah ke kecepatan baru (section, nudge); 0 = langsung
+        self.speed_ramp_selector = QDoubleSpinBox(self)
+        self.speed_ramp_selector.setDecimals(1)
+        self.speed_ramp_selector.setRange(0, 5)
+        self.speed_ramp_selector.setSingleStep(0.1)
+        self.speed_ramp_selector.setSuffix(" s")
+        self.speed_ramp_selector.setValue(self.current_settings.get('speed_ramp', DEFAULT_SPEED_RAMP))
+        layout.addRow("Speed Ramp:", self.speed_ramp_selector)
+
+        self.scroll_mode_selector = QComboBox(self)
+        self.scroll_mode_selector.addItem("Smooth (time-based)", SCROLL_MODE_SMOOTH)
+        self.scroll_mode_selector.addItem("Legacy (1 px per tick)", SCROLL_MODE_TICK)
+        self.scroll_mode_selector.setCurrentIndex(
+            self.scroll_mode_selector.findData(self.current_settings.get('scroll_mode', SCROLL_MODE_SMOOTH)))
+        layout.addRow("Scroll Engine:", self.scroll_mode_selector)
+
+        self.render_mode_selector = QComboBox(self)
+        self.render_mode_selector.addItem("Pre-rendered tiles", RENDER_MODE_TILED)
+        self.render_mode_selector.addItem("Live text (repaint every frame)", RENDER_MODE_LIVE)
+        self.render_mode_selector.setCurrentIndex(
+            self.render_mode_selector.findData(self.current_settings.get('render_mode', RENDER_MODE_TILED)))
+        layout.addRow("Render Mode:", self.render_mode_selector)
+
+        # Skrip berikutnya di rundown yang disiapkan lebih dulu, dan batas memorinya
+        self.preload_count_selector = QSpinBox(self)
+        self.preload_count_selector.setRange(0, 10)
+        self.preload_count_selector.setValue(self.current_settings.get('preload_count', DEFAULT_PRELOAD_COUNT))
+        layout.addRow("Preload Scripts:", self.preload_count_selector)
+
+        self.preload_mb_selector = QSpinBox(self)
+        self.preload_mb_selector.setRange(16, 8192)
+        self.preload_mb_selector.setSingleStep(64)
+        self.preload_mb_selector.setSuffix(" MB")
+        self.preload_mb_selector.setValue(self.current_settings.get('preload_mb', DEFAULT_PRELOAD_MB))
+        layout.addRow("Preload Memory:", self.preload_mb_selector)
+
+        # Options > Stall Watchdog melaporkan jeda event loop di atas batas ini
+        self.stall_threshold_selector = QSpinBox(self)
+        self.stall_threshold_selector.setRange(50, 5000)
+        self.stall_threshold_selector.setSingleStep(50)
+        self.stall_threshold_selector.setSuffix(" ms")
+        self.stall_threshold_selector.setValue(self.current_settings.get('stall_threshold_ms', DEFAULT_STALL_THRESHOLD_MS))
+        layout.addRow("Stall Threshold:", self.stall_threshold_selector)
+
+        close_button = QPushButton("Close", self)
+        close_button.clicked.connect(self.close)
+        layout.addWidget(close_button)
 
         self.setLayout(layout)
 
-    def apply_settings(self):
-        settings = {
+    def change_speed_unit(self):
+        # Edited here or by a preset: the same speed, expressed in the new
+        # unit. Only when it cannot be converted (words per minute without a
+        # laid-out script) the number is kept and clamped.
+        unit = self.speed_unit_selector.currentData()
+        speed = self.convert_speed(self.speed_selector.value(), self.speed_unit, unit) if self.convert_speed else None
+        self.update_speed_range()
+        if speed is not None:
+            self.speed_selector.setValue(speed)
+
+    def update_speed_range(self):
+        self.speed_unit = self.speed_unit_selector.currentData()
+        if self.speed_unit_selector.currentData() == SPEED_UNIT_LINES:
+            self.speed_selector.setDecimals(2)
+            self.speed_selector.setRange(*SPEED_LIMITS[SPEED_UNIT_LINES])
+            self.speed_selector.setSingleStep(0.1)
+        elif self.speed_unit_selector.currentData() == SPEED_UNIT_WORDS:
+            self.speed_selector.setDecimals(0)
+            self.speed_selector.setRange(*SPEED_LIMITS[SPEED_UNIT_WORDS])
+            self.speed_selector.setSingleStep(5)
+        else:
+            self.speed_selector.setDecimals(1)
+            self.speed_selector.setRange(*SPEED_LIMITS[SPEED_UNIT_PIXELS])
+            self.speed_selector.setSingleStep(1)
+
+    def update_preset_list(self, current=None):
+        self.preset_selector.clear()
+        self.preset_selector.addItem("(none)", None)
+        for name in self.store.preset_names():
+            self.preset_selector.addItem(name, name)
+        if current:
+            self.preset_selector.setCurrentIndex(self.preset_selector.findData(current))
+
+    def load_preset(self):
+        # Fills in the fields; they are applied like any other edit
+        name = self.preset_selector.currentData()
+        if not name:
+            return
+        preset = self.store.preset(name)
+        if 'font' in preset:
+            self.font_selector.setCurrentFont(preset['font'])
+        if 'font_size' in preset:
+            self.font_size_selector.setValue(preset['font_size'])
+        if 'speed_unit' in preset:
+            self.speed_unit_selector.setCurrentIndex(self.speed_unit_selector.findData(preset['speed_unit']))
+        if 'speed' in preset:
+            self.speed_selector.setValue(preset['speed'])
+        if 'speed_ramp' in preset:
+            self.speed_ramp_selector.setValue(preset['speed_ramp'])
+        if 'scroll_mode' in preset:
+            self.scroll_mode_selector.setCurrentIndex(self.scroll_mode_selector.findData(preset['scroll_mode']))
+
+    def save_preset(self):
+        name, ok = QInputDialog.getText(self, "Save Preset", "Presenter name:",
+                                        text=self.preset_selector.currentData() or "")
+        name = name.strip()
+        if not ok or not name:
+            return
+        self.apply_settings()  # The preset holds what the prompter shows, not the clamped fields
+        if not self.store.save_preset(name, self.current_settings):
+            QMessageBox.warning(self, "Save Preset", "The preset could not be written to disk.")
+        self.update_preset_list(name)
+
+    def delete_preset(self):
+        name = self.preset_selector.currentData()
+        if name:
+            self.store.delete_preset(name)
+            self.update_preset_list()
+
+    def collect_settings(self):
+        return {
             'font': self.font_selector.currentFont(),
             'font_size': self.font_size_selector.value(),
-            'speed': self.speed_selector.value()
+            'speed': self.speed_selector.value(),
+            'speed_unit': self.speed_unit_selector.currentData(),
+            'speed_ramp': self.speed_ramp_selector.value(),
+            'scroll_mode': self.scroll_mode_selector.currentData(),
+            'render_mode': self.render_mode_selector.currentData(),
+            'preload_count': self.preload_count_selector.value(),
+            'preload_mb': self.preload_mb_selector.value(),
+            'stall_threshold_ms': self.stall_threshold_selector.value()
         }
-        self.settings_changed.emit(settings)
-        self.close()
+
+    def load_settings(self, settings):
+        # Shows settings changed elsewhere (speed nudges, the remote, a
+        # reopen). Only differing fields are touched, with their signals
+        # blocked, so this neither applies anything nor moves the caret.
+        # All fields stay blocked throughout: a new speed unit re-ranges
+        # (and may clamp) the speed field, which is not an edit either.
+        self.current_settings = settings
+        shown = self.collect_settings()
+        for widget, _ in self.fields:
+            widget.blockSignals(True)
+        for widget, key in self.fields:
+            if key not in settings or same_value(key, shown[key], settings[key]):
+                continue
+            if key == 'font':
+                widget.setCurrentFont(settings[key])
+            elif isinstance(widget, QComboBox):
+                widget.setCurrentIndex(widget.findData(settings[key]))
+                if key == 'speed_unit':
+                    self.update_speed_range()
+            else:
+                widget.setValue(settings[key])
+        for widget, _ in self.fields:
+            widget.blockSignals(False)
+
+    def schedule_apply(self, key):
+        self.edited.add(key)
+        self.apply_timer.start()  # Restart: wait for the edits to settle
+
+    def apply_settings(self):
+        self.apply_timer.stop()
+        if not self.edited:
+            return
+        settings = self.collect_settings()
+        edited, self.edited = self.edited, set()
+        self.settings_changed.emit({key: settings[key] for key in edited})
+
+    def hideEvent(self, event):
+        if self.apply_timer.isActive():
+            self.apply_settings()  # Closed right after an edit
+        super().hideEvent(event)
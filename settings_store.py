@@ -0,0 +1,162 @@
+import json
+import os
+
+from PyQt6.QtCore import QStandardPaths
+from PyQt6.QtGui import QFont
+
+from file_saver import atomic_write
+from document_sync import SYNC_MODE_INCREMENTAL
+from speed_profile import DEFAULT_SPEED_RAMP
+
+DEFAULT_FONT_FAMILY = "Arial"  # QFont itself needs a QGuiApplication, see default_settings
+RENDER_MODE_TILED = 'tiled'  # Blit pre-rendered pixmap tiles
+RENDER_MODE_LIVE = 'live'  # Repaint the QTextEdit viewport every frame
+# Here rather than in playlist / stall_watchdog, which are not needed to read the settings
+DEFAULT_PRELOAD_COUNT = 2  # Rundown entries after the current one that are kept ready
+DEFAULT_PRELOAD_MB = 256
+DEFAULT_STALL_THRESHOLD_MS = 100
+
+DEFAULT_SETTINGS = {
+    'font_size': 48,
+    'speed': 50,
+    'speed_unit': 'px',
+    'speed_ramp': DEFAULT_SPEED_RAMP,
+    'scroll_mode': 'smooth',
+    'render_mode': RENDER_MODE_TILED,
+    'word_wrap': True,
+    'sync_mode': SYNC_MODE_INCREMENTAL,
+    'auto_sync': False,
+    'watch_file': True,
+    'show_frame_hud': False,
+    'remote_control': False,
+    'remote_port': 8765,
+    'playlist': [],
+    'preload_count': DEFAULT_PRELOAD_COUNT,
+    'preload_mb': DEFAULT_PRELOAD_MB,
+    'stall_threshold_ms': DEFAULT_STALL_THRESHOLD_MS,
+}
+
+# Session state such as the remote server is not restored at startup
+PERSISTED_KEYS = ['font', 'font_size', 'speed', 'speed_unit', 'speed_ramp', 'scroll_mode', 'render_mode',
+                  'word_wrap', 'sync_mode', 'auto_sync', 'watch_file', 'show_frame_hud', 'remote_port', 'playlist',
+                  'preload_count', 'preload_mb', 'stall_threshold_ms']
+# JSON types a stored value must have; anything else falls back to the default
+NUMBER = (int, float)
+PERSISTED_TYPES = {
+    'font': str, 'font_size': int, 'speed': NUMBER, 'speed_unit': str, 'speed_ramp': NUMBER,
+    'scroll_mode': str, 'render_mode': str, 'word_wrap': bool, 'sync_mode': str, 'auto_sync': bool,
+    'watch_file': bool, 'show_frame_hud': bool, 'remote_port': int, 'playlist': list,
+    'preload_count': int, 'preload_mb': int, 'stall_threshold_ms': int,
+}
+# What a presenter preset carries
+PRESET_KEYS = ['font', 'font_size', 'speed', 'speed_unit', 'speed_ramp', 'scroll_mode']
+
+
+def default_settings():
+    settings = dict(DEFAULT_SETTINGS)
+    settings['font'] = QFont(DEFAULT_FONT_FAMILY, DEFAULT_SETTINGS['font_size'])
+    return settings
+
+
+def same_value(key, old, new):
+    if key == 'font':
+        # The size lives in 'font_size'; the dialog's QFont carries its own
+        old_font = QFont(old)
+        new_font = QFont(new)
+        old_font.setPointSize(12)
+        new_font.setPointSize(12)
+        return old_font == new_font
+    return old == new
+
+
+def diff_settings(old, new):
+    # The entries of new that differ from old
+    return {key: value for key, value in new.items()
+            if key not in old or not same_value(key, old[key], value)}
+
+
+def encode_settings(settings):
+    encoded = {key: settings[key] for key in PERSISTED_KEYS if key in settings}
+    if 'font' in encoded:
+        encoded['font'] = encoded['font'].toString()
+    return encoded
+
+
+def has_persisted_type(key, value):
+    if isinstance(value, bool) and PERSISTED_TYPES[key] is not bool:
+        return False  # bool is an int subclass, but true is not a font size
+    if key == 'playlist':
+        return isinstance(value, list) and all(isinstance(path, str) for path in value)
+    return isinstance(value, PERSISTED_TYPES[key])
+
+
+def decode_settings(data):
+    # Values of the wrong type (a hand-edited or foreign file) are left
+    # out, so the defaults stand in for them
+    if not isinstance(data, dict):
+        return {}
+    settings = {key: data[key] for key in PERSISTED_KEYS if key in data and has_persisted_type(key, data[key])}
+    if 'font' in settings:
+        font = QFont()
+        if font.fromString(settings['font']):
+            settings['font'] = font
+        else:
+            del settings['font']
+    return settings
+
+
+def settings_path():
+    base = QStandardPaths.writableLocation(QStandardPaths.StandardLocation.AppConfigLocation)
+    return os.path.join(base, 'settings.json')
+
+
+class SettingsStore:
+    # Settings and named presenter presets in one small JSON file. Reading
+    # it is a single json.load at startup; writes go through atomic_write.
+
+    def __init__(self, file_path=None):
+        self.file_path = file_path or settings_path()
+        self.settings = {}
+        self.presets = {}
+
+    def load(self):
+        # Returns the stored settings on top of the defaults
+        try:
+            with open(self.file_path, encoding='utf-8') as file:
+                data = json.load(file)
+            self.settings = decode_settings(data.get('settings', {}))
+            self.presets = {name: decode_settings(preset) for name, preset in data.get('presets', {}).items()}
+        except (OSError, ValueError, AttributeError, TypeError):
+            self.settings = {}
+            self.presets = {}
+        settings = default_settings()
+        settings.update(self.settings)
+        return settings
+
+    def save(self, settings=None):
+        if settings is not None:
+            self.settings = dict(settings)
+        data = {
+            'settings': encode_settings(self.settings),
+            'presets': {name: encode_settings(preset) for name, preset in self.presets.items()},
+        }
+        try:
+            os.makedirs(os.path.dirname(self.file_path), exist_ok=True)
+            atomic_write(self.file_path, json.dumps(data, indent=2))
+        except OSError:
+            return False
+        return True
+
+    def preset_names(self):
+        return sorted(self.presets, key=str.casefold)
+
+    def preset(self, name):
+        return dict(self.presets.get(name, {}))
+
+    def save_preset(self, name, settings):
+        self.presets[name] = {key: settings[key] for key in PRESET_KEYS if key in settings}
+        return self.save()
+
+    def delete_preset(self, name):
+        self.presets.pop(name, None)
+        return self.save()
@@ -0,0 +1,265 @@
+import json
+import math
+import os
+import re
+from bisect import bisect_right
+
+# Per-section speed tag on a cue line: "[SPEED 120]" in the current speed
+# unit, or "[SPEED 80%]" of the base speed from the settings
+SPEED_PATTERN = re.compile(r'\[SPEED\s*[:=]?\s*(\d+(?:\.\d+)?)\s*(%?)\s*\]', re.IGNORECASE)
+SIDECAR_SUFFIX = '.speeds.json'  # talk.txt -> talk.speeds.json
+
+DEFAULT_SPEED_RAMP = 0.8  # Detik untuk berpindah dari satu kecepatan ke kecepatan berikutnya
+SPEED_NUDGE_STEPS = {'px': 5, 'lines': 0.25, 'wpm': 10}  # One keyboard / remote step per unit
+SPEED_LIMITS = {'px': (10, 200), 'lines': (0.1, 20), 'wpm': (40, 400)}  # As the Settings dialog allows
+
+
+def clamp_speed(speed, unit):
+    # Into the range of the unit; the caller rejects NaN / inf first
+    low, high = SPEED_LIMITS.get(unit, (10, 200))
+    return min(max(speed, low), high)
+
+
+def parse_speed(value):
+    # 120 / "120" -> (120.0, False), "80%" -> (0.8, True); None when it is no speed
+    if isinstance(value, bool):
+        return None
+    if isinstance(value, (int, float)):
+        # JSON allows NaN and Infinity
+        return (float(value), False) if math.isfinite(value) and value > 0 else None
+    if isinstance(value, str):
+        match = re.fullmatch(r'\s*(\d+(?:\.\d+)?)\s*(%?)\s*', value)
+        if match and 0 < float(match.group(1)) < float('inf'):  # Enough digits overflow to inf
+            if match.group(2):
+                return float(match.group(1)) / 100, True
+            return float(match.group(1)), False
+    return None
+
+
+def section_speed(text):
+    # Speed tag of a cue line, as parse_speed, or None
+    match = SPEED_PATTERN.search(text)
+    if match is None or not 0 < float(match.group(1)) < float('inf'):
+        return None
+    if match.group(2):
+        return float(match.group(1)) / 100, True
+    return float(match.group(1)), False
+
+
+def section_key(title):
+    # Sidecar key of a section title: "Fast Part [SPEED 120]" -> "fast part"
+    return ' '.join(SPEED_PATTERN.sub(' ', title).split()).lower()
+
+
+def section_target(number, title, cue_text, base, convert, section_speeds=None):
+    # px/s of a section: the sidecar entry (by number or title), else the
+    # cue line's [SPEED] tag, else the base speed. convert turns a speed in
+    # the current unit into px/s.
+    speed = None
+    if section_speeds:
+        speed = section_speeds.get(str(number))
+        if speed is None:
+            speed = section_speeds.get(section_key(title))
+    if speed is None and cue_text is not None:
+        speed = section_speed(cue_text)
+    if speed is None:
+        return base
+    value, relative = speed
+    return base * value if relative else convert(value)
+
+
+def sidecar_path(script_path):
+    return os.path.splitext(script_path)[0] + SIDECAR_SUFFIX
+
+
+def load_sidecar(script_path):
+    # {"sections": {"2": 90, "Interview": "80%"}} next to the script: keys are
+    # section numbers (0 = before the first cue) or titles, case-insensitive.
+    # Returns {key: (value, relative)}; {} when there is no sidecar. Raises
+    # ValueError for a file that exists but cannot be used.
+    if not script_path:
+        return {}
+    try:
+        with open(sidecar_path(script_path), encoding='utf-8') as file:
+            data = json.load(file)
+    except FileNotFoundError:
+        return {}
+    except (OSError, UnicodeDecodeError) as error:
+        raise ValueError(str(error))
+    except json.JSONDecodeError as error:
+        raise ValueError(f"invalid JSON: {error}")
+    sections = data.get('sections') if isinstance(data, dict) else None
+    if not isinstance(sections, dict):
+        raise ValueError("expected an object with a 'sections' mapping")
+    speeds = {}
+    for key, value in sections.items():
+        speed = parse_speed(value)
+        if speed is None:
+            raise ValueError(f"section {key!r}: speed must be a positive number or a percentage")
+        speeds[section_key(str(key))] = speed
+    return speeds
+
+
+class SpeedProfile:
+    # Target speed (px/s) along the scroll path: speeds[i] from starts[i]
+    # up to starts[i + 1]. starts[0] is 0 and neighbours never repeat a speed,
+    # so a script without section speeds is a single segment.
+
+    def __init__(self, starts, speeds):
+        self.starts = []
+        self.speeds = []
+        for start, speed in zip(starts, speeds):
+            if not math.isfinite(speed):
+                speed = 0.0  # Stops there rather than sending SpeedCurve.build into NaN arithmetic
+            if self.speeds and speed == self.speeds[-1]:
+                continue
+            if self.starts and start <= self.starts[-1]:
+                # Sections that start at the same scroll position: the last one wins
+                self.speeds[-1] = speed
+                continue
+            self.starts.append(float(start) if self.starts else 0.0)
+            self.speeds.append(float(speed))
+        # Seconds to scroll from 0 to starts[i] at the target speeds, for ETAs
+        self.times = [0.0]
+        for index in range(1, len(self.starts)):
+            length = self.starts[index] - self.starts[index - 1]
+            speed = self.speeds[index - 1]
+            self.times.append(self.times[-1] + (length / speed if speed > 0 else float('inf')))
+
+    @classmethod
+    def flat(cls, speed):
+        return cls([0.0], [speed])
+
+    def segment_at(self, y):
+        return max(0, bisect_right(self.starts, y) - 1)
+
+    def speed_at(self, y):
+        return self.speeds[self.segment_at(y)]
+
+    def seconds_to(self, y):
+        index = self.segment_at(y)
+        speed = self.speeds[index]
+        if speed <= 0:
+            return float('inf')
+        return self.times[index] + (y - self.starts[index]) / speed
+
+    def seconds_between(self, start, end):
+        # Scroll time from start to end at the target speeds (ramps ignored)
+        return max(0.0, self.seconds_to(end) - self.seconds_to(start))
+
+
+def ease(u):
+    # Smoothstep: the velocity starts and ends its change with zero acceleration
+    return u * u * (3 - 2 * u)
+
+
+def eased_distance(u):
+    # Integral of ease from 0 to u
+    return u * u * u * (1 - u / 2)
+
+
+class SpeedCurve:
+    # Position over time from one anchor (position, velocity), worked out
+    # ahead of time for the whole remaining scroll path: every section
+    # start the scroll reaches begins an eased ramp from the velocity at
+    # that point to the section's target. The result is a list of pieces
+    # (constant speed, or one ramp) with their start times; the frame loop
+    # only evaluates the piece under a cursor that moves forward, so a frame
+    # costs the same whatever the number of sections.
+
+    def __init__(self, profile, position, velocity=None, ramp=0.0, maximum=float('inf')):
+        # velocity None: already at the target speed of position
+        self.times = []  # Start time of each piece, seconds after the anchor
+        self.positions = []
+        self.velocities = []
+        self.changes = []  # Velocity change of a ramp piece, 0 for a constant one
+        self.durations = []  # Ramp duration, 0 for a constant piece
+        self.cursor = 0
+        self.build(profile, float(position), velocity, max(0.0, float(ramp)), maximum)
+
+    def add_piece(self, time, position, velocity, change=0.0, duration=0.0):
+        self.times.append(time)
+        self.positions.append(position)
+        self.velocities.append(velocity)
+        self.changes.append(change)
+        self.durations.append(duration)
+
+    def build(self, profile, position, velocity, ramp, maximum):
+        index = profile.segment_at(position)
+        target = profile.speeds[index]
+        boundary = index + 1
+        time = 0.0
+        if velocity is None or not math.isfinite(velocity):
+            velocity = target
+        if not math.isfinite(ramp):
+            ramp = 0.0
+        # Each section adds at most a ramp and a constant piece; the bound
+        # only guards against input that would never settle
+        for _ in range(3 * len(profile.starts) + 3):
+            next_start = profile.starts[boundary] if boundary < len(profile.starts) else None
+            if next_start is not None and next_start >= maximum:
+                next_start = None  # Never reached before the end
+            change = target - velocity
+            if change and ramp > 0:
+                length = ramp * (velocity + target) / 2
+                if next_start is None or position + length <= next_start:
+                    self.add_piece(time, position, velocity, change, ramp)
+                    time += ramp
+                    position += length
+                    velocity = target
+                    continue
+                # The next section starts before the ramp is done: a new ramp from there
+                elapsed = self.ramp_time_to(next_start - position, velocity, change, ramp)
+                self.add_piece(time, position, velocity, change, ramp)
+                time += elapsed
+                velocity += change * ease(elapsed / ramp)
+            else:
+                velocity = target
+                self.add_piece(time, position, velocity)
+                if next_start is None or velocity <= 0:
+                    return
+                time += (next_start - position) / velocity
+            position = next_start
+            target = profile.speeds[boundary]
+            boundary += 1
+
+    @staticmethod
+    def ramp_time_to(distance, velocity, change, ramp):
+        # Time into a ramp at which it has covered distance; the distance
+        # grows monotonically with time, so bisection converges
+        low, high = 0.0, ramp
+        for _ in range(48):
+            middle = (low + high) / 2
+            if velocity * middle + change * ramp * eased_distance(middle / ramp) < distance:
+                low = middle
+            else:
+                high = middle
+        return high
+
+    def piece_at(self, time):
+        index = self.cursor
+        times = self.times
+        if time < times[index]:
+            index = max(0, bisect_right(times, time) - 1)  # Only after the clock went back
+        while index + 1 < len(times) and time >= times[index + 1]:
+            index += 1
+        self.cursor = index
+        return index
+
+    def position_at(self, time):
+        index = self.piece_at(time)
+        elapsed = time - self.times[index]
+        position = self.positions[index] + self.velocities[index] * elapsed
+        duration = self.durations[index]
+        if duration:
+            if elapsed >= duration:
+                return position + self.changes[index] * (elapsed - duration / 2)
+            position += self.changes[index] * duration * eased_distance(elapsed / duration)
+        return position
+
+    def velocity_at(self, time):
+        index = self.piece_at(time)
+        duration = self.durations[index]
+        if not duration:
+            return self.velocities[index]
+        return self.velocities[index] + self.changes[index] * ease(min(1.0, (time - self.times[index]) / duration))
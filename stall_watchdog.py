@@ -0,0 +1,210 @@
+import os
+import sys
+import threading
+import time
+from collections import Counter, deque
+from datetime import datetime
+
+from PyQt6.QtCore import QObject, QThread, QTimer, Qt
+
+from file_saver import atomic_write
+from settings_store import DEFAULT_STALL_THRESHOLD_MS
+
+HEARTBEAT_MS = 25  # GUI timer; the event loop is stalled while its beats stop
+SAMPLE_INTERVAL_MS = 5  # Stack samples during a stall, one per interval
+MAX_SLEEP_MS = 50  # Longest sleep of the helper thread, so stop() never waits long
+MAX_STACK_DEPTH = 64
+REPORT_INTERVAL_S = 2.0  # The report file is rewritten at most this often
+TOP_ENTRIES = 15
+RECENT_STALLS = 50
+APP_DIRECTORY = os.path.dirname(os.path.abspath(__file__))
+INSIDE_QT = "(inside Qt: layout, painting or an event without a Python handler)"
+
+
+def frame_label(frame):
+    filename, line, name = frame
+    return f"{os.path.basename(filename)}:{line if line is not None else '?'} {name}"
+
+
+def is_app_frame(frame):
+    return os.path.dirname(os.path.abspath(frame[0])) == APP_DIRECTORY
+
+
+def call_site(stack):
+    # Innermost frame of the application's own code; a library frame when
+    # the stall is entirely in library code
+    if not stack:
+        return INSIDE_QT
+    for frame in stack:
+        if is_app_frame(frame):
+            return frame_label(frame)
+    return frame_label(stack[0])
+
+
+def handler(stack):
+    # Outermost frame: the slot or event handler the event loop called
+    return frame_label(stack[-1]) if stack else INSIDE_QT
+
+
+class StallStats:
+    # Stalls aggregated over a session: how many, how long, and per handler
+    # and call site how much of the stalled time it was running.
+
+    def __init__(self, threshold):
+        self.threshold = threshold
+        self.started = time.time()
+        self.count = 0
+        self.total = 0.0
+        self.longest = 0.0
+        self.handlers = Counter()
+        self.sites = Counter()
+        self.recent = deque(maxlen=RECENT_STALLS)  # (wall time, seconds, top call site)
+
+    def add(self, started, duration, samples):
+        # samples: (GUI thread stack, innermost frame first; seconds it stands for)
+        self.count += 1
+        self.total += duration
+        self.longest = max(self.longest, duration)
+        sites = Counter()
+        for stack, seconds in samples:
+            sites[call_site(stack)] += seconds
+            self.handlers[handler(stack)] += seconds
+        self.sites.update(sites)
+        self.recent.append((started, duration, sites.most_common(1)[0][0] if sites else "(no sample)"))
+
+    def report(self):
+        elapsed = time.time() - self.started
+        lines = [
+            f"Stall report, threshold {self.threshold * 1000:.0f} ms",
+            f"Monitoring since {datetime.fromtimestamp(self.started):%Y-%m-%d %H:%M:%S} ({elapsed:.0f} s): "
+            f"{self.count} stalls, {self.total:.2f} s stalled, longest {self.longest * 1000:.0f} ms",
+        ]
+        for title, counter in (("Handlers (called by the event loop)", self.handlers),
+                               ("Call sites (innermost application frame)", self.sites)):
+            lines.append("")
+            lines.append(f"{title}, share of stalled time:")
+            sampled = sum(counter.values())
+            for label, seconds in counter.most_common(TOP_ENTRIES):
+                lines.append(f"  {seconds * 100 / sampled:5.1f}%  {seconds:7.2f} s  {label}")
+        lines.append("")
+        lines.append("Recent stalls:")
+        for started, duration, site in reversed(self.recent):
+            lines.append(f"  {datetime.fromtimestamp(started):%H:%M:%S.%f}"[:-3] + f"  {duration * 1000:6.0f} ms  {site}")
+        return '\n'.join(lines) + '\n'
+
+
+class StallMonitor(QThread):
+    # The helper thread. While the event loop is healthy it wakes about
+    # once per threshold; only during a stall does it sample the GUI
+    # thread's stack, every SAMPLE_INTERVAL_MS. The report is written here
+    # too, never on the GUI thread.
+    #
+    # PyQt keeps the GIL during a call into Qt, so a long layout or paint
+    # started from Python holds this thread off until it returns. Each
+    # sample therefore stands for the time since the one before: the first
+    # sample after such a call still shows the function that made it.
+
+    def __init__(self, watchdog, report_path, threshold, parent=None):
+        super().__init__(parent)
+        self.watchdog = watchdog
+        self.report_path = report_path
+        self.threshold = threshold  # Seconds; may be changed while running
+        self.stats = StallStats(threshold)
+        self.dirty = True  # An empty report is written at once, so the file exists
+        self.last_write = 0.0
+
+    def run(self):
+        watchdog = self.watchdog
+        while not self.isInterruptionRequested():
+            beat = watchdog.last_beat
+            late = time.perf_counter() - beat - HEARTBEAT_MS / 1000
+            if late < self.threshold:
+                self.write_report()
+                self.msleep(max(1, min(int((self.threshold - late) * 1000), MAX_SLEEP_MS)))
+                continue
+            due = beat + HEARTBEAT_MS / 1000  # When the missed beat should have come
+            previous = due
+            samples = []
+            while watchdog.last_beat == beat and not self.isInterruptionRequested():
+                stack = watchdog.sample()
+                now = time.perf_counter()
+                samples.append((stack, now - previous))
+                previous = now
+                self.msleep(SAMPLE_INTERVAL_MS)
+            end = watchdog.last_beat if watchdog.last_beat != beat else time.perf_counter()
+            self.stats.threshold = self.threshold
+            self.stats.add(time.time() - (time.perf_counter() - due), end - due, samples)
+            self.dirty = True
+        self.write_report(force=True)
+
+    def write_report(self, force=False):
+        if not force and (not self.dirty or time.perf_counter() - self.last_write < REPORT_INTERVAL_S):
+            return
+        self.dirty = False
+        self.last_write = time.perf_counter()
+        try:
+            atomic_write(self.report_path, self.stats.report())
+        except OSError:
+            pass  # Diagnostics only; the next stall tries again
+
+
+class StallWatchdog(QObject):
+    # Opt-in detector for event-loop stalls. Both windows run on the one
+    # GUI thread, so one heartbeat timer there covers them; StallMonitor
+    # notices when it stops beating and samples what the thread runs.
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.gui_thread = threading.get_ident()
+        self.last_beat = time.perf_counter()
+        self.loop_code = None  # Code of the function running the event loop; stacks stop there (None: full stacks)
+        self.monitor = None
+        self.timer = QTimer(self)
+        self.timer.setTimerType(Qt.TimerType.PreciseTimer)
+        self.timer.setInterval(HEARTBEAT_MS)
+        self.timer.timeout.connect(self.beat)
+
+    def is_running(self):
+        return self.monitor is not None
+
+    def start(self, report_path, threshold_ms=DEFAULT_STALL_THRESHOLD_MS, loop_code=None):
+        # loop_code: the code object of the function that calls app.exec(),
+        # e.g. main.__code__. Passed in rather than taken from the first
+        # heartbeat, which may be delivered by a nested dialog loop.
+        self.stop()
+        self.loop_code = loop_code
+        self.last_beat = time.perf_counter()
+        self.monitor = StallMonitor(self, report_path, threshold_ms / 1000, self)
+        self.timer.start()
+        self.monitor.start()
+
+    def set_threshold(self, threshold_ms):
+        if self.monitor is not None:
+            self.monitor.threshold = threshold_ms / 1000
+
+    def stop(self):
+        # Returns the report path; the final report is written before this returns
+        if self.monitor is None:
+            return None
+        self.timer.stop()
+        monitor = self.monitor
+        self.monitor = None
+        monitor.requestInterruption()
+        monitor.wait()
+        monitor.deleteLater()
+        return monitor.report_path
+
+    def beat(self):
+        self.last_beat = time.perf_counter()
+
+    def sample(self):
+        # Called from StallMonitor: (file, line, qualified name) per frame of
+        # the GUI thread, innermost first, up to the event loop's own frame
+        frame = sys._current_frames().get(self.gui_thread)
+        stack = []
+        loop_code = self.loop_code
+        while frame is not None and (loop_code is None or frame.f_code is not loop_code) and len(stack) < MAX_STACK_DEPTH:
+            code = frame.f_code
+            stack.append((code.co_filename, frame.f_lineno, code.co_qualname))
+            frame = frame.f_back
+        return tuple(stack)
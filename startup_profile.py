@@ -0,0 +1,51 @@
+import time
+
+# Diimpor paling awal oleh teleprompter_control agar fase import ikut terukur
+PROCESS_START = time.perf_counter()
+
+import os
+import sys
+import tempfile
+
+
+class StartupProfiler:
+    def __init__(self):
+        self.enabled = False
+        self.phases = []  # (phase name, seconds since the previous mark)
+        self.last = PROCESS_START
+
+    def mark(self, phase):
+        if self.enabled:
+            now = time.perf_counter()
+            self.phases.append((phase, now - self.last))
+            self.last = now
+
+    def time_to_first_window(self):
+        total = 0.0
+        for phase, seconds in self.phases:
+            total += seconds
+            if phase == 'first paint':
+                break
+        return total
+
+    def report(self):
+        lines = ["Startup profile:"]
+        for phase, seconds in self.phases:
+            lines.append(f"  {phase:<20} {seconds * 1000:8.1f} ms")
+        lines.append(f"  {'time to first window':<20} {self.time_to_first_window() * 1000:8.1f} ms")
+        return '\n'.join(lines)
+
+    def print_report(self):
+        if not self.enabled:
+            return
+        report = self.report()
+        if sys.stderr:
+            print(report, file=sys.stderr)
+        else:
+            # The frozen windowed build has no console
+            with open(os.path.join(tempfile.gettempdir(), 'teleprompter_startup_profile.txt'), 'w') as file:
+                file.write(report + '\n')
+        self.enabled = False
+
+
+startup_profiler = StartupProfiler()
@@ -0,0 +1,177 @@
+import csv
+import io
+import time
+
+from file_saver import atomic_write
+
+START_SECTION_TITLE = "Start"  # Teks sebelum cue pertama
+
+
+def format_duration(seconds, decimals=1):
+    # mm:ss.d, or h:mm:ss.d from one hour on
+    scale = 10 ** decimals
+    total = int(round(max(0.0, seconds) * scale))
+    fraction = total % scale
+    whole = total // scale
+    hours, rest = divmod(whole, 3600)
+    minutes, secs = divmod(rest, 60)
+    text = f"{hours}:{minutes:02d}:{secs:02d}" if hours else f"{minutes:02d}:{secs:02d}"
+    return f"{text}.{fraction:0{decimals}d}" if decimals else text
+
+
+class Stopwatch:
+    # Elapsed time read from a monotonic clock. It is the sum of the running
+    # spans, never a count of timer ticks, so it neither drifts nor loses the
+    # partial second on pause/resume.
+
+    def __init__(self, clock=time.perf_counter):
+        self.clock = clock
+        self.accumulated = 0.0
+        self.started = None  # Clock value of the running span, None while paused
+
+    def is_running(self):
+        return self.started is not None
+
+    def start(self):
+        if self.started is None:
+            self.started = self.clock()
+
+    def pause(self):
+        if self.started is not None:
+            self.accumulated += self.clock() - self.started
+            self.started = None
+
+    def reset(self):
+        self.accumulated = 0.0
+        self.started = None
+
+    def elapsed(self):
+        if self.started is None:
+            return self.accumulated
+        return self.accumulated + self.clock() - self.started
+
+
+class Lap:
+    # Time spent with the reading line inside one section. Times are
+    # stopwatch seconds; words are word offsets into the script.
+
+    def __init__(self, section, title, start, start_words):
+        self.section = section
+        self.title = title
+        self.start = start
+        self.end = None  # Open lap
+        self.start_words = start_words
+        self.end_words = None
+
+    def duration(self, now):
+        return (self.end if self.end is not None else now) - self.start
+
+    def words(self, now_words=None):
+        end_words = self.end_words if self.end is not None else now_words
+        if self.start_words is None or end_words is None:
+            return None
+        return max(0, round(end_words - self.start_words))
+
+    def words_per_minute(self, now, now_words=None):
+        words = self.words(now_words)
+        duration = self.duration(now)
+        if words is None or duration <= 0:
+            return None
+        return words * 60 / duration
+
+
+class TakeRecorder:
+    # Stopwatch and automatic laps of one take (play ... stop). observe() is
+    # called with the reading line y on every frame; a lap ends when that
+    # line enters another section. When it crossed a section start between
+    # two frames, the crossing time is interpolated in stopwatch time, so a
+    # lap boundary does not depend on the frame rate or on a pause in between.
+
+    def __init__(self, clock=time.perf_counter):
+        self.stopwatch = Stopwatch(clock)
+        self.laps = []
+        self.span = (0.0, -1.0)  # [top, bottom) of the current section; empty = look it up
+        self.last = None  # (elapsed, y) of the previous observation
+
+    def start(self):
+        self.stopwatch.start()
+
+    def pause(self):
+        self.stopwatch.pause()
+
+    def elapsed(self):
+        return self.stopwatch.elapsed()
+
+    def is_active(self):
+        return self.stopwatch.is_running() or bool(self.laps)
+
+    def invalidate(self):
+        # The layout moved (font, width, edit): positions are no longer comparable
+        self.span = (0.0, -1.0)
+        self.last = None
+
+    def observe(self, y, locate, words_at=None, jumped=False):
+        # locate(y) -> (section, title, top, bottom) in the same coordinates
+        # as y; words_at(y) -> word offset, or None when unknown. jumped:
+        # the position was set rather than scrolled, nothing in between was read.
+        now = self.stopwatch.elapsed()
+        last = self.last
+        self.last = (now, y)
+        top, bottom = self.span
+        if top <= y < bottom:
+            return
+
+        section, title, top, bottom = locate(y)
+        self.span = (top, bottom)
+        if self.laps and self.laps[-1].section == section:
+            return
+
+        if not self.laps:
+            # The first lap starts with the take
+            self.laps.append(Lap(section, title, 0.0, words_at(y) if words_at is not None else None))
+            return
+
+        if not jumped and last is not None and last[1] < top <= y:
+            # Scrolled forward across the section start
+            when = last[0] + (now - last[0]) * (top - last[1]) / (y - last[1])
+            end_at = start_at = top
+        else:
+            # Jumped, or moved backwards: the lap ends where reading stopped
+            when = now
+            end_at = last[1] if last is not None else None
+            start_at = y
+        lap = self.laps[-1]
+        lap.end = when
+        lap.end_words = words_at(end_at) if words_at is not None and end_at is not None else None
+        self.laps.append(Lap(section, title, when, words_at(start_at) if words_at is not None else None))
+
+    def finish(self, words=None):
+        # End of the take: stop the clock and close the open lap
+        self.stopwatch.pause()
+        if self.laps and self.laps[-1].end is None:
+            self.laps[-1].end = self.elapsed()
+            self.laps[-1].end_words = words
+
+    def report_rows(self, now_words=None):
+        # One row per lap plus a total; the open lap runs until now
+        now = self.elapsed()
+        rows = []
+        total_words = 0
+        for lap in self.laps:
+            words = lap.words(now_words)
+            wpm = lap.words_per_minute(now, now_words)
+            total_words += words or 0
+            rows.append([lap.section, lap.title, format_duration(lap.start, 3), format_duration(lap.duration(now), 3),
+                         f"{lap.duration(now):.3f}", '' if words is None else words,
+                         '' if wpm is None else f"{wpm:.1f}"])
+        wpm = total_words * 60 / now if now > 0 else None
+        rows.append(['', "Total", format_duration(0, 3), format_duration(now, 3), f"{now:.3f}", total_words,
+                     '' if wpm is None else f"{wpm:.1f}"])
+        return rows
+
+    def export_csv(self, file_path, now_words=None):
+        output = io.StringIO()
+        writer = csv.writer(output)
+        writer.writerow(["Section", "Title", "Start", "Duration", "Seconds", "Words", "WPM"])
+        writer.writerows(self.report_rows(now_words))
+        atomic_write(file_path, output.getvalue())
@@ -1,17 +1,30 @@
+from startup_profile import startup_profiler
+import math
 import sys
-from PyQt6.QtWidgets import (QApplication, QVBoxLayout, QWidget, QMainWindow, QToolBar, QMessageBox, QPlainTextEdit, QFileDialog)
-from PyQt6.QtCore import Qt, pyqtSignal, QFileInfo
-from PyQt6.QtGui import QFont, QKeySequence, QAction
-import qtawesome as qta
-from tkinter import Tk
-from tkinter.filedialog import askopenfilename
+import time
+from PyQt6.QtWidgets import (QApplication, QVBoxLayout, QWidget, QMainWindow, QToolBar, QMessageBox, QPlainTextEdit, QFileDialog,
+                             QProgressBar, QPushButton, QPlainTextDocumentLayout, QDockWidget)
+from PyQt6.QtCore import Qt, pyqtSignal, QFileInfo, QTimer, QRegularExpression, QCoreApplication
+from PyQt6.QtGui import QFont, QKeySequence, QAction, QTextDocument, QTextCursor, QFontMetricsF
 
 from code_editor import CodeEditor
-from teleprompter_display import TeleprompterDisplay
-from settings_dialog import SettingsDialog
+from script_loader import ScriptLoader, TextFormat, read_text_format
+from icons import icon
+from file_saver import SaveWorker
+from recovery_journal import EditJournal
+from document_sync import SYNC_MODE_FULL, patch_document_texts
+from file_watcher import ScriptWatcher, ReloadWorker
+from settings_store import SettingsStore, diff_settings
+from speed_profile import SPEED_NUDGE_STEPS, clamp_speed, load_sidecar, sidecar_path
+from playlist import ScriptPreloader, RundownPanel
+
+AUTO_SYNC_DELAY_MS = 300
+SETTINGS_SAVE_DELAY_MS = 1000  # Speed nudges from the remote are written once, not per step
+PRELOAD_DELAY_MS = 300  # Resizing the screen or editing the rundown restarts preloading once
 
 class TeleprompterControl(QMainWindow):
-    text_changed = pyqtSignal(str)
+    document_loaded = pyqtSignal(object)  # QTextDocument editor, dimuat ulang seluruhnya
+    document_changed = pyqtSignal(object)  # QTextDocument editor, untuk sync per blok
     settings_changed = pyqtSignal(dict)
     play_pause_triggered = pyqtSignal()
     stop_triggered = pyqtSignal()
@@ -20,18 +33,47 @@ class TeleprompterControl(QMainWindow):
     def __init__(self):
         super().__init__()
 
-        self.current_settings = {
-            'font': QFont("Arial", 48),
-            'font_size': 48,
-            'speed': 50,
-            'word_wrap': True
-        }
+        # Pengaturan terakhir dari disk (satu file JSON kecil)
+        self.settings_store = SettingsStore()
+        self.current_settings = self.settings_store.load()
 
         self.initUI()
         self.current_file = None  # Track current file for Save functionality
+        self.current_format = TextFormat()  # Encoding, BOM and line ending the file is saved with
         self.is_modified = False
+        self.edit_count = 0  # Perubahan pengguna; penyimpanan mencatat sampai mana ia tertulis
+        self.saved_edit_count = 0
 
         self.teleprompter_window = None
+        self.toolbar_icons_loaded = False
+        self.script_loader = None  # Import yang sedang berjalan
+        self.previous_document = None
+        self.import_failed = False
+        self.remote_server = None  # Server remote control (pedal, stream deck, ponsel)
+        self.save_worker = None  # Penyimpanan yang sedang berjalan di thread lain
+        self.pending_save_path = None
+
+        # File skrip diawasi: perubahan dari program lain dimuat ulang per blok
+        self.script_watcher = ScriptWatcher(self)
+        self.script_watcher.file_changed.connect(self.reload_changed_file)
+        self.reload_worker = None
+
+        # Skrip berikutnya di rundown dibaca dan di-layout lebih dulu
+        self.preloader = ScriptPreloader(self.current_settings['preload_count'],
+                                         self.current_settings['preload_mb'], self)
+        self.preloader.ready.connect(lambda path: self.rundown.set_ready(path, True))
+        self.preloader.dropped.connect(lambda path: self.rundown.set_ready(path, False))
+        self.switch_pending = False  # Rundown switch waiting for a plain import
+        self.schedule_preload()
+
+        self.stall_watchdog = None  # Dibuat saat pertama dinyalakan
+        self.event_loop_code = None  # Kode fungsi yang menjalankan app.exec(); diisi oleh main()
+        self.settings_dialog = None  # Dibuat saat pertama dibuka, lalu dipakai ulang
+
+        # Jurnal perubahan untuk pemulihan setelah crash; dimulai setelah
+        # tawaran pemulihan dari sesi sebelumnya (lihat offer_recovery)
+        self.journal = EditJournal(self)
+        QTimer.singleShot(0, self.offer_recovery)
 
     def initUI(self):
         self.setWindowTitle("Teleprompter Control")
@@ -40,6 +82,25 @@ class TeleprompterControl(QMainWindow):
         self.text_edit = CodeEditor()
         self.text_edit.setFont(QFont("Arial", 18))
         self.text_edit.textChanged.connect(self.mark_modified)  # Ini memerlukan metode mark_modified
+        self.text_edit.textChanged.connect(self.schedule_auto_sync)
+        if not self.current_settings['word_wrap']:
+            self.text_edit.setLineWrapMode(QPlainTextEdit.LineWrapMode.NoWrap)
+
+        self.settings_save_timer = QTimer(self)
+        self.settings_save_timer.setSingleShot(True)
+        self.settings_save_timer.setInterval(SETTINGS_SAVE_DELAY_MS)
+        self.settings_save_timer.timeout.connect(self.save_settings)
+
+        # Debounce: update teleprompter setelah pengguna berhenti mengetik
+        self.auto_sync_timer = QTimer(self)
+        self.auto_sync_timer.setSingleShot(True)
+        self.auto_sync_timer.setInterval(AUTO_SYNC_DELAY_MS)
+        self.auto_sync_timer.timeout.connect(self.update_teleprompter)
+
+        self.preload_timer = QTimer(self)
+        self.preload_timer.setSingleShot(True)
+        self.preload_timer.setInterval(PRELOAD_DELAY_MS)
+        self.preload_timer.timeout.connect(self.refresh_preloads)
 
         central_widget = QWidget()
         layout = QVBoxLayout(central_widget)
@@ -50,6 +111,7 @@ class TeleprompterControl(QMainWindow):
 
         file_menu = menubar.addMenu("File")
         options_menu = menubar.addMenu("Options")
+        navigate_menu = menubar.addMenu("Navigate")
         help_menu = menubar.addMenu("Help")
 
         import_action = QAction('Import .txt', self)
@@ -67,6 +129,10 @@ class TeleprompterControl(QMainWindow):
         save_as_action.triggered.connect(self.save_text_as)
         file_menu.addAction(save_as_action)
 
+        take_report_action = QAction('Export Take Report...', self)
+        take_report_action.triggered.connect(self.export_take_report)
+        file_menu.addAction(take_report_action)
+
         close_file_action = QAction('Close File', self)
         close_file_action.triggered.connect(self.close_file)
         file_menu.addAction(close_file_action)
@@ -89,6 +155,101 @@ class TeleprompterControl(QMainWindow):
         word_wrap_action.triggered.connect(self.toggle_word_wrap)
         options_menu.addAction(word_wrap_action)
 
+        auto_sync_action = QAction('Auto Update Teleprompter', self)
+        auto_sync_action.setCheckable(True)
+        auto_sync_action.setChecked(self.current_settings['auto_sync'])
+        auto_sync_action.triggered.connect(self.toggle_auto_sync)
+        options_menu.addAction(auto_sync_action)
+
+        watch_file_action = QAction('Reload File on External Changes', self)
+        watch_file_action.setCheckable(True)
+        watch_file_action.setChecked(self.current_settings['watch_file'])
+        watch_file_action.triggered.connect(self.toggle_watch_file)
+        options_menu.addAction(watch_file_action)
+
+        self.frame_hud_action = QAction('Frame Timing HUD', self)
+        self.frame_hud_action.setCheckable(True)
+        self.frame_hud_action.setChecked(self.current_settings['show_frame_hud'])
+        self.frame_hud_action.setShortcut(QKeySequence('F3'))
+        self.frame_hud_action.triggered.connect(self.toggle_frame_hud)
+        options_menu.addAction(self.frame_hud_action)
+
+        self.frame_log_action = QAction('Log Frame Timing...', self)
+        self.frame_log_action.setCheckable(True)
+        self.frame_log_action.triggered.connect(self.toggle_frame_log)
+        options_menu.addAction(self.frame_log_action)
+
+        self.stall_watchdog_action = QAction('Stall Watchdog...', self)
+        self.stall_watchdog_action.setCheckable(True)
+        self.stall_watchdog_action.triggered.connect(self.toggle_stall_watchdog)
+        options_menu.addAction(self.stall_watchdog_action)
+
+        outputs_menu = options_menu.addMenu('Add Output')
+        for title, transform in (('Mirrored (Beam Splitter)', {'mirror': True}),
+                                 ('Confidence Monitor', {}),
+                                 ('Preview', {'size': (400, 300)})):
+            output_action = QAction(title, self)
+            output_action.triggered.connect(lambda checked, title=title, transform=transform:
+                                            self.add_display_output(title, **transform))
+            outputs_menu.addAction(output_action)
+        outputs_menu.addSeparator()
+        close_outputs_action = QAction('Close Extra Outputs', self)
+        close_outputs_action.triggered.connect(self.close_display_outputs)
+        outputs_menu.addAction(close_outputs_action)
+
+        # Rundown: daftar skrip untuk satu sesi / live stream
+        self.rundown = RundownPanel(self)
+        self.rundown.set_paths(self.current_settings['playlist'])
+        self.rundown.changed.connect(self.playlist_changed)
+        self.rundown.activated.connect(self.switch_script)
+        rundown_dock = QDockWidget("Rundown", self)
+        rundown_dock.setObjectName("rundown")
+        rundown_dock.setWidget(self.rundown)
+        self.addDockWidget(Qt.DockWidgetArea.RightDockWidgetArea, rundown_dock)
+        options_menu.addAction(rundown_dock.toggleViewAction())
+
+        self.remote_control_action = QAction('Remote Control Server', self)
+        self.remote_control_action.setCheckable(True)
+        self.remote_control_action.triggered.connect(self.toggle_remote_control)
+        options_menu.addAction(self.remote_control_action)
+
+        # Lompat antar section / cue marker di layar teleprompter
+        previous_section_action = QAction('Previous Section', self)
+        previous_section_action.setShortcut(QKeySequence('Alt+Up'))
+        previous_section_action.triggered.connect(self.previous_section)
+        navigate_menu.addAction(previous_section_action)
+
+        next_section_action = QAction('Next Section', self)
+        next_section_action.setShortcut(QKeySequence('Alt+Down'))
+        next_section_action.triggered.connect(self.next_section)
+        navigate_menu.addAction(next_section_action)
+
+        # Kecepatan naik / turun satu langkah tanpa membuka Settings
+        faster_action = QAction('Faster', self)
+        faster_action.setShortcut(QKeySequence('Ctrl+Up'))
+        faster_action.triggered.connect(lambda: self.nudge_speed(1))
+        navigate_menu.addAction(faster_action)
+
+        slower_action = QAction('Slower', self)
+        slower_action.setShortcut(QKeySequence('Ctrl+Down'))
+        slower_action.triggered.connect(lambda: self.nudge_speed(-1))
+        navigate_menu.addAction(slower_action)
+
+        previous_script_action = QAction('Previous Script', self)
+        previous_script_action.setShortcut(QKeySequence('Ctrl+PgUp'))
+        previous_script_action.triggered.connect(self.previous_script)
+        navigate_menu.addAction(previous_script_action)
+
+        next_script_action = QAction('Next Script', self)
+        next_script_action.setShortcut(QKeySequence('Ctrl+PgDown'))
+        next_script_action.triggered.connect(self.next_script)
+        navigate_menu.addAction(next_script_action)
+
+        cursor_line_action = QAction('Show Cursor Line on Screen', self)
+        cursor_line_action.setShortcut(QKeySequence('Ctrl+J'))
+        cursor_line_action.triggered.connect(self.show_cursor_line)
+        navigate_menu.addAction(cursor_line_action)
+
         about_action = QAction('About', self)
         about_action.triggered.connect(self.show_about_dialog)
         help_menu.addAction(about_action)
@@ -96,23 +257,56 @@ class TeleprompterControl(QMainWindow):
         toolbar = QToolBar("Control Toolbar", self)
         self.addToolBar(Qt.ToolBarArea.TopToolBarArea, toolbar)
 
-        self.play_pause_action = QAction(qta.icon('fa.play'), "Play", self)
+        # Ikon dipasang setelah jendela pertama kali tampil (lihat load_toolbar_icons)
+        self.play_pause_action = QAction("Play", self)
         self.play_pause_action.triggered.connect(self.play_pause_teleprompter)
         toolbar.addAction(self.play_pause_action)
 
-        stop_action = QAction(qta.icon('fa.stop'), "Stop", self)
-        stop_action.triggered.connect(self.stop_teleprompter)
-        toolbar.addAction(stop_action)
+        self.stop_action = QAction("Stop", self)
+        self.stop_action.triggered.connect(self.stop_teleprompter)
+        toolbar.addAction(self.stop_action)
+
+        self.update_action = QAction("Update Teleprompter", self)
+        self.update_action.triggered.connect(self.update_teleprompter)
+        toolbar.addAction(self.update_action)
 
-        update_action = QAction(qta.icon('fa.edit'), "Update Teleprompter", self)
-        update_action.triggered.connect(self.update_teleprompter)
-        toolbar.addAction(update_action)
+        self.fullscreen_action = QAction("Toggle Full-Screen", self)
+        self.fullscreen_action.triggered.connect(self.toggle_fullscreen_on_teleprompter)
+        toolbar.addAction(self.fullscreen_action)
 
-        fullscreen_action = QAction(qta.icon('fa.arrows-alt'), "Toggle Full-Screen", self)
-        fullscreen_action.triggered.connect(self.toggle_fullscreen_on_teleprompter)
-        toolbar.addAction(fullscreen_action)
+        # Progress import ditampilkan di status bar, tidak memblokir jendela
+        self.import_progress = QProgressBar(self)
+        self.import_progress.setRange(0, 100)
+        self.import_progress.setMaximumWidth(200)
+        self.import_cancel_button = QPushButton("Cancel", self)
+        self.import_cancel_button.clicked.connect(self.cancel_import)
+        self.statusBar().addPermanentWidget(self.import_progress)
+        self.statusBar().addPermanentWidget(self.import_cancel_button)
+        self.import_progress.hide()
+        self.import_cancel_button.hide()
+
+    def paintEvent(self, event):
+        super().paintEvent(event)
+        if not self.toolbar_icons_loaded:
+            self.toolbar_icons_loaded = True
+            startup_profiler.mark('first paint')
+            QTimer.singleShot(0, self.load_toolbar_icons)
+
+    def load_toolbar_icons(self):
+        # qtawesome is the slowest import at startup, so it is loaded only
+        # once the window is already on screen.
+        is_playing = self.teleprompter_window and not self.teleprompter_window.is_paused
+        self.play_pause_action.setIcon(icon('fa.pause' if is_playing else 'fa.play'))
+        self.stop_action.setIcon(icon('fa.stop'))
+        self.update_action.setIcon(icon('fa.edit'))
+        self.fullscreen_action.setIcon(icon('fa.arrows-alt'))
+        startup_profiler.mark('toolbar icons')
+        startup_profiler.print_report()
 
     def mark_modified(self):
+        if self.script_loader:
+            return  # Teks yang sedang diimpor bukan perubahan pengguna
+        self.edit_count += 1
         if not self.is_modified:
             self.is_modified = True
             self.update_window_title()
@@ -136,6 +330,411 @@ class TeleprompterControl(QMainWindow):
         self.text_edit.setLineWrapMode(
             QPlainTextEdit.LineWrapMode.WidgetWidth if self.current_settings['word_wrap'] else QPlainTextEdit.LineWrapMode.NoWrap
         )
+        self.settings_save_timer.start()
+
+    def toggle_auto_sync(self, checked):
+        self.current_settings['auto_sync'] = checked
+        self.settings_save_timer.start()
+        if checked:
+            self.schedule_auto_sync()
+
+    def toggle_watch_file(self, checked):
+        self.current_settings['watch_file'] = checked
+        self.settings_save_timer.start()
+        self.watch_current_file()
+
+    def watch_current_file(self, signature=None):
+        # signature: the file as it was read or written; a newer file is reloaded
+        self.script_watcher.watch(self.current_file if self.current_settings['watch_file'] else None, signature)
+        if signature is not None:
+            self.script_watcher.schedule_check()
+
+    def reload_changed_file(self, file_path):
+        # Another program saved the script: read it in the background, then
+        # patch only the blocks that differ (see finish_reload)
+        if file_path != self.current_file or self.script_loader or self.save_worker or self.reload_worker:
+            # Not acknowledged: checked again once the import, save or reload is done
+            return
+        self.script_watcher.acknowledge()  # Asked once, even if the answer is No
+        if self.is_modified:
+            reply = QMessageBox.question(self, 'File Changed',
+                                         f"{QFileInfo(file_path).fileName()} was changed by another program. "
+                                         "Reload it and discard your unsaved changes?",
+                                         QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No)
+            if reply != QMessageBox.StandardButton.Yes:
+                return
+        self.reload_worker = ReloadWorker(file_path, self)
+        self.reload_worker.loaded.connect(self.finish_reload)
+        self.reload_worker.load_failed.connect(self.show_reload_error)
+        self.reload_worker.finished.connect(self.reload_worker_finished)
+        self.reload_worker.start()
+
+    def finish_reload(self, file_path, texts, text_format):
+        if file_path != self.current_file or self.script_loader:
+            return
+        self.current_format = text_format
+        document = self.text_edit.document()
+        changes = patch_document_texts(texts, document)  # One undo step in the editor
+        self.is_modified = False
+        self.update_window_title()
+        self.journal.reset(self.current_file, modified=False)
+        if changes and self.teleprompter_window:
+            # Block by block whatever the sync mode, so the reader keeps their place
+            self.auto_sync_timer.stop()
+            self.document_changed.emit(document)
+        self.statusBar().showMessage(f"Reloaded {QFileInfo(file_path).fileName()} "
+                                     f"({len(changes)} changed region{'s' if len(changes) != 1 else ''})", 3000)
+
+    def show_reload_error(self, file_path, message):
+        self.statusBar().showMessage(f"Could not reload {QFileInfo(file_path).fileName()}: {message}", 5000)
+
+    def reload_worker_finished(self):
+        self.reload_worker.deleteLater()
+        self.reload_worker = None
+        self.script_watcher.schedule_check()  # Saved again while reading: once more
+
+    def toggle_frame_hud(self, checked):
+        self.current_settings['show_frame_hud'] = checked
+        self.settings_save_timer.start()
+        if self.teleprompter_window:
+            self.teleprompter_window.set_frame_hud_visible(checked)
+
+    def toggle_frame_log(self, checked):
+        if not checked:
+            if self.teleprompter_window:
+                self.teleprompter_window.stop_frame_log()
+            return
+        if not self.teleprompter_window:
+            QMessageBox.warning(self, "Warning", "Open the teleprompter screen before logging frame timing.")
+            self.frame_log_action.setChecked(False)
+            return
+        file_path, _ = QFileDialog.getSaveFileName(self, "Log Frame Timing", "frame_timing.csv", "CSV Files (*.csv)")
+        if not file_path:
+            self.frame_log_action.setChecked(False)
+            return
+        try:
+            self.teleprompter_window.start_frame_log(file_path)
+        except OSError as error:
+            QMessageBox.warning(self, "Log Frame Timing", f"Could not write {file_path}:\n{error}")
+            self.frame_log_action.setChecked(False)
+
+    def toggle_stall_watchdog(self, checked):
+        if not checked:
+            report_path = self.stall_watchdog.stop()
+            self.statusBar().showMessage(f"Stall report saved to {QFileInfo(report_path).fileName()}", 3000)
+            return
+        file_path, _ = QFileDialog.getSaveFileName(self, "Stall Report", "stall_report.txt", "Text Files (*.txt)")
+        if file_path:
+            self.start_stall_watchdog(file_path)
+        else:
+            self.stall_watchdog_action.setChecked(False)
+
+    def start_stall_watchdog(self, file_path):
+        # Event-loop stalls of both windows over the threshold, with the
+        # handlers and call sites that were running, aggregated in file_path
+        from stall_watchdog import StallWatchdog
+
+        if self.stall_watchdog is None:
+            self.stall_watchdog = StallWatchdog(self)
+        self.stall_watchdog.start(file_path, self.current_settings['stall_threshold_ms'], self.event_loop_code)
+        self.stall_watchdog_action.setChecked(True)
+
+    def add_display_output(self, title, mirror=False, flip=False, size=(800, 600)):
+        if not self.teleprompter_window:
+            QMessageBox.warning(self, "Warning", "Open the teleprompter screen before adding outputs.")
+            return
+        self.teleprompter_window.add_output(mirror=mirror, flip=flip, title=f"{title} - Teleprompter", size=size)
+
+    def close_display_outputs(self):
+        if self.teleprompter_window:
+            self.teleprompter_window.close_outputs()
+
+    def toggle_remote_control(self, checked):
+        self.current_settings['remote_control'] = checked
+        if not checked:
+            if self.remote_server:
+                self.remote_server.stop()
+                self.remote_server = None
+            self.statusBar().showMessage("Remote control stopped", 3000)
+            return
+
+        from remote_control import RemoteControlServer  # asyncio hanya dimuat bila dipakai
+
+        self.remote_server = RemoteControlServer(port=self.current_settings['remote_port'], parent=self)
+        self.remote_server.command_received.connect(self.handle_remote_command)
+        try:
+            self.remote_server.start()
+        except OSError as error:
+            self.remote_server = None
+            self.remote_control_action.setChecked(False)
+            self.current_settings['remote_control'] = False
+            QMessageBox.warning(self, "Remote Control", f"Could not start the remote control server:\n{error}")
+            return
+        self.statusBar().showMessage(f"Remote control listening on {self.remote_server.host}:{self.remote_server.port}", 5000)
+
+    def handle_remote_command(self, command):
+        handlers = {
+            'ping': None,
+            'status': None,
+            'play': self.remote_play,
+            'pause': self.remote_pause,
+            'toggle': self.remote_toggle,
+            'stop': lambda args: self.stop_teleprompter(),
+            'speed': self.remote_speed,
+            'jump': self.remote_jump,
+            'script': self.remote_script,
+        }
+        if command.name not in handlers:
+            command.fail(f"unknown command '{command.name}'")
+            return
+        try:
+            if handlers[command.name]:
+                handlers[command.name](command.args)
+        except ValueError as error:
+            command.fail(str(error))
+            return
+        except Exception as error:
+            # Nothing may escape a slot: PyQt would abort the application
+            command.fail(f"{command.name} failed: {error}")
+            return
+
+        applied = time.perf_counter()
+        window = self.teleprompter_window
+        if window is None or command.name == 'ping':
+            command.reply({'ok': True, 'state': window.playback_state() if window else None,
+                           'latency_ms': {'applied': (applied - command.received) * 1000, 'frame': None}})
+            return
+
+        def reply(frame_time):
+            # Latency up to the first frame that shows the command's effect
+            frame = (frame_time - command.received) * 1000 if frame_time else None
+            command.reply({'ok': True, 'state': window.playback_state(),
+                           'latency_ms': {'applied': (applied - command.received) * 1000, 'frame': frame}})
+        window.after_next_frame(reply)
+
+    def script_is_empty(self):
+        # Searched in the document; toPlainText() would copy the whole script
+        return self.text_edit.document().find(QRegularExpression(r'\S')).isNull()
+
+    def require_script(self):
+        if self.script_is_empty():
+            raise ValueError("the script is empty")
+
+    def remote_play(self, args):
+        self.require_script()
+        if not self.teleprompter_window or self.teleprompter_window.is_paused:
+            self.play_pause_teleprompter()
+
+    def remote_pause(self, args):
+        if self.teleprompter_window and not self.teleprompter_window.is_paused:
+            self.play_pause_teleprompter()
+
+    def remote_toggle(self, args):
+        self.require_script()
+        self.play_pause_teleprompter()
+
+    def remote_speed(self, args):
+        # {"value": 80} sets the speed, {"delta": -5} nudges it, {"steps": 1}
+        # nudges it by the keyboard step of the speed unit
+        try:
+            if 'value' in args:
+                speed = float(args['value'])
+            elif 'steps' in args:
+                speed = self.nudged_speed(int(args['steps']))
+            else:
+                speed = self.current_settings['speed'] + float(args.get('delta', 0))
+        except (TypeError, ValueError):
+            raise ValueError("speed needs a numeric 'value' or 'delta'")
+        if not math.isfinite(speed):
+            raise ValueError("speed must be a finite number")  # JSON allows NaN and Infinity
+        if speed <= 0:
+            raise ValueError("speed must be positive")
+        self.update_settings({'speed': clamp_speed(speed, self.current_settings['speed_unit'])})
+
+    def remote_jump(self, args):
+        # {"lines": -3} moves by lines of the display font, {"to": "start"|"end"|"cursor"}
+        # jumps, {"section": "next"|"previous"|3} goes to a section / cue marker
+        window = self.teleprompter_window
+        if not window:
+            raise ValueError("the teleprompter screen is not open")
+        view = window.scroll_view()
+        if args.get('to') == 'start':
+            window.jump_to(0)
+        elif args.get('to') == 'end':
+            window.jump_to(view.maximum_scroll())
+        elif args.get('to') == 'cursor':
+            self.show_cursor_line()
+        elif 'section' in args:
+            section = args['section']
+            if section == 'next':
+                moved = window.next_section()
+            elif section in ('previous', 'prev'):
+                moved = window.previous_section()
+            elif isinstance(section, int) and not isinstance(section, bool):
+                moved = window.jump_to_section(section)
+            else:
+                raise ValueError("'section' must be 'next', 'previous' or a section number")
+            if not moved:
+                raise ValueError("no such section")
+        elif 'lines' in args:
+            try:
+                lines = float(args['lines'])
+            except (TypeError, ValueError):
+                raise ValueError("'lines' must be a number")
+            line_height = QFontMetricsF(window.text_display.font()).lineSpacing()
+            window.jump_to(view.scroll_position() + lines * line_height)
+        else:
+            raise ValueError("jump needs 'lines', 'to' or 'section'")
+
+    def remote_script(self, args):
+        # {"to": "next"|"previous"|2} switches to a rundown entry (1-based)
+        target = args.get('to')
+        index = self.rundown.current_index()
+        if target == 'next':
+            index += 1
+        elif target in ('previous', 'prev'):
+            index -= 1
+        elif isinstance(target, int) and not isinstance(target, bool):
+            index = target - 1
+        else:
+            raise ValueError("'to' must be 'next', 'previous' or a rundown entry number")
+        if not 0 <= index < len(self.rundown.paths):
+            raise ValueError("no such script in the rundown")
+        if self.is_modified:
+            raise ValueError("the current script has unsaved changes")  # Tidak ada dialog untuk remote
+        if self.script_loader:
+            raise ValueError("a file is already being imported")
+        self.switch_script(index)
+
+    def nudged_speed(self, steps):
+        unit = self.current_settings['speed_unit']
+        step = SPEED_NUDGE_STEPS.get(unit, 1)
+        # Round to the step grid so repeated nudges stay on tidy values
+        return clamp_speed(max(step, round(self.current_settings['speed'] / step + steps) * step), unit)
+
+    def nudge_speed(self, steps):
+        # The display eases into the new speed over the speed ramp
+        self.update_settings({'speed': self.nudged_speed(steps)})
+        self.statusBar().showMessage(f"Speed {self.current_settings['speed']:g}", 2000)
+
+    def load_section_speeds(self):
+        # Per-section speeds from the script's sidecar (talk.speeds.json)
+        if not self.teleprompter_window:
+            return
+        try:
+            speeds = load_sidecar(self.current_file)
+        except ValueError as error:
+            speeds = {}
+            QMessageBox.warning(self, "Section Speeds",
+                                f"Could not read {QFileInfo(sidecar_path(self.current_file)).fileName()}:\n{error}")
+        self.teleprompter_window.set_section_speeds(speeds)
+
+    def next_section(self):
+        if self.teleprompter_window:
+            self.teleprompter_window.next_section()
+
+    def previous_section(self):
+        if self.teleprompter_window:
+            self.teleprompter_window.previous_section()
+
+    def show_cursor_line(self):
+        # The editor's block numbers match the screen once it is in sync;
+        # edits still waiting for the auto-sync debounce are sent first
+        window = self.teleprompter_window
+        if not window:
+            return
+        if self.auto_sync_timer.isActive():
+            self.update_teleprompter()
+        window.jump_to_block(self.text_edit.textCursor().blockNumber())
+
+    def playlist_changed(self):
+        self.update_settings({'playlist': list(self.rundown.paths)})
+        self.schedule_preload()
+
+    def schedule_preload(self):
+        self.preload_timer.start()  # Restart: one refresh after a burst of changes
+
+    def refresh_preloads(self):
+        # The rundown entries after the current script, laid out for the screen as it is now
+        self.preload_timer.stop()
+        window = self.teleprompter_window
+        self.preloader.set_layout(window.script_layout() if window else None)
+        self.preloader.preload(self.rundown.paths[self.rundown.current_index() + 1:])
+
+    def follow_current_file(self):
+        # The current script in bold; what comes next in the rundown is preloaded
+        self.rundown.set_current(self.current_file)
+        self.schedule_preload()
+
+    def next_script(self):
+        self.switch_script(self.rundown.current_index() + 1)
+
+    def previous_script(self):
+        index = self.rundown.current_index()
+        if index > 0:
+            self.switch_script(index - 1)
+
+    def switch_script(self, index):
+        # Make a rundown entry the current script, in the editor and on screen.
+        # A preloaded entry is swapped in as it is; any other is imported.
+        if not 0 <= index < len(self.rundown.paths):
+            return
+        if self.script_loader:
+            QMessageBox.warning(self, "Warning", "A file is already being imported.")
+            return
+
+        if self.is_modified:
+            reply = QMessageBox.question(self, 'Unsaved Changes',
+                                         "You have unsaved changes. Do you want to save them?",
+                                         QMessageBox.StandardButton.Save | QMessageBox.StandardButton.Discard | QMessageBox.StandardButton.Cancel)
+            if reply == QMessageBox.StandardButton.Save:
+                if not self.save_and_wait():
+                    return
+            elif reply == QMessageBox.StandardButton.Cancel:
+                return
+
+        file_path = self.rundown.paths[index]
+        self.stop_teleprompter()
+        window = self.teleprompter_window
+        self.preloader.set_layout(window.script_layout() if window else None)
+        entry = self.preloader.take(file_path)
+        self.rundown.set_ready(file_path, False)
+        if entry is None:
+            self.switch_pending = True
+            self.start_import(file_path)
+        else:
+            self.install_script(entry)
+
+    def install_script(self, entry):
+        # Both documents of a preloaded entry replace the current ones; the
+        # old editor document goes the same way as after an import
+        previous = self.text_edit.document()
+        previous.setParent(self)
+        document = entry.editor_document
+        document.setParent(self.text_edit)
+        document.setDefaultFont(self.text_edit.font())
+        self.journal.detach()
+        self.text_edit.setDocument(document, entry.cues)
+        previous.deleteLater()
+        self.auto_sync_timer.stop()  # The screen gets the script below, not through a sync
+        self.text_edit.moveCursor(QTextCursor.MoveOperation.Start)
+        self.current_file = entry.file_path
+        self.current_format = entry.text_format
+        self.is_modified = False
+        self.update_window_title()
+        self.journal.attach(document)
+        self.journal.reset(self.current_file, modified=False)
+        self.watch_current_file(entry.signature)
+        window = self.teleprompter_window
+        if window and not window.swap_document(entry):
+            self.document_loaded.emit(document)  # Laid out for another font or width
+        self.load_section_speeds()
+        self.follow_current_file()
+        self.statusBar().showMessage(f"{QFileInfo(entry.file_path).fileName()} ({entry.text_format})", 3000)
+
+    def schedule_auto_sync(self):
+        if self.current_settings.get('auto_sync') and self.teleprompter_window and not self.script_loader:
+            self.auto_sync_timer.start()  # Restart: menunggu jeda ketikan
 
     def closeEvent(self, event):
         if self.is_modified:
@@ -143,72 +742,302 @@ class TeleprompterControl(QMainWindow):
                                          "You have unsaved changes. Do you want to save them?",
                                          QMessageBox.StandardButton.Save | QMessageBox.StandardButton.Discard | QMessageBox.StandardButton.Cancel)
             if reply == QMessageBox.StandardButton.Save:
-                self.save_text_as()
-                event.ignore()  # Batalkan penutupan setelah menyimpan
+                if not self.save_and_wait():
+                    event.ignore()  # Save As dibatalkan atau gagal: jangan buang perubahan dan jurnalnya
+                    return
             elif reply == QMessageBox.StandardButton.Cancel:
                 event.ignore()  # Batalkan penutupan
-            else:
-                event.accept()  # Lanjutkan penutupan
+                return
+            event.accept()  # Lanjutkan penutupan
 
         if event.isAccepted():
+            if self.script_loader:
+                self.script_loader.cancel()
+                self.script_loader.wait()
+            if self.save_worker:
+                self.save_worker.wait()  # Jangan memotong penyimpanan yang sedang berjalan
+            if self.reload_worker:
+                self.reload_worker.wait()
+            self.preloader.stop()
+            if self.stall_watchdog:
+                self.stall_watchdog.stop()  # Writes the final report
+            if self.remote_server:
+                self.remote_server.stop()
+            if self.settings_save_timer.isActive():
+                self.save_settings()
+            self.journal.discard()
             if self.teleprompter_window:
                 self.teleprompter_window.close()  # Menutup jendela teleprompter saat program utama ditutup
             event.accept()
 
     def update_teleprompter(self):
-        text = self.text_edit.toPlainText()
-        self.text_changed.emit(text)
+        self.auto_sync_timer.stop()
+        if self.current_settings.get('sync_mode') == SYNC_MODE_FULL:
+            self.document_loaded.emit(self.text_edit.document())
+        else:
+            self.document_changed.emit(self.text_edit.document())
         # Jangan update window title di sini agar tanda bintang tetap muncul jika belum disimpan
 
     def open_settings_dialog(self):
-        dialog = SettingsDialog(self, self.current_settings)
-        dialog.settings_changed.connect(self.update_settings)
-        dialog.exec()
+        # Dibuat sekali lalu disembunyikan saat ditutup; dibuka lagi tanpa
+        # membangun ulang daftar font
+        if self.settings_dialog is None:
+            from settings_dialog import SettingsDialog  # Dimuat saat pertama dibutuhkan
+
+            self.settings_dialog = SettingsDialog(self, self.current_settings, self.settings_store, self.convert_speed)
+            self.settings_dialog.settings_changed.connect(self.update_settings)
+        else:
+            self.settings_dialog.load_settings(self.current_settings)
+        self.settings_dialog.show()
+        self.settings_dialog.raise_()
+        self.settings_dialog.activateWindow()
+
+    def convert_speed(self, speed, from_unit, to_unit):
+        # For the Settings dialog: the running speed in the unit it switches to
+        if self.teleprompter_window:
+            return self.teleprompter_window.convert_speed(speed, from_unit, to_unit)
+        from scroll_engine import SPEED_UNIT_WORDS, pixels_per_second, speed_in_unit  # Dimuat bersama dialog
+
+        if SPEED_UNIT_WORDS in (from_unit, to_unit):
+            return None  # Word density needs the laid-out script; nothing is scrolling anyway
+        font = QFont(self.current_settings['font'])
+        font.setPointSize(self.current_settings['font_size'])
+        return speed_in_unit(pixels_per_second(speed, from_unit, font), to_unit, font)
 
     def update_settings(self, settings):
-        self.current_settings = settings  # Simpan pengaturan yang baru
-        self.settings_changed.emit(settings)
+        # Only the changed values travel on; word wrap etc. stay as they are
+        changes = diff_settings(self.current_settings, settings)
+        if not changes:
+            return
+        self.current_settings.update(changes)
+        self.settings_changed.emit(changes)
+        self.settings_save_timer.start()
+        if self.settings_dialog is not None and self.settings_dialog.isVisible():
+            self.settings_dialog.load_settings(self.current_settings)
+        if 'stall_threshold_ms' in changes and self.stall_watchdog:
+            self.stall_watchdog.set_threshold(changes['stall_threshold_ms'])
+        if changes.keys() & {'preload_count', 'preload_mb'}:
+            self.preloader.set_limits(self.current_settings['preload_count'], self.current_settings['preload_mb'])
+        if changes.keys() & {'font', 'font_size', 'render_mode', 'preload_count', 'preload_mb'}:
+            self.schedule_preload()
+
+    def save_settings(self):
+        self.settings_save_timer.stop()
+        self.settings_store.save(self.current_settings)
 
     def import_text_file(self):
         if self.teleprompter_window and not self.teleprompter_window.is_paused:
             QMessageBox.warning(self, "Warning", "Please stop the teleprompter before importing a new file.")
             return
+        if self.script_loader:
+            QMessageBox.warning(self, "Warning", "A file is already being imported.")
+            return
 
-        Tk().withdraw()  # Sembunyikan jendela utama Tkinter
-        file_path = askopenfilename(filetypes=[("Text Files", "*.txt")])
+        file_path, _ = QFileDialog.getOpenFileName(self, "Import Text File", "",
+                                                   "Text Files (*.txt);;All Files (*)")
         if file_path:
-            with open(file_path, 'r', encoding='utf-8') as file:
-                content = file.read()
-                self.text_edit.setPlainText(content)
-                self.current_file = file_path  # Set current file to imported file
-                self.is_modified = False
-                self.update_window_title()
+            self.start_import(file_path)
 
-    def save_text(self):
-        if self.current_file:
-            with open(self.current_file, 'w', encoding='utf-8') as file:
-                file.write(self.text_edit.toPlainText())
+    def start_import(self, file_path):
+        # The text is streamed into a fresh document; the old one is kept
+        # aside so a cancelled or failed import can be rolled back instantly.
+        self.previous_document = self.text_edit.document()
+        self.previous_document.setParent(self)
+        document = QTextDocument(self.text_edit)
+        document.setDocumentLayout(QPlainTextDocumentLayout(document))
+        document.setDefaultFont(self.text_edit.font())
+        self.text_edit.setDocument(document)
+        self.text_edit.setReadOnly(True)
+        self.journal.detach()  # Isi impor tidak perlu dijurnal per chunk
+
+        self.import_failed = False
+        self.script_loader = ScriptLoader(file_path, self)
+        self.script_loader.encoding_detected.connect(self.show_import_encoding)
+        self.script_loader.chunk_loaded.connect(self.append_imported_chunk)
+        self.script_loader.progress_changed.connect(self.import_progress.setValue)
+        self.script_loader.load_failed.connect(self.show_import_error)
+        self.script_loader.finished.connect(self.finish_import)
+
+        self.import_progress.setValue(0)
+        self.import_progress.show()
+        self.import_cancel_button.show()
+        self.statusBar().showMessage(f"Importing {QFileInfo(file_path).fileName()}...")
+        self.script_loader.start()
+
+    def show_import_encoding(self, encoding):
+        if self.script_loader:
+            self.statusBar().showMessage(f"Importing {QFileInfo(self.script_loader.file_path).fileName()} ({encoding})...")
+
+    def append_imported_chunk(self, text):
+        cursor = QTextCursor(self.text_edit.document())
+        cursor.movePosition(QTextCursor.MoveOperation.End)
+        cursor.insertText(text)
+        self.script_loader.chunk_consumed()
+
+    def show_import_error(self, message):
+        self.import_failed = True
+        QMessageBox.warning(self, "Import Failed", f"Could not import the file:\n{message}")
+
+    def cancel_import(self):
+        if self.script_loader:
+            self.script_loader.cancel()
+
+    def finish_import(self):
+        loader = self.script_loader
+        self.script_loader = None
+        switched = self.switch_pending
+        self.switch_pending = False
+        self.import_progress.hide()
+        self.import_cancel_button.hide()
+        self.text_edit.setReadOnly(False)
+
+        if self.import_failed or loader.isInterruptionRequested():
+            self.text_edit.setDocument(self.previous_document)  # Kembalikan dokumen lama
+            self.previous_document.setParent(self.text_edit)
+            self.journal.attach(self.text_edit.document())
+            self.statusBar().showMessage("Import cancelled", 3000)
+            self.script_watcher.schedule_check()  # Changes to the current file while importing
+        else:
+            self.previous_document.deleteLater()
+            self.text_edit.moveCursor(QTextCursor.MoveOperation.Start)
+            self.current_file = loader.file_path  # Set current file to imported file
+            self.current_format = loader.text_format
             self.is_modified = False
             self.update_window_title()
+            self.journal.attach(self.text_edit.document())
+            self.journal.reset(self.current_file, modified=False)
+            self.watch_current_file(loader.signature)
+            self.load_section_speeds()
+            self.follow_current_file()
+            self.statusBar().showMessage(f"Imported ({loader.text_format})", 3000)
+            if switched and self.teleprompter_window:
+                self.document_loaded.emit(self.text_edit.document())  # Rundown switch: on screen right away
+            else:
+                self.schedule_auto_sync()
+        self.previous_document = None
+        loader.deleteLater()
+
+    def save_text(self):
+        if self.current_file:
+            self.start_save(self.current_file)
         else:
             self.save_text_as()
 
     def save_text_as(self):
-        options = QFileDialog.Options()
-        options |= QFileDialog.Option.DontUseNativeDialog
-        file_path, _ = QFileDialog.getSaveFileName(self, "Save As", "", 
-                                                   "Text Files (*.txt);;All Files (*)", 
-                                                   options=options)
+        file_path, _ = QFileDialog.getSaveFileName(self, "Save As", "",
+                                                   "Text Files (*.txt);;All Files (*)",
+                                                   options=QFileDialog.Option.DontUseNativeDialog)
         if file_path:
             # Periksa apakah file_path sudah memiliki ekstensi .txt
             if not file_path.endswith(".txt"):
                 file_path += ".txt"  # Tambahkan .txt jika belum ada
 
-            with open(file_path, 'w', encoding='utf-8') as file:
-                file.write(self.text_edit.toPlainText())
-                self.current_file = file_path  # Set current file to saved file
-                self.is_modified = False
+            self.start_save(file_path)
+
+    def start_save(self, file_path):
+        if self.save_worker:
+            self.pending_save_path = file_path  # Disimpan lagi setelah yang berjalan selesai
+            return
+        if file_path == self.current_file and self.script_watcher.has_changed():
+            reply = QMessageBox.question(self, 'File Changed',
+                                         f"{QFileInfo(file_path).fileName()} was changed by another program "
+                                         "since it was opened. Overwrite it with your version?",
+                                         QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No)
+            if reply != QMessageBox.StandardButton.Yes:
+                return  # Still modified: close and switch stay cancelled
+
+        # The text is copied here on the GUI thread; writing happens on the worker
+        self.save_worker = SaveWorker(file_path, self.text_edit.toPlainText(), self, self.current_format)
+        self.save_worker.saved.connect(self.finish_save)
+        self.save_worker.save_failed.connect(self.show_save_error)
+        self.save_worker.finished.connect(self.save_worker_finished)
+        # current_file dan is_modified baru berubah setelah berkas benar-benar
+        # tertulis (finish_save); gagal berarti tidak ada yang hilang
+        self.saved_edit_count = self.edit_count
+        self.statusBar().showMessage(f"Saving {QFileInfo(file_path).fileName()}...")
+        self.save_worker.start()
+
+    def finish_save(self, file_path):
+        self.statusBar().showMessage(f"Saved {QFileInfo(file_path).fileName()}", 3000)
+        if self.edit_count == self.saved_edit_count:
+            self.is_modified = False  # Otherwise typed while saving: still modified
+        if file_path == self.current_file:
+            # Our own write, not an external change; anything after it still is
+            self.script_watcher.acknowledge(self.save_worker.signature)
+        else:
+            self.current_file = file_path  # Save As: the new file is the script from now on
+            self.watch_current_file(self.save_worker.signature)
+            self.follow_current_file()
+        self.update_window_title()
+        self.journal.reset(file_path, modified=self.is_modified)
+
+    def show_save_error(self, file_path, message):
+        # current_file still names the last file that was written (or none),
+        # so Ctrl+S does not go to a path that failed
+        self.is_modified = True
+        self.update_window_title()
+        self.statusBar().clearMessage()
+        QMessageBox.warning(self, "Save Failed", f"Could not save {file_path}:\n{message}")
+
+    def save_and_wait(self):
+        # Save, then block until it is written and its result delivered,
+        # for callers that drop the document right after (close, switch).
+        # True once nothing is left unsaved; False when Save As was
+        # cancelled or the write failed (show_save_error has told the user).
+        self.save_text()
+        while self.save_worker:
+            self.save_worker.wait()
+            QCoreApplication.sendPostedEvents()  # saved / save_failed / finished, maybe a pending save
+        return not self.is_modified
+
+    def save_worker_finished(self):
+        self.save_worker.deleteLater()
+        self.save_worker = None
+        if self.pending_save_path:
+            file_path = self.pending_save_path
+            self.pending_save_path = None
+            self.start_save(file_path)
+        else:
+            self.script_watcher.schedule_check()  # Changed by another program while saving
+
+    def offer_recovery(self):
+        recovered = self.journal.find_recovery()
+        if recovered:
+            text, file_path = recovered
+            name = QFileInfo(file_path).fileName() if file_path else "an untitled script"
+            reply = QMessageBox.question(self, 'Recover Unsaved Changes',
+                                         f"A previous session ended unexpectedly with unsaved changes to {name}. "
+                                         "Do you want to restore them?",
+                                         QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No)
+            if reply == QMessageBox.StandardButton.Yes:
+                self.text_edit.setPlainText(text)
+                self.current_file = file_path
+                try:
+                    self.current_format = read_text_format(file_path) if file_path else TextFormat()
+                except OSError:
+                    pass  # File sudah tidak ada: disimpan sebagai UTF-8
+                self.is_modified = True
                 self.update_window_title()
+                self.watch_current_file()
+
+        self.journal.attach(self.text_edit.document())
+        self.journal.reset(self.current_file, modified=self.is_modified)
+
+    def export_take_report(self):
+        # Section lap times of the running take, or of the last one after Stop
+        window = self.teleprompter_window
+        if not window or window.report_take() is None:
+            QMessageBox.information(self, "Take Report", "No take recorded yet. Play the script to record one.")
+            return
+        file_path, _ = QFileDialog.getSaveFileName(self, "Export Take Report", "take_report.csv", "CSV Files (*.csv)")
+        if not file_path:
+            return
+        try:
+            window.export_take_report(file_path)
+        except OSError as error:
+            QMessageBox.warning(self, "Take Report", f"Could not write the report:\n{error}")
+            return
+        self.statusBar().showMessage(f"Take report saved to {QFileInfo(file_path).fileName()}", 3000)
 
     def close_file(self):
         if self.teleprompter_window and not self.teleprompter_window.is_paused:
@@ -220,62 +1049,68 @@ class TeleprompterControl(QMainWindow):
                                          "You have unsaved changes. Do you want to save them?",
                                          QMessageBox.StandardButton.Save | QMessageBox.StandardButton.Discard | QMessageBox.StandardButton.Cancel)
             if reply == QMessageBox.StandardButton.Save:
-                self.save_text()
+                if not self.save_and_wait():
+                    return
             elif reply == QMessageBox.StandardButton.Cancel:
                 return
 
         self.text_edit.clear()
         self.current_file = None
+        self.current_format = TextFormat()
         self.is_modified = False
         self.update_window_title()
+        self.journal.reset(None, modified=False)
+        self.watch_current_file()
+        self.load_section_speeds()
+        self.follow_current_file()
 
     def exit_program(self):
         if self.teleprompter_window and not self.teleprompter_window.is_paused:
             QMessageBox.warning(self, "Warning", "Please stop the teleprompter before exiting the program.")
             return
 
-        if self.is_modified:
-            reply = QMessageBox.question(self, 'Unsaved Changes',
-                                         "You have unsaved changes. Do you want to save them?",
-                                         QMessageBox.StandardButton.Save | QMessageBox.StandardButton.Discard | QMessageBox.StandardButton.Cancel)
-            if reply == QMessageBox.StandardButton.Save:
-                self.save_text_as()
-            elif reply == QMessageBox.StandardButton.Cancel:
-                return
-
-        self.close()
+        self.close()  # closeEvent menanyakan perubahan yang belum disimpan
 
     def play_pause_teleprompter(self):
-        if self.text_edit.toPlainText().strip() == "":
+        if self.script_is_empty():
             QMessageBox.warning(self, "Warning", "Text is empty. Please import a file or type some text before starting the teleprompter.")
             return
 
         if not self.teleprompter_window:
+            from teleprompter_display import TeleprompterDisplay  # Dimuat saat pertama dibutuhkan
+
             self.teleprompter_window = TeleprompterDisplay(self.current_settings)
-            self.text_changed.connect(self.teleprompter_window.update_text)
+            self.document_loaded.connect(self.teleprompter_window.load_document)
+            self.document_changed.connect(self.teleprompter_window.sync_document)
             self.settings_changed.connect(self.teleprompter_window.update_settings)
+            self.teleprompter_window.speed_nudged.connect(self.nudge_speed)
+            self.teleprompter_window.frame_hud_toggled.connect(self.frame_hud_action.trigger)  # Check mark follows F3
+            self.teleprompter_window.script_layout_changed.connect(self.schedule_preload)
             # Hubungkan sinyal ke fungsi teleprompter
             self.play_pause_triggered.connect(self.teleprompter_window.play_pause)
             self.stop_triggered.connect(self.teleprompter_window.stop)
             self.toggle_fullscreen_triggered.connect(self.teleprompter_window.toggle_fullscreen)  # Hubungkan full-screen signal ke layar baca
-            # Kirimkan teks saat pertama kali play ditekan
-            self.update_teleprompter()
+            # Tampilkan dulu, lalu kirim teks: layout langsung memakai lebar
+            # layar yang sebenarnya (dan cocok dengan script cache)
             self.teleprompter_window.show()
+            self.update_teleprompter()
+            self.load_section_speeds()
+            self.schedule_preload()  # Lay the next scripts out for this screen
 
         self.play_pause_triggered.emit()  # Play atau Pause teleprompter
 
         # Toggle tombol play/pause
         if self.teleprompter_window.is_paused:
-            self.play_pause_action.setIcon(qta.icon('fa.play'))
+            self.play_pause_action.setIcon(icon('fa.play'))
             self.play_pause_action.setText("Play")
         else:
-            self.play_pause_action.setIcon(qta.icon('fa.pause'))
+            self.play_pause_action.setIcon(icon('fa.pause'))
             self.play_pause_action.setText("Pause")
 
     def stop_teleprompter(self):
         if self.teleprompter_window:
             self.stop_triggered.emit()
-            self.play_pause_action.setIcon(qta.icon('fa.play'))
+            self.play_pause_action.setIcon(icon('fa.play'))
             self.play_pause_action.setText("Play")  # Reset tombol ke "Play" setelah stop
 
     def close_teleprompter_screen(self):
@@ -283,6 +1118,7 @@ class TeleprompterControl(QMainWindow):
             self.stop_teleprompter()  # Pastikan teleprompter berhenti saat layar ditutup
             self.teleprompter_window.close()
             self.teleprompter_window = None  # Reset window reference
+            self.frame_log_action.setChecked(False)
 
     def show_about_dialog(self):
         about_text = """
@@ -305,11 +1141,21 @@ class TeleprompterControl(QMainWindow):
         msg_box.exec()
 
 def main():
+    startup_profiler.enabled = '--profile-startup' in sys.argv
+    startup_profiler.mark('imports')
     app = QApplication(sys.argv)
+    app.setApplicationName("Teleprompter")
+    startup_profiler.mark('QApplication')
 
     control_window = TeleprompterControl()
+    control_window.event_loop_code = main.__code__  # Stall stacks are cut at app.exec() below
+    startup_profiler.mark('control window')
+    if '--stall-report' in sys.argv[:-1]:
+        # Watch a whole recording session from the start
+        control_window.start_stall_watchdog(sys.argv[sys.argv.index('--stall-report') + 1])
 
     control_window.show()
+    startup_profiler.mark('show')
 
     sys.exit(app.exec())
 
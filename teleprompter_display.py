@@ -1,22 +1,55 @@
-from PyQt6.QtWidgets import QWidget, QTextEdit, QVBoxLayout, QLabel
-from PyQt6.QtCore import QTimer, QPoint, QTime, Qt
-from PyQt6.QtGui import QFont, QTextCursor, QMouseEvent
+import time
+
+from PyQt6.QtWidgets import QWidget, QVBoxLayout, QHBoxLayout, QLabel
+from PyQt6.QtCore import QTimer, QPoint, Qt, pyqtSignal
+from PyQt6.QtGui import QFont, QFontMetricsF, QTextCursor, QTextDocument, QMouseEvent
+
+from scroll_engine import (ScrollEngine, SmoothTextEdit, pixels_per_second, speed_in_unit, FRAME_INTERVAL_MS,
+                           SCROLL_MODE_SMOOTH, SCROLL_MODE_TICK, SPEED_UNIT_PIXELS, SPEED_UNIT_WORDS)
+from speed_profile import SpeedProfile, section_target, DEFAULT_SPEED_RAMP
+from tiled_surface import TiledScrollView, TransformedTileView, TILE_BUDGET_MB
+from document_sync import patch_document, copy_document, reading_anchor, anchor_position, ChangedBlocks
+from frame_stats import FrameStats
+from settings_store import diff_settings, RENDER_MODE_TILED
+from cue_index import CueIndex, cue_title
+from take_timer import TakeRecorder, format_duration, START_SECTION_TITLE
+from script_cache import ScriptCache, ScriptHasher, CompiledScript, CacheWriter, script_key, layout_key
+from progressive_layout import ProgressiveLayout, preview_range, make_preview, PROGRESSIVE_LAYOUT_CHARS
+from word_index import WordIndex
+
+HUD_REFRESH_MS = 250
+STOPWATCH_REFRESH_MS = 100  # Hanya tampilan; waktunya sendiri dari jam monotonic
+PACING_REFRESH_MS = 500
+FRAME_WAIT_MS = 250  # after_next_frame gives up when nothing is painted (hidden window)
+READING_LINE = 1 / 3  # Eye line as a fraction of the view height, for the remaining words
 
 class TeleprompterDisplay(QWidget):
+    speed_nudged = pyqtSignal(int)  # Up / Down on the screen: +1 / -1 speed step, applied by the control
+    frame_hud_toggled = pyqtSignal()  # F3 on the screen: toggled by the control's menu action
+    script_layout_changed = pyqtSignal()  # Resized: preloaded scripts need the new wrap width
+
     def __init__(self, settings):
         super().__init__()
         self.speed = settings.get('speed', 50)
+        self.speed_unit = settings.get('speed_unit', SPEED_UNIT_PIXELS)
+        self.scroll_mode = settings.get('scroll_mode', SCROLL_MODE_SMOOTH)
+        self.render_mode = settings.get('render_mode', RENDER_MODE_TILED)
         self.is_paused = True  # Awalnya teleprompter dalam keadaan berhenti
+        self.scroll_engine = ScrollEngine(ramp=settings.get('speed_ramp', DEFAULT_SPEED_RAMP))
+        self.section_speeds = {}  # Dari file sidecar skrip: nomor / judul section -> kecepatan
         self.timer = QTimer(self)
+        self.timer.setTimerType(Qt.TimerType.PreciseTimer)
         self.timer.timeout.connect(self.scroll_text)
-        self.timer.setInterval(1000 // self.speed)  # Mengatur interval berdasarkan kecepatan
+        self.frame_stats = FrameStats()
         self.dragging = False  # Flag untuk mendeteksi drag
         self.last_mouse_pos = QPoint()  # Posisi terakhir mouse
 
-        # Timer untuk stopwatch
+        # Stopwatch dan lap per section untuk take yang sedang berjalan;
+        # take sebelumnya disimpan untuk diekspor setelah stop
+        self.take = TakeRecorder()
+        self.previous_take = None
         self.stopwatch_timer = QTimer(self)
         self.stopwatch_timer.timeout.connect(self.update_stopwatch)
-        self.stopwatch_time = QTime(0, 0)  # Mulai stopwatch dari 00:00
         self.initUI(settings)
 
     def initUI(self, settings):
@@ -24,27 +57,300 @@ class TeleprompterDisplay(QWidget):
         self.setGeometry(950, 100, 800, 600)
         self.setWindowFlags(Qt.WindowType.FramelessWindowHint)
 
-        self.text_display = QTextEdit(self)
-        font = settings.get('font', QFont("Arial", 48))
-        font_size = settings.get('font_size', 48)
-        font.setPointSize(font_size)
-        self.text_display.setFont(font)
+        # Salinan sendiri: update_settings membandingkan dengan nilai ini
+        self.settings = dict(settings)
+        if 'font' in settings:
+            self.settings['font'] = QFont(settings['font'])
+
+        self.text_display = SmoothTextEdit(self)
+        self.text_display.setFont(self.display_font())
         self.text_display.setReadOnly(True)
         self.text_display.setVerticalScrollBarPolicy(Qt.ScrollBarPolicy.ScrollBarAlwaysOff)
 
+        # Permukaan tile memakai dokumen yang sama dengan QTextEdit. Setelah
+        # swap_document di mode tiled, QTextEdit memegang dokumen kosong dan
+        # baru mendapat skripnya saat mode live dipakai (attach_text_display)
+        self.document = self.text_display.document()
+        self.document.setUndoRedoEnabled(False)  # Read-only copy: patches must not pile up as undo history
+        self.placeholder_document = None
+        self.tiled_view = TiledScrollView(self.document, self)
+        self.tiled_view.set_palette(self.text_display.viewport().palette())
+        self.tiled_view.tile_cache.set_budget_mb(settings.get('tile_cache_mb', TILE_BUDGET_MB))
+
+        self.word_index = WordIndex(self.document)
+        self.cue_index = CueIndex(self.document, self)  # Section / cue markers untuk navigasi
+        self.source_changes = ChangedBlocks(self)  # Blok editor yang berubah sejak sync terakhir
+
+        # Relayout bertahap saat ukuran font berubah; selama itu layar
+        # menampilkan preview kecil di sekitar posisi baca
+        self.relayout = ProgressiveLayout(self)
+        self.relayout.progress.connect(self.show_relayout_progress)
+        self.relayout.finished.connect(self.finish_relayout)
+        self.preview = None
+        self.preview_first = 0  # Nomor blok skrip dari blok pertama preview
+
+        # Hasil kompilasi skrip besar (jumlah kata, cue, tinggi blok) per isi + layout
+        self.script_cache = ScriptCache()
+        self.script_key = None  # Kunci isi dokumen; None setelah dokumen di-patch
+        self.cache_writers = []
+
         # Inisialisasi label stopwatch
         self.stopwatch_label = QLabel(self)
         self.stopwatch_label.setAlignment(Qt.AlignmentFlag.AlignRight)
-        self.stopwatch_label.setText(self.stopwatch_time.toString("mm:ss"))
+        self.update_stopwatch()
+
+        # Sisa kata dan perkiraan waktu selesai
+        self.pacing_label = QLabel(self)
+        self.pacing_timer = QTimer(self)
+        self.pacing_timer.timeout.connect(self.update_pacing)
+
+        status_layout = QHBoxLayout()
+        status_layout.addWidget(self.pacing_label)
+        status_layout.addWidget(self.stopwatch_label)  # Tambahkan label stopwatch ke layout
 
         layout = QVBoxLayout()
         layout.addWidget(self.text_display)
-        layout.addWidget(self.stopwatch_label)  # Tambahkan label stopwatch ke layout
+        layout.addWidget(self.tiled_view)
+        layout.addLayout(status_layout)
         self.setLayout(layout)
 
+        # HUD frame timing melayang di atas teks, di luar layout
+        self.frame_hud = QLabel(self)
+        self.frame_hud.setStyleSheet("background-color: rgba(0, 0, 0, 170); color: #7CFC00; "
+                                     "font-family: monospace; font-size: 12px; padding: 6px;")
+        self.frame_hud.move(12, 12)
+        self.frame_hud_timer = QTimer(self)
+        self.frame_hud_timer.timeout.connect(self.update_frame_hud)
+        self.set_frame_hud_visible(settings.get('show_frame_hud', False))
+
+        # Callback untuk latensi perintah -> frame (remote control)
+        self.frame_callbacks = []
+        self.frame_wait_timer = QTimer(self)
+        self.frame_wait_timer.setSingleShot(True)
+        self.frame_wait_timer.timeout.connect(self.expire_frame_callbacks)
+        self.text_display.painted.connect(self.run_frame_callbacks)
+        self.tiled_view.painted.connect(self.run_frame_callbacks)
+
+        # Output tambahan (mirror, monitor, preview) memakai tile yang sama
+        self.outputs = []
+        self.text_display.painted.connect(self.sync_outputs)
+        self.tiled_view.painted.connect(self.sync_outputs)
+
+        self.apply_render_mode()
+        self.apply_scroll_speed()
+        self.update_pacing()
+
+    def scroll_view(self):
+        # Widget yang sedang menampilkan teks: tiles atau QTextEdit langsung
+        if self.render_mode == RENDER_MODE_TILED or self.preview is not None:
+            return self.tiled_view
+        return self.text_display
+
+    def apply_render_mode(self):
+        position = self.scroll_engine.position
+        tiled = self.scroll_view() is self.tiled_view
+        # Hide before show: showing a widget while the other is still visible
+        # resizes it to half the window, and a resized QTextEdit relayouts the
+        # whole script
+        hidden, shown = (self.text_display, self.tiled_view) if tiled else (self.tiled_view, self.text_display)
+        hidden.setVisible(False)
+        shown.setVisible(True)
+        if not tiled:
+            self.tiled_view.prefetch_timer.stop()
+            self.tiled_view.tile_cache.invalidate()  # Bebaskan memori tile
+            self.attach_text_display()
+            if self.document.textWidth() != self.text_display.viewport().width():
+                self.document.setTextWidth(self.text_display.viewport().width())  # Relayout penuh, meski lebarnya sama
+        self.scroll_view().set_scroll_position(position)
+
+    def attach_text_display(self):
+        # A document swapped in while tiled is laid out at the tiled view's
+        # width; QTextEdit.setDocument rewraps it at the viewport's
+        if self.text_display.document() is not self.document:
+            self.text_display.setDocument(self.document)
+
+    def set_script_font(self, font):
+        self.text_display.setFont(font)  # Also the font the speed units are measured in
+        if self.text_display.document() is not self.document:
+            self.document.setDefaultFont(font)
+
+    def resizeEvent(self, event):
+        super().resizeEvent(event)
+        self.script_layout_changed.emit()
+
+    def after_next_frame(self, callback):
+        # callback(frame_time) once the scroll view has painted the current
+        # state, or callback(None) if no frame is painted within FRAME_WAIT_MS
+        self.frame_callbacks.append(callback)
+        self.scroll_view().update()
+        if not self.frame_wait_timer.isActive():
+            self.frame_wait_timer.start(FRAME_WAIT_MS)
+
+    def run_frame_callbacks(self, frame_time=None):
+        if not self.frame_callbacks:
+            return
+        if frame_time is None:
+            frame_time = time.perf_counter()
+        self.frame_wait_timer.stop()
+        callbacks, self.frame_callbacks = self.frame_callbacks, []
+        for callback in callbacks:
+            callback(frame_time)
+
+    def expire_frame_callbacks(self):
+        callbacks, self.frame_callbacks = self.frame_callbacks, []
+        for callback in callbacks:
+            callback(None)
+
+    def add_output(self, mirror=False, flip=False, scale=None, title="Teleprompter Output", size=(800, 600)):
+        output = TransformedTileView(self.tiled_view, mirror, flip, scale)
+        output.setWindowTitle(title)
+        output.resize(*size)
+        output.closed.connect(self.remove_output)
+        output.set_scroll_position(self.scroll_view().scroll_position())
+        self.outputs.append(output)
+        output.show()
+        return output
+
+    def remove_output(self, output):
+        if output in self.outputs:
+            self.outputs.remove(output)
+            output.deleteLater()
+
+    def close_outputs(self):
+        for output in list(self.outputs):
+            output.close()
+
+    def sync_outputs(self):
+        # Every output follows the main view, which follows the scroll engine
+        position = self.scroll_view().scroll_position()
+        for output in self.outputs:
+            output.set_scroll_position(position)
+
+    def playback_state(self):
+        self.update_pacing()  # Also re-reads the word index after a relayout
+        view = self.scroll_view()
+        return {
+            'playing': not self.is_paused,
+            'position': view.scroll_position(),
+            'maximum': view.maximum_scroll(),
+            'speed': self.speed,
+            'speed_unit': self.speed_unit,
+            'velocity': round(self.current_pixels_per_second(), 2),
+            'words_left': self.words_left(),
+            'elapsed': round(self.take.elapsed(), 3),
+            'section': self.cue_index.section_number(self.reading_block()),
+            'sections': len(self.cue_index.blocks),
+        }
+
+    def words_left(self):
+        if self.preview is not None:
+            return None  # Tinggi blok belum diketahui selama relayout
+        view = self.scroll_view()
+        return round(self.word_index.words_after(view.scroll_position() + view.height() * READING_LINE))
+
+    def jump_to(self, position):
+        view = self.scroll_view()
+        self.scroll_engine.set_maximum(view.maximum_scroll())
+        self.scroll_engine.set_position(position)
+        view.set_scroll_position(self.scroll_engine.position)
+        self.update_pacing()  # Refreshes the word index first, e.g. after a font change
+        self.track_take(jumped=True)
+
+    def reading_block(self):
+        # Script block under the reading line. The pixel of slack keeps a
+        # block that a jump put exactly on the line from reading as the one before
+        view = self.scroll_view()
+        y = view.scroll_position() + view.height() * READING_LINE + 1
+        if self.preview is not None:
+            return self.preview_first + reading_anchor(self.preview, y)[0]
+        self.refresh_word_index()
+        return self.word_index.block_at(y)
+
+    def block_top(self, block_number):
+        # y of a script block from the WordIndex prefix sums: O(log n),
+        # without walking the layout up to the block
+        if self.preview is not None:
+            preview_block = block_number - self.preview_first
+            if 0 <= preview_block < self.preview.blockCount():
+                block = self.preview.findBlockByNumber(preview_block)
+                return self.preview.documentLayout().blockBoundingRect(block).top()
+            self.complete_relayout()  # Di luar preview: layout skrip dibutuhkan sekarang
+        self.refresh_word_index()
+        return self.word_index.block_top(block_number)
+
+    def jump_to_block(self, block_number):
+        # Put the block on the reading line
+        self.jump_to(self.block_top(block_number) - self.scroll_view().height() * READING_LINE)
+
+    def next_section(self):
+        cue = self.cue_index.next_cue(self.reading_block())
+        if cue is None:
+            return False
+        self.jump_to_block(cue)
+        return True
+
+    def previous_section(self):
+        # Like a media player: back to the start of the current section,
+        # or to the section before when already (about) at its start
+        block = self.reading_block()
+        cue = self.cue_index.section_of(block)
+        if cue is None:
+            return False
+        view = self.scroll_view()
+        reading_y = view.scroll_position() + view.height() * READING_LINE
+        if reading_y - self.block_top(cue) <= QFontMetricsF(self.text_display.font()).lineSpacing():
+            cue = self.cue_index.previous_cue(cue)
+            if cue is None:
+                return False
+        self.jump_to_block(cue)
+        return True
+
+    def jump_to_section(self, number):
+        # 1-based, as in playback_state
+        if not 1 <= number <= len(self.cue_index.blocks):
+            return False
+        self.jump_to_block(self.cue_index.blocks[number - 1])
+        return True
+
     def keyPressEvent(self, event):
         if event.key() == Qt.Key.Key_F11:
             self.toggle_fullscreen()
+        elif event.key() == Qt.Key.Key_PageDown:
+            self.next_section()  # Presentation clickers send PageUp / PageDown
+        elif event.key() == Qt.Key.Key_PageUp:
+            self.previous_section()
+        elif event.key() == Qt.Key.Key_Up:
+            self.speed_nudged.emit(1)
+        elif event.key() == Qt.Key.Key_Down:
+            self.speed_nudged.emit(-1)
+        elif event.key() == Qt.Key.Key_F3:
+            self.frame_hud_toggled.emit()
+
+    def set_frame_hud_visible(self, visible):
+        self.frame_hud.setVisible(visible)
+        if visible:
+            self.update_frame_hud()
+            self.frame_hud.raise_()
+            self.frame_hud_timer.start(HUD_REFRESH_MS)
+        else:
+            self.frame_hud_timer.stop()
+
+    def update_frame_hud(self):
+        self.frame_hud.setText(self.frame_stats.hud_text())
+        self.frame_hud.adjustSize()
+
+    def start_frame_log(self, file_path):
+        self.frame_stats.start_log(file_path)
+
+    def stop_frame_log(self):
+        self.frame_stats.stop_log()
+
+    def closeEvent(self, event):
+        self.frame_stats.stop_log()  # Pastikan baris log terakhir tertulis
+        self.close_outputs()
+        for writer in self.cache_writers:
+            writer.wait()  # Thread tidak boleh hancur selagi berjalan
+        super().closeEvent(event)
 
     def toggle_fullscreen(self):
         if self.isFullScreen():
@@ -53,57 +359,498 @@ class TeleprompterDisplay(QWidget):
             self.showFullScreen()
 
     def update_text(self, text):
-        self.text_display.setText(text)
+        self.load_document(text)
+
+    def load_document(self, source):
+        # Full sync from the editor's QTextDocument (or a string): the whole
+        # script again, back to the top
+        self.drop_preview()
+        self.load_script(source)
         self.text_display.moveCursor(QTextCursor.MoveOperation.Start)
+        self.scroll_engine.set_position(0)
+        self.scroll_view().set_scroll_position(0)
+        self.apply_scroll_speed()
+        self.update_pacing()
+
+    def load_script(self, source):
+        # Replace the whole script with source, a QTextDocument or a string.
+        # A document is copied chunk by chunk and hashed on the way, so no
+        # full-text string is made. A large script seen before at this font
+        # and width takes its indices and block heights from the script
+        # cache and is laid out in slices; otherwise they are computed here,
+        # which lays out the whole document at once, and stored.
+        document = self.document
+        self.tiled_view.tile_cache.height_hint = None
+        self.take.invalidate()
+        self.cue_index.detach()  # Tanpa scan cue per contentsChange
+        if isinstance(source, str):
+            document.setPlainText(source)
+            self.script_key = script_key(source) if len(source) > PROGRESSIVE_LAYOUT_CHARS else None
+        else:
+            hasher = ScriptHasher() if source.characterCount() > PROGRESSIVE_LAYOUT_CHARS else None
+            copy_document(source, document, hasher.update if hasher else None)
+            self.source_changes.mark(source, document)
+            self.script_key = hasher.key() if hasher else None
+        compiled = None
+        if self.script_key is not None:
+            compiled = self.script_cache.load(self.script_key, layout_key(document))
+        if compiled is not None and compiled.block_count() == document.blockCount():
+            self.word_index.set_metrics(compiled.words, compiled.top, compiled.heights)
+            self.cue_index.set_document(document, compiled.cues)
+            self.tiled_view.tile_cache.height_hint = compiled.document_height
+            self.relayout.start(document)
+            return
+        self.word_index.rebuild()
+        self.cue_index.set_document(document)
+        self.store_compiled_script()
+
+    def script_layout(self):
+        # (font, wrap width) a preloaded script has to be laid out at for
+        # swap_document; None in live mode, where the QTextEdit lays it out again
+        if self.render_mode != RENDER_MODE_TILED:
+            return None
+        return QFont(self.document.defaultFont()), self.document.textWidth()
+
+    def swap_document(self, script):
+        # Show a script laid out ahead of time, a playlist.PreloadedScript:
+        # the tiled view and the indices take its document and metrics as
+        # they are, nothing is copied or laid out. False, with nothing
+        # changed, when it was laid out for another font or width.
+        document, compiled = script.display_document, script.compiled
+        if (self.render_mode != RENDER_MODE_TILED or compiled is None
+                or compiled.block_count() != document.blockCount()):
+            return False
+        self.drop_preview()
+        if layout_key(document) != layout_key(self.document):
+            return False
+        previous = self.document
+        self.take.invalidate()
+        self.cue_index.detach()
+        document.setParent(self)
+        document.setUndoRedoEnabled(False)
+        self.tiled_view.set_document(document)
+        self.tiled_view.tile_cache.height_hint = None
+        self.document = document
+        self.word_index = script.word_index
+        self.cue_index.set_document(document, compiled.cues)
+        self.script_key = script.key
+        owned = previous.parent() is self
+        if self.text_display.document() is previous:
+            if self.placeholder_document is None:
+                self.placeholder_document = QTextDocument(self)
+            self.text_display.setDocument(self.placeholder_document)  # Deletes QTextEdit's own document
+        if owned:
+            previous.deleteLater()
+        self.store_compiled_script()
+        self.scroll_engine.set_position(0)
+        self.scroll_view().set_scroll_position(0)
+        self.apply_scroll_speed()
+        self.update_pacing()
+        return True
+
+    def store_compiled_script(self):
+        # Called with a laid-out document and up to date indices
+        if self.script_key is None or self.preview is not None:
+            return
+        key = layout_key(self.document)
+        if self.script_cache.contains(self.script_key, key):
+            return
+        compiled = CompiledScript(list(self.word_index.words), list(self.cue_index.blocks), self.word_index.top,
+                                  list(self.word_index.heights),
+                                  self.document.documentLayout().documentSize().height())
+        writer = CacheWriter(self.script_cache, self.script_key, key, compiled, self)
+        writer.finished.connect(lambda writer=writer: self.cache_writer_finished(writer))
+        self.cache_writers.append(writer)
+        writer.start()
+
+    def cache_writer_finished(self, writer):
+        self.cache_writers.remove(writer)
+        writer.deleteLater()
+
+    def sync_document(self, source):
+        # Patch only the changed blocks and keep the reader on the same line
+        self.complete_relayout()  # Patching needs the real layout of the script
+        view = self.scroll_view()
+        document = self.document
+        if document.isEmpty():
+            # First sync: nothing to patch or anchor, load it whole
+            self.load_script(source)
+            self.scroll_engine.set_maximum(view.maximum_scroll())
+            self.apply_scroll_speed()
+            self.update_pacing()
+            return
+        anchor = reading_anchor(document, view.scroll_position())
+        changes = patch_document(source, document, self.source_changes.bounds(source, document))
+        self.source_changes.mark(source, document)
+        if not changes:
+            return
+        self.script_key = None  # Isi sudah berbeda dari entri cache
+        self.take.invalidate()
+        position = anchor_position(document, anchor, changes)
+        self.scroll_engine.set_maximum(view.maximum_scroll())
+        self.scroll_engine.set_position(position)
+        view.set_scroll_position(position)
+        self.word_index.apply_changes(changes)
+        self.apply_scroll_speed()  # Section dan kepadatan kata ikut berubah
+        self.update_pacing()
+
+    def apply_scroll_speed(self):
+        # During a relayout the old density and section tops stand in
+        if self.preview is None and self.word_index.refresh():
+            self.take.invalidate()
+        if self.scroll_mode == SCROLL_MODE_TICK:
+            # Mode lama: 1 px per tick, so the interval follows the speed in
+            # px/s whatever its unit; at least 1 px/s (WPM of a wordless script)
+            pixels = max(1.0, self.to_pixels_per_second(self.speed))
+            self.timer.setInterval(max(1, int(1000 / pixels)))
+        else:
+            self.timer.setInterval(FRAME_INTERVAL_MS)
+            self.scroll_engine.set_profile(self.speed_profile())
+
+    def refresh_word_index(self):
+        # Font or wrap width changes move every block. refresh() reports that
+        # only once, so every caller goes through here: the take's section
+        # bounds, the section starts and the WPM density all follow
+        if not self.word_index.refresh():
+            return False
+        self.take.invalidate()
+        self.apply_scroll_speed()
+        return True
+
+    def to_pixels_per_second(self, speed):
+        # A speed in the current unit
+        if self.speed_unit == SPEED_UNIT_WORDS:
+            return self.word_index.pixels_per_second(speed)
+        return pixels_per_second(speed, self.speed_unit, self.text_display.font())
+
+    def convert_speed(self, speed, from_unit, to_unit):
+        # The same scroll speed in another unit at the current font and
+        # layout, for the Settings dialog; None when words per minute has
+        # no meaning (a script without words)
+        font = self.text_display.font()
+        if from_unit == SPEED_UNIT_WORDS:
+            if not self.word_index.total_words():
+                return None
+            pixels = self.word_index.pixels_per_second(speed)
+        else:
+            pixels = pixels_per_second(speed, from_unit, font)
+        if to_unit == SPEED_UNIT_WORDS:
+            return self.word_index.words_per_minute(pixels)
+        return speed_in_unit(pixels, to_unit, font)
+
+    def speed_profile(self):
+        # Target speed per section, switching where the section start
+        # reaches the reading line. Rebuilt when the speed, the layout or
+        # the sections change, never per frame.
+        base = self.to_pixels_per_second(self.speed)
+        if self.preview is not None:
+            # Preview coordinates: the reader's section keeps its speed until the relayout is done
+            number = self.cue_index.section_number(self.reading_block())
+            block = self.cue_index.blocks[number - 1] if number else None
+            return SpeedProfile.flat(self.section_target(number, block, base))
+        offset = self.scroll_view().height() * READING_LINE
+        starts = [0.0]
+        speeds = [self.section_target(0, None, base)]
+        for number, block in enumerate(self.cue_index.blocks, 1):
+            starts.append(self.word_index.block_top(block) - offset)
+            speeds.append(self.section_target(number, block, base))
+        return SpeedProfile(starts, speeds)
+
+    def section_target(self, number, block, base):
+        cue_text = self.document.findBlockByNumber(block).text() if block is not None else None
+        return section_target(number, self.section_title(number), cue_text, base,
+                              self.to_pixels_per_second, self.section_speeds)
+
+    def set_section_speeds(self, speeds):
+        self.section_speeds = dict(speeds)
+        self.apply_scroll_speed()
+        self.update_pacing()
+
+    def current_pixels_per_second(self):
+        if self.scroll_mode == SCROLL_MODE_TICK:
+            return 1000 / self.timer.interval()
+        if self.scroll_engine.running:
+            return self.scroll_engine.velocity()  # Also while easing into a new speed
+        return self.scroll_engine.target_speed()
+
+    def update_pacing(self):
+        if self.preview is not None:
+            return  # show_relayout_progress owns the label meanwhile
+        self.refresh_word_index()
+        view = self.scroll_view()
+        position = view.scroll_position()
+        remaining = self.words_left()
+        if self.scroll_mode == SCROLL_MODE_TICK:
+            seconds = max(0, view.maximum_scroll() - position) / self.current_pixels_per_second()
+        else:
+            seconds = self.scroll_engine.profile.seconds_between(position, view.maximum_scroll())
+        if seconds != float('inf'):
+            seconds = int(seconds)
+            eta = f"{seconds // 60:02d}:{seconds % 60:02d}"
+        else:
+            eta = "--:--"
+        self.pacing_label.setText(f"{remaining:,} words left   ETA {eta}")
+
+    def display_font(self):
+        # A copy, so the QFont shared through the control's settings is never changed
+        font = QFont(self.settings.get('font', QFont("Arial", 48)))
+        font.setPointSize(self.settings.get('font_size', 48))
+        return font
+
+    def apply_font(self):
+        font = self.display_font()
+        if self.preview is not None or self.document.characterCount() > PROGRESSIVE_LAYOUT_CHARS:
+            self.relayout_progressively(font)
+            return
+        anchor = self.current_anchor()
+        self.set_script_font(font)
+        self.move_to_anchor(self.document, anchor)
+
+    def current_anchor(self):
+        # (script block number, fraction of that block) at the top of the view;
+        # a fraction rather than pixels, since the block height changes with the font
+        document = self.preview or self.document
+        block_number, offset = reading_anchor(document, self.scroll_view().scroll_position())
+        rect = document.documentLayout().blockBoundingRect(document.findBlockByNumber(block_number))
+        return self.preview_first + block_number, offset / rect.height() if rect.height() > 0 else 0.0
+
+    def move_to_anchor(self, document, anchor, first=0):
+        block_number, fraction = anchor
+        block = document.findBlockByNumber(min(max(0, block_number - first), document.blockCount() - 1))
+        rect = document.documentLayout().blockBoundingRect(block)
+        self.jump_to(rect.top() + fraction * rect.height())
+
+    def relayout_progressively(self, font):
+        # The blocks around the reader are laid out at once in a small
+        # preview document and shown through the tiled view; the script
+        # itself is laid out in slices and swapped back in when done.
+        anchor = self.current_anchor()
+        self.tiled_view.tile_cache.height_hint = None
+        self.take.invalidate()  # Posisi berikutnya dalam koordinat preview
+        first, end = preview_range(self.document, anchor[0])
+        previous = self.preview
+        self.preview = make_preview(self.document, first, end, font, self)
+        self.preview_first = first
+        self.tiled_view.set_document(self.preview)
+        if previous is not None:
+            previous.deleteLater()
+        self.apply_render_mode()
+        self.set_script_font(font)  # Only marks the script's layout dirty
+        self.move_to_anchor(self.preview, anchor, first)
+        self.relayout.start(self.document)
+        self.show_relayout_progress(0.0)
+
+    def show_relayout_progress(self, fraction):
+        if self.preview is None:
+            return  # Script cache layout: heights are known, pacing stays on
+        self.pacing_label.setText(f"Laying out the script... {fraction:.0%}")
+
+    def complete_relayout(self):
+        # Finish a running relayout at once, e.g. before patching the script
+        while self.relayout.is_running():
+            self.relayout.step()
+
+    def finish_relayout(self):
+        anchor = self.current_anchor()
+        self.word_index.set_heights(self.relayout.top, self.relayout.heights)
+        self.tiled_view.tile_cache.height_hint = None
+        self.take.invalidate()
+        self.drop_preview()
+        self.move_to_anchor(self.document, anchor)
+        self.store_compiled_script()  # E.g. the same script at the new font size
+        self.apply_scroll_speed()  # Section dan kepadatan kata berubah bersama font
+        self.update_pacing()
+
+    def drop_preview(self):
+        self.relayout.cancel()
+        if self.preview is None:
+            return
+        preview = self.preview
+        self.preview = None
+        self.preview_first = 0
+        # Hide the tiled view first in live mode, so it does not rewrap the script
+        self.apply_render_mode()
+        self.tiled_view.set_document(self.document)
+        preview.deleteLater()
 
     def update_settings(self, settings):
-        font = settings.get('font', QFont("Arial", 48))
-        font_size = settings.get('font_size', 48)
-        font.setPointSize(font_size)
-        self.text_display.setFont(font)
+        # Only what actually changed is applied: a speed change must not
+        # trigger a relayout of the whole script mid-scroll
+        changes = diff_settings(self.settings, settings)
+        if not changes:
+            return
+        if 'font' in changes:
+            changes['font'] = QFont(changes['font'])
+        self.settings.update(changes)
 
-        if 'speed' in settings:
-            self.speed = settings['speed']
-            self.timer.setInterval(1000 // self.speed)  # Perbarui interval timer
+        if 'font' in changes or 'font_size' in changes:
+            self.apply_font()
+
+        if 'speed' in changes:
+            self.speed = changes['speed']
+        if 'speed_unit' in changes:
+            self.speed_unit = changes['speed_unit']
+        if 'scroll_mode' in changes:
+            self.scroll_mode = changes['scroll_mode']
+            self.sync_engine_from_view()
+        if 'speed_ramp' in changes:
+            self.scroll_engine.set_ramp(changes['speed_ramp'])
+        if changes.keys() & {'speed', 'speed_unit', 'scroll_mode', 'font', 'font_size'}:
+            self.apply_scroll_speed()  # Perbarui interval timer / kecepatan engine
+
+        if 'tile_cache_mb' in changes:
+            self.tiled_view.tile_cache.set_budget_mb(changes['tile_cache_mb'])
+        if 'render_mode' in changes:
+            self.sync_engine_from_view()
+            self.render_mode = changes['render_mode']
+            self.apply_render_mode()
+        self.update_pacing()
+
+    def sync_engine_from_view(self):
+        # The view may have moved outside the engine (mouse wheel, legacy mode)
+        view = self.scroll_view()
+        self.scroll_engine.set_maximum(view.maximum_scroll())
+        if abs(self.scroll_engine.position - view.scroll_position()) >= 1:
+            self.scroll_engine.set_position(view.scroll_position())
 
     def scroll_text(self):
-        if not self.is_paused:
-            current_scroll_value = self.text_display.verticalScrollBar().value()
-            max_scroll_value = self.text_display.verticalScrollBar().maximum()
+        if self.is_paused:
+            return
+        start = time.perf_counter()
+        if self.scroll_mode == SCROLL_MODE_TICK:
+            self.scroll_text_tick()
+        else:
+            self.scroll_text_smooth()
+        self.track_take()
+        requested_speed = self.current_pixels_per_second()
+        view = self.scroll_view()
+        self.frame_stats.record(start, view.scroll_position(), requested_speed,
+                                time.perf_counter() - start, view.last_paint_time)
 
-            if current_scroll_value < max_scroll_value:
-                self.text_display.verticalScrollBar().setValue(current_scroll_value + 1)
-            else:
-                self.finish_scrolling()
+    def scroll_text_tick(self):
+        view = self.scroll_view()
+        current_scroll_value = int(view.scroll_position())
+        max_scroll_value = view.maximum_scroll()
+
+        if current_scroll_value < max_scroll_value:
+            view.set_scroll_position(current_scroll_value + 1)
+        else:
+            self.finish_scrolling()
+
+    def scroll_text_smooth(self):
+        # Maximum can change while running (resize, font change), so refresh it each frame
+        view = self.scroll_view()
+        self.scroll_engine.set_maximum(view.maximum_scroll())
+        view.set_scroll_position(self.scroll_engine.advance())
+        if self.scroll_engine.at_end():
+            self.finish_scrolling()
 
     def finish_scrolling(self):
         self.timer.stop()
+        self.scroll_engine.pause()
+        self.take.pause()
         self.stopwatch_timer.stop()
+        self.update_stopwatch()
+        self.pacing_timer.stop()
         self.is_paused = True
+        self.update_pacing()
 
     def play_pause(self):
         if self.is_paused:
             self.is_paused = False
+            self.sync_engine_from_view()
+            self.scroll_engine.start()
+            self.frame_stats.reset()
+            self.frame_stats.set_expected_interval(self.timer.interval() / 1000)
             self.timer.start()  # Memulai timer untuk scroll
-            self.stopwatch_timer.start(1000)  # Memulai stopwatch dengan interval 1 detik
+            self.take.start()
+            self.track_take()  # Lap pertama mulai di posisi sekarang
+            self.stopwatch_timer.start(STOPWATCH_REFRESH_MS)
+            self.pacing_timer.start(PACING_REFRESH_MS)
         else:
             self.is_paused = True
             self.timer.stop()  # Menghentikan timer untuk menghentikan scroll
+            self.scroll_engine.pause()
+            self.take.pause()
             self.stopwatch_timer.stop()  # Jeda stopwatch
+            self.update_stopwatch()
+            self.pacing_timer.stop()
+            self.update_pacing()
 
     def stop(self):
         self.is_paused = True
         self.timer.stop()  # Menghentikan timer
+        self.finish_take()  # Sebelum kembali ke awal: lap terakhir berakhir di sini
+        self.scroll_engine.pause()
+        self.scroll_engine.set_position(0)
         self.text_display.moveCursor(QTextCursor.MoveOperation.Start)
-        self.text_display.verticalScrollBar().setValue(0)
+        self.scroll_view().set_scroll_position(0)
 
         self.stopwatch_timer.stop()  # Menghentikan stopwatch
-        self.stopwatch_time = QTime(0, 0)  # Reset stopwatch
-        self.stopwatch_label.setText(self.stopwatch_time.toString("mm:ss"))
+        self.update_stopwatch()
+        self.pacing_timer.stop()
+        self.update_pacing()
 
     def update_stopwatch(self):
-        self.stopwatch_time = self.stopwatch_time.addSecs(1)
-        self.stopwatch_label.setText(self.stopwatch_time.toString("mm:ss"))
+        self.stopwatch_label.setText(format_duration(self.take.elapsed()))
+
+    def finish_take(self):
+        # Keep the take for the report and start the next one from zero
+        self.take.finish(self.reading_words())
+        if self.take.laps:
+            self.previous_take = self.take
+        self.take = TakeRecorder()
+
+    def report_take(self):
+        # The running take, or the last one after a stop
+        return self.take if self.take.laps else self.previous_take
+
+    def export_take_report(self, file_path):
+        # Returns False when there is no take to report
+        take = self.report_take()
+        if take is None:
+            return False
+        now_words = self.reading_words() if take is self.take else None
+        take.export_csv(file_path, now_words)
+        return True
+
+    def reading_y(self):
+        view = self.scroll_view()
+        return view.scroll_position() + view.height() * READING_LINE
+
+    def reading_words(self):
+        # Word offset at the reading line; None during a relayout
+        if self.preview is not None:
+            return None
+        return self.word_index.words_before(self.reading_y())
+
+    def locate_section(self, y):
+        # (section number, title, top, bottom) at document y of the scroll view
+        if self.preview is not None:
+            # Preview coordinates: no bounds, looked up again on every frame
+            block = self.preview_first + reading_anchor(self.preview, y)[0]
+            number = self.cue_index.section_number(block)
+            return number, self.section_title(number), y, y
+        blocks = self.cue_index.blocks
+        number = self.cue_index.section_number(self.word_index.block_at(y))
+        top = self.word_index.block_top(blocks[number - 1]) if number else 0.0
+        bottom = self.word_index.block_top(blocks[number]) if number < len(blocks) else float('inf')
+        return number, self.section_title(number), top, bottom
+
+    def section_title(self, number):
+        if not number:
+            return START_SECTION_TITLE
+        return cue_title(self.document.findBlockByNumber(self.cue_index.blocks[number - 1]).text())
+
+    def track_take(self, jumped=False):
+        # Per frame and after jumps: O(1) while the reading line stays inside
+        # the current section
+        if not self.take.is_active():
+            return
+        if self.preview is None:
+            self.refresh_word_index()  # ~10 us when nothing changed
+        words_at = self.word_index.words_before if self.preview is None else None
+        self.take.observe(self.reading_y(), self.locate_section, words_at, jumped)
 
     def mousePressEvent(self, event: QMouseEvent):
         if event.button() == Qt.MouseButton.LeftButton:
@@ -0,0 +1,16 @@
+import os
+import sys
+
+import pytest
+
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+
+@pytest.fixture(scope='session')
+def qapp():
+    # Text layout and fonts need a QGuiApplication; one for the whole run
+    QtWidgets = pytest.importorskip('PyQt6.QtWidgets')
+    return QtWidgets.QApplication.instance() or QtWidgets.QApplication([])
@@ -0,0 +1,95 @@
+import random
+
+import pytest
+
+from PyQt6.QtGui import QTextCursor, QTextDocument
+
+from cue_index import CueIndex, is_cue_line
+
+SCRIPT = ["# Opening", "Welcome everyone", "[CUE: camera 2] look left", "Some text", "",
+          "[SECTION Q&A]", "Question one", "Answer one", "## Outro", "Thanks"]
+
+
+def full_rebuild(document):
+    return [number for number, line in enumerate(document.toPlainText().split('\n')) if is_cue_line(line)]
+
+
+def make_index():
+    document = QTextDocument()
+    document.documentLayout()  # contentsChange is only emitted once a layout exists, as in the editor
+    document.setPlainText('\n'.join(SCRIPT))
+    return document, CueIndex(document)
+
+
+def block_position(document, number, column=0):
+    return document.findBlockByNumber(number).position() + column
+
+
+def insert(document, position, text):
+    cursor = QTextCursor(document)
+    cursor.setPosition(position)
+    cursor.insertText(text)
+
+
+def remove(document, start, end):
+    cursor = QTextCursor(document)
+    cursor.setPosition(start)
+    cursor.setPosition(end, QTextCursor.MoveMode.KeepAnchor)
+    cursor.removeSelectedText()
+
+
+EDITS = {
+    'add cue line': lambda d: insert(d, block_position(d, 3), "[CUE] new\n"),
+    'add cue at the end': lambda d: insert(d, d.characterCount() - 1, "\n# Encore"),
+    'add cue at the start': lambda d: insert(d, 0, "[CUE]\n"),
+    'make a line a cue': lambda d: insert(d, block_position(d, 1), "# "),
+    'remove cue line': lambda d: remove(d, block_position(d, 2), block_position(d, 3)),
+    'remove cue tag': lambda d: remove(d, block_position(d, 5), block_position(d, 5, 13)),
+    'remove first cue': lambda d: remove(d, 0, block_position(d, 1)),
+    'split before tag': lambda d: insert(d, block_position(d, 2), "intro\n"),
+    'split after tag': lambda d: insert(d, block_position(d, 2, 15), "\n"),
+    'split inside tag': lambda d: insert(d, block_position(d, 2, 3), "\n"),
+    'join with cue line': lambda d: remove(d, block_position(d, 2) - 1, block_position(d, 2)),
+    'remove several lines': lambda d: remove(d, block_position(d, 1, 3), block_position(d, 7, 2)),
+    'replace everything': lambda d: d.setPlainText("[CUE] a\nb\n# c"),
+    'type inside a cue': lambda d: insert(d, block_position(d, 0, 3), "Grand "),
+}
+
+
+@pytest.mark.parametrize('edit', EDITS.values(), ids=EDITS.keys())
+def test_incremental_update_matches_full_rebuild(qapp, edit):
+    document, index = make_index()
+    assert index.blocks == full_rebuild(document)
+    edit(document)
+    assert index.blocks == full_rebuild(document)
+    assert index.block_count == document.blockCount()
+
+
+def test_random_edits_and_undo(qapp):
+    generator = random.Random(3)
+    document, index = make_index()
+    pieces = ["[CUE]", "\n", "# ", "text ", "\n[SECTION x]\n", "\n\n"]
+    for _ in range(200):
+        end = document.characterCount() - 1
+        start = generator.randint(0, end)
+        if generator.random() < 0.6:
+            insert(document, start, generator.choice(pieces))
+        else:
+            remove(document, start, min(end, start + generator.randint(1, 20)))
+        assert index.blocks == full_rebuild(document)
+    for _ in range(50):
+        document.undo()
+        assert index.blocks == full_rebuild(document)
+
+
+def test_lookups(qapp):
+    document = QTextDocument()
+    document.setPlainText('\n'.join(SCRIPT))
+    index = CueIndex(document)
+    assert index.blocks == [0, 2, 5, 8]
+    assert index.section_number(1) == 1
+    assert index.section_of(4) == 2
+    assert index.next_cue(2) == 5
+    assert index.previous_cue(2) == 0
+    assert index.next_cue(8) is None
+    assert index.titles()[0] == (0, "Opening")
@@ -0,0 +1,139 @@
+import pytest
+
+from PyQt6.QtGui import QTextCursor, QTextDocument
+
+from document_sync import (ChangedBlocks, anchor_position, changed_block_range, copy_document, patch_document,
+                           reading_anchor)
+
+LINES = [f"line {number} of the script" for number in range(40)]
+
+
+def make_document(lines):
+    document = QTextDocument()
+    document.setTextWidth(400)
+    document.setPlainText('\n'.join(lines))
+    document.documentLayout()  # contentsChange is only emitted once a layout exists, as in the editor
+    return document
+
+
+def lines_of(document):
+    return document.toPlainText().split('\n')
+
+
+def edited(lines, edit, where):
+    index = {'start': 0, 'middle': len(lines) // 2, 'end': len(lines)}[where]
+    lines = list(lines)
+    if edit == 'insert':
+        lines[index:index] = ["new one", "new two"]
+    elif edit == 'delete':
+        index = min(index, len(lines) - 2)
+        del lines[index:index + 2]
+    else:
+        index = min(index, len(lines) - 2)
+        lines[index:index + 2] = ["replaced"]
+    return lines
+
+
+EDITS = [(edit, where) for edit in ('insert', 'delete', 'replace') for where in ('start', 'middle', 'end')]
+
+
+@pytest.mark.parametrize('edit, where', EDITS)
+def test_patch_matches_source(qapp, edit, where):
+    source = make_document(edited(LINES, edit, where))
+    target = make_document(LINES)
+    changes = patch_document(source, target)
+    assert changes
+    assert lines_of(target) == lines_of(source)
+    assert target.blockCount() == source.blockCount()
+
+
+@pytest.mark.parametrize('edit, where', EDITS)
+def test_patch_with_changed_block_bounds(qapp, edit, where):
+    # The source is edited in place, as the editor does, and only the
+    # blocks ChangedBlocks recorded are compared
+    source = make_document(LINES)
+    target = make_document(LINES)
+    tracker = ChangedBlocks()
+    tracker.mark(source, target)
+
+    wanted = edited(LINES, edit, where)
+    patch_document(make_document(wanted), source)  # Edits source block by block
+    bounds = tracker.bounds(source, target)
+    assert bounds is not None
+    first, tail = bounds
+    full = changed_block_range(source, target)
+    assert first <= full[0]
+    assert tail <= source.blockCount() - full[1]
+
+    patch_document(source, target, bounds)
+    assert lines_of(target) == wanted
+
+
+def test_bounds_dropped_after_target_changes(qapp):
+    source = make_document(LINES)
+    target = make_document(LINES)
+    tracker = ChangedBlocks()
+    tracker.mark(source, target)
+    QTextCursor(target).insertText("x")
+    assert tracker.bounds(source, target) is None
+
+
+def test_equal_documents_need_no_changes(qapp):
+    source = make_document(LINES)
+    target = make_document(LINES)
+    assert changed_block_range(source, target) is None
+    assert patch_document(source, target) == []
+
+
+@pytest.mark.parametrize('source_lines, target_lines', [
+    (LINES, []),
+    ([], LINES),
+    ([], []),
+    ([''], ['only line']),
+])
+def test_empty_documents(qapp, source_lines, target_lines):
+    source = make_document(source_lines)
+    target = make_document(target_lines)
+    patch_document(source, target)
+    assert target.toPlainText() == source.toPlainText()
+
+
+@pytest.mark.parametrize('chunk_chars', [1, 7, 64, 16 * 1024])
+def test_copy_document_in_chunks(qapp, chunk_chars):
+    lines = LINES + ["x" * 100, "", "last"]
+    source = make_document(lines)
+    target = make_document(["old text"])
+    chunks = []
+    copy_document(source, target, chunks.append, chunk_chars)
+    assert target.toPlainText() == source.toPlainText()
+    assert target.blockCount() == source.blockCount()
+    assert ''.join(chunks) == source.toPlainText()
+
+
+def block_top(document, number):
+    return document.documentLayout().blockBoundingRect(document.findBlockByNumber(number)).top()
+
+
+@pytest.mark.parametrize('lines, block, offset_blocks', [
+    (["inserted"] * 3 + LINES, 20, 3),  # Above the anchor: it moves down
+    (LINES[5:], 20, -5),  # Deleted above: it moves up
+    (LINES[:30] + ["appended"], 20, 0),  # Below the anchor: it stays
+])
+def test_anchor_kept_across_edits(qapp, lines, block, offset_blocks):
+    target = make_document(LINES)
+    source = make_document(lines)
+    y = block_top(target, block) + 3
+    anchor = reading_anchor(target, y)
+    assert anchor[0] == block
+    changes = patch_document(source, target)
+    assert anchor_position(target, anchor, changes) == pytest.approx(block_top(target, block + offset_blocks) + 3)
+
+
+def test_anchor_in_rewritten_block_goes_to_its_top(qapp):
+    lines = list(LINES)
+    lines[20] = "rewritten"
+    target = make_document(LINES)
+    source = make_document(lines)
+    anchor = reading_anchor(target, block_top(target, 20) + 3)
+    changes = patch_document(source, target)
+    assert anchor_position(target, anchor, changes) == pytest.approx(block_top(target, 20))
@@ -0,0 +1,34 @@
+import pytest
+
+pytest.importorskip('PyQt6')
+
+from file_saver import SaveWorker
+from script_loader import read_text_file
+
+
+def open_edit_save(file_path):
+    # What the control window does: import, change a word, save over the file
+    text, text_format = read_text_file(str(file_path))
+    worker = SaveWorker(str(file_path), text.replace('Hello', 'Howdy'), text_format=text_format)
+    worker.run()  # Synchronously, on this thread
+    return text_format
+
+
+@pytest.mark.parametrize('original, edited, encoding', [
+    ('Hello café\r\nNext line\r\n'.encode('cp1252'), 'Howdy café\r\nNext line\r\n'.encode('cp1252'), 'cp1252'),
+    ('﻿Hello café\nNext line\n'.encode('utf-16-le'), '﻿Howdy café\nNext line\n'.encode('utf-16-le'), 'utf-16'),
+    ('﻿Hello café\nNext line\n'.encode('utf-16-be'), '﻿Howdy café\nNext line\n'.encode('utf-16-be'), 'utf-16'),
+    ('﻿Hello café\r\n'.encode('utf-8'), '﻿Howdy café\r\n'.encode('utf-8'), 'utf-8-sig'),
+])
+def test_save_keeps_encoding_bom_and_line_endings(tmp_path, original, edited, encoding):
+    file_path = tmp_path / 'script.txt'
+    file_path.write_bytes(original)
+    text_format = open_edit_save(file_path)
+    assert text_format.encoding == encoding
+    assert file_path.read_bytes() == edited
+
+
+def test_save_without_format_writes_utf8(tmp_path):
+    file_path = tmp_path / 'script.txt'
+    SaveWorker(str(file_path), 'Hello café\n').run()
+    assert file_path.read_bytes() == 'Hello café\n'.encode('utf-8')
@@ -0,0 +1,88 @@
+import os
+
+import pytest
+
+from PyQt6.QtGui import QFont, QTextDocument
+
+from script_cache import CompiledScript, ScriptCache, layout_key, script_key
+
+COMPILED = CompiledScript([3, 0, 7], [1], 4.0, [20.5, 18.0, 41.25], 83.75)
+
+
+def make_document(font_size=24, width=600):
+    document = QTextDocument()
+    document.setDefaultFont(QFont("Arial", font_size))
+    document.setTextWidth(width)
+    document.setPlainText("one two three\n# Cue\nfour five six seven eight nine ten")
+    return document
+
+
+def test_encode_decode_round_trip():
+    data = COMPILED.encode('script', 'layout')
+    decoded = CompiledScript.decode(data, 'script', 'layout')
+    assert decoded.words == COMPILED.words
+    assert decoded.cues == COMPILED.cues
+    assert decoded.top == COMPILED.top
+    assert decoded.heights == COMPILED.heights
+    assert decoded.document_height == COMPILED.document_height
+
+
+@pytest.mark.parametrize('script, layout', [('other', 'layout'), ('script', 'other')])
+def test_decode_rejects_another_key(script, layout):
+    assert CompiledScript.decode(COMPILED.encode('script', 'layout'), script, layout) is None
+
+
+def test_decode_rejects_truncated_and_padded_entries():
+    data = COMPILED.encode('script', 'layout')
+    assert CompiledScript.decode(data[:-1], 'script', 'layout') is None
+    assert CompiledScript.decode(data + b'\0', 'script', 'layout') is None
+
+
+def test_script_key_follows_the_text():
+    assert script_key("abc") == script_key("abc")
+    assert script_key("abc") != script_key("abd")
+
+
+def test_miss_after_font_or_width_change(qapp, tmp_path):
+    cache = ScriptCache(str(tmp_path))
+    document = make_document()
+    key = script_key(document.toPlainText())
+    cache.store(key, layout_key(document), COMPILED)
+    assert cache.load(key, layout_key(document)).words == COMPILED.words
+    assert cache.load(key, layout_key(make_document())) is not None  # Same font and width: same key
+
+    assert cache.load(key, layout_key(make_document(font_size=30))) is None
+    assert cache.load(key, layout_key(make_document(width=500))) is None
+
+
+def test_unreadable_entry_is_a_miss(tmp_path):
+    cache = ScriptCache(str(tmp_path))
+    cache.store('script', 'layout', COMPILED)
+    with open(cache.entry_path('script', 'layout'), 'wb') as file:
+        file.write(b'not a cache entry')
+    assert cache.load('script', 'layout') is None
+
+
+def test_eviction_drops_least_recently_used_entries(tmp_path):
+    cache = ScriptCache(str(tmp_path))
+    entry_size = len(COMPILED.encode('script 0', 'layout'))
+    cache.budget_bytes = entry_size * 3  # Room for three entries
+    for number in range(3):
+        cache.store(f'script {number}', 'layout', COMPILED)
+        os.utime(cache.entry_path(f'script {number}', 'layout'), (1000 + number, 1000 + number))
+    os.utime(cache.entry_path('script 0', 'layout'), (2000, 2000))  # Used again: newest
+    cache.store('script 3', 'layout', COMPILED)
+
+    assert not cache.contains('script 1', 'layout')  # Oldest
+    for number in (0, 2, 3):
+        assert cache.contains(f'script {number}', 'layout')
+    assert sum(size for _, size, _ in cache.entries()) <= cache.budget_bytes
+
+
+def test_load_marks_an_entry_as_used(tmp_path):
+    cache = ScriptCache(str(tmp_path))
+    cache.store('script', 'layout', COMPILED)
+    path = cache.entry_path('script', 'layout')
+    os.utime(path, (1000, 1000))
+    cache.load('script', 'layout')
+    assert os.path.getmtime(path) > 1000
@@ -0,0 +1,41 @@
+import json
+
+import pytest
+
+from settings_store import SettingsStore, decode_settings, DEFAULT_SETTINGS
+
+
+def load(tmp_path, data):
+    file_path = tmp_path / 'settings.json'
+    file_path.write_text(json.dumps(data), encoding='utf-8')
+    return SettingsStore(str(file_path)).load()
+
+
+@pytest.mark.parametrize('data', [
+    {'settings': 'speed=50'},
+    {'settings': [1, 2]},
+    {'settings': {}, 'presets': {'Anna': 'fast'}},
+    {'settings': {}, 'presets': ['Anna']},
+    ['settings'],
+])
+def test_malformed_file_falls_back_to_defaults(qapp, tmp_path, data):
+    settings = load(tmp_path, data)
+    assert settings['speed'] == DEFAULT_SETTINGS['speed']
+    assert settings['font_size'] == DEFAULT_SETTINGS['font_size']
+
+
+def test_values_of_the_wrong_type_fall_back_to_defaults(qapp, tmp_path):
+    settings = load(tmp_path, {'settings': {'speed': 'fast', 'font_size': 60.5, 'word_wrap': 1,
+                                            'preload_count': True, 'playlist': ['a.txt', 3],
+                                            'speed_ramp': 1, 'speed_unit': 'lines'}})
+    assert settings['speed'] == DEFAULT_SETTINGS['speed']
+    assert settings['font_size'] == DEFAULT_SETTINGS['font_size']
+    assert settings['word_wrap'] == DEFAULT_SETTINGS['word_wrap']
+    assert settings['preload_count'] == DEFAULT_SETTINGS['preload_count']
+    assert settings['playlist'] == DEFAULT_SETTINGS['playlist']
+    assert settings['speed_ramp'] == 1  # An int is a valid number of seconds
+    assert settings['speed_unit'] == 'lines'
+
+
+def test_float_speed_is_kept(qapp):
+    assert decode_settings({'speed': 52.5}) == {'speed': 52.5}
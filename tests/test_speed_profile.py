@@ -0,0 +1,117 @@
+import json
+import math
+
+import pytest
+
+from speed_profile import SpeedCurve, SpeedProfile, load_sidecar, parse_speed, section_speed, section_target
+
+
+def test_ramp_reaches_target_at_ramp_time():
+    curve = SpeedCurve(SpeedProfile.flat(100.0), 0.0, velocity=0.0, ramp=2.0)
+    assert curve.velocity_at(0.0) == 0.0
+    assert curve.velocity_at(0.5) == pytest.approx(15.625)  # Smoothstep: eases in, not linear
+    assert curve.velocity_at(1.0) == pytest.approx(50.0)  # Smoothstep is symmetric
+    assert curve.velocity_at(1.5) == pytest.approx(84.375)
+    assert curve.velocity_at(2.0) == pytest.approx(100.0)
+    assert curve.velocity_at(5.0) == pytest.approx(100.0)
+    assert curve.position_at(2.0) == pytest.approx(100.0)  # Average speed over the ramp
+    assert curve.position_at(3.0) == pytest.approx(200.0)
+
+
+def test_ramp_starts_at_section_boundary():
+    profile = SpeedProfile([0.0, 1000.0], [50.0, 100.0])
+    curve = SpeedCurve(profile, 900.0, ramp=1.0)
+    assert curve.position_at(2.0) == pytest.approx(1000.0)
+    assert curve.velocity_at(2.0) == pytest.approx(50.0)
+    assert curve.velocity_at(3.0) == pytest.approx(100.0)
+    assert curve.position_at(3.0) == pytest.approx(1075.0)
+
+
+def test_zero_ramp_switches_at_once():
+    profile = SpeedProfile([0.0, 100.0], [50.0, 100.0])
+    curve = SpeedCurve(profile, 0.0, velocity=0.0, ramp=0.0)
+    assert curve.velocity_at(0.0) == 50.0
+    assert curve.position_at(2.0) == pytest.approx(100.0)
+    assert curve.velocity_at(2.5) == 100.0
+
+
+@pytest.mark.parametrize('value', [float('nan'), float('inf'), -float('inf'), 0, -5, True, "9" * 400, "9" * 400 + "%",
+                                   "fast", "", None])
+def test_parse_speed_rejects_non_speeds(value):
+    assert parse_speed(value) is None
+
+
+def test_parse_speed_accepts_numbers_and_percentages():
+    assert parse_speed(120) == (120.0, False)
+    assert parse_speed(" 80% ") == (0.8, True)
+    assert parse_speed("2.5") == (2.5, False)
+
+
+def test_speed_tags():
+    assert section_speed("# Interview [SPEED 120]") == (120.0, False)
+    assert section_speed("[CUE] [speed: 80%]") == (0.8, True)
+    assert section_speed("[SPEED " + "9" * 400 + "]") is None
+    assert section_speed("# No tag") is None
+
+
+def test_non_finite_values_do_not_reach_the_curve():
+    profile = SpeedProfile([0.0, 100.0], [50.0, float('nan')])
+    assert profile.speeds == [50.0, 0.0]
+    curve = SpeedCurve(profile, 0.0, velocity=float('nan'), ramp=float('inf'))
+    assert curve.velocity_at(1.0) == 50.0
+    assert curve.position_at(10.0) == pytest.approx(100.0)  # Stops at the section of speed 0
+    assert all(math.isfinite(time) for time in curve.times)
+
+
+def test_sidecar_overrides_tags(tmp_path):
+    script = tmp_path / 'talk.txt'
+    script.write_text("# Intro\n# Interview [SPEED 120]\n", encoding='utf-8')
+    (tmp_path / 'talk.speeds.json').write_text(json.dumps({'sections': {'0': '90%', 'Interview': 80}}),
+                                               encoding='utf-8')
+    speeds = load_sidecar(str(script))
+    assert speeds == {'0': (0.9, True), 'interview': (80.0, False)}
+
+    def convert(speed):
+        return speed * 2  # e.g. lines to px
+
+    assert section_target(0, "Start", None, 50.0, convert, speeds) == pytest.approx(45.0)
+    assert section_target(2, "Interview [SPEED 120]", "# Interview [SPEED 120]", 50.0, convert, speeds) == 160.0
+    assert section_target(1, "Intro", "# Intro [SPEED 60]", 50.0, convert, speeds) == 120.0  # No entry: the tag
+    assert section_target(3, "Outro", "# Outro", 50.0, convert, speeds) == 50.0
+
+
+def test_missing_sidecar_is_empty(tmp_path):
+    assert load_sidecar(str(tmp_path / 'talk.txt')) == {}
+
+
+@pytest.mark.parametrize('content', ['{"sections": {"1": NaN}}', '{"sections": {"1": Infinity}}',
+                                     '{"sections": {"1": "fast"}}', '{"sections": []}', '[1, 2]', '{'])
+def test_unusable_sidecar_raises(tmp_path, content):
+    (tmp_path / 'talk.speeds.json').write_text(content, encoding='utf-8')
+    with pytest.raises(ValueError):
+        load_sidecar(str(tmp_path / 'talk.txt'))
+
+
+def test_adjacent_sections_with_the_same_speed_merge():
+    profile = SpeedProfile([0.0, 100.0, 200.0, 300.0], [50.0, 50.0, 80.0, 80.0])
+    assert profile.starts == [0.0, 200.0]
+    assert profile.speeds == [50.0, 80.0]
+    assert profile.seconds_to(300.0) == pytest.approx(4.0 + 100.0 / 80.0)
+
+
+def test_sections_at_the_same_position_keep_the_last_speed():
+    profile = SpeedProfile([0.0, 100.0, 100.0], [50.0, 60.0, 70.0])
+    assert profile.starts == [0.0, 100.0]
+    assert profile.speeds == [50.0, 70.0]
+
+
+def test_build_is_bounded_by_the_number_of_sections():
+    # Sections far shorter than a ramp: every ramp is cut short by the next one
+    starts = [index * 5.0 for index in range(200)]
+    speeds = [40.0 if index % 2 else 160.0 for index in range(200)]
+    profile = SpeedProfile(starts, speeds)
+    curve = SpeedCurve(profile, 0.0, velocity=0.0, ramp=3.0)
+    assert len(curve.times) <= 3 * len(profile.starts) + 3
+    assert curve.times == sorted(curve.times)
+    assert all(math.isfinite(velocity) for velocity in curve.velocities)
+    assert curve.position_at(curve.times[-1]) == pytest.approx(curve.positions[-1])
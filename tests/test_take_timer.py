@@ -0,0 +1,112 @@
+import pytest
+
+from take_timer import Stopwatch, TakeRecorder, format_duration
+
+TOPS = [0.0, 100.0, 200.0]  # Section starts; section 0 is before the first cue
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def locate(y):
+    section = max(index for index, top in enumerate(TOPS) if top <= y)
+    bottom = TOPS[section + 1] if section + 1 < len(TOPS) else float('inf')
+    return section, f"Section {section}", TOPS[section], bottom
+
+
+def words_at(y):
+    return y / 10  # Ten pixels per word
+
+
+def take_at(clock, frames, recorder=None):
+    # frames: (clock time, y[, jumped]) in order
+    recorder = recorder or TakeRecorder(clock)
+    recorder.start()
+    for frame in frames:
+        clock.now = frame[0]
+        recorder.observe(frame[1], locate, words_at, *frame[2:])
+    return recorder
+
+
+def test_stopwatch_keeps_partial_seconds_across_pauses():
+    clock = FakeClock()
+    watch = Stopwatch(clock)
+    watch.start()
+    clock.now = 1.25
+    watch.pause()
+    clock.now = 10.0
+    assert watch.elapsed() == 1.25
+    watch.start()
+    clock.now = 10.5
+    assert watch.elapsed() == pytest.approx(1.75)
+
+
+def test_boundary_crossed_inside_one_frame_is_interpolated():
+    clock = FakeClock()
+    recorder = take_at(clock, [(0.0, 0.0), (1.0, 50.0), (2.0, 150.0)])
+    first, second = recorder.laps
+    assert first.section == 0 and second.section == 1
+    assert first.end == pytest.approx(1.5)  # y = 100 halfway between the frames
+    assert second.start == pytest.approx(1.5)
+    assert first.end_words == pytest.approx(10)
+    assert second.start_words == pytest.approx(10)
+    assert first.words_per_minute(clock.now) == pytest.approx(10 * 60 / 1.5)
+
+
+def test_interpolation_uses_stopwatch_time_across_a_pause():
+    clock = FakeClock()
+    recorder = take_at(clock, [(0.0, 0.0), (1.0, 50.0)])
+    recorder.pause()
+    clock.now = 30.0
+    recorder.start()
+    take_at(clock, [(31.0, 150.0)], recorder)
+    assert recorder.laps[0].end == pytest.approx(1.5)
+
+
+def test_several_sections_in_one_frame():
+    clock = FakeClock()
+    recorder = take_at(clock, [(0.0, 0.0), (1.0, 50.0), (2.0, 250.0)])
+    assert [lap.section for lap in recorder.laps] == [0, 2]
+    assert recorder.laps[0].end == pytest.approx(1.75)  # Where y passed 200
+
+
+def test_scrolling_backwards_ends_the_lap_where_reading_stopped():
+    clock = FakeClock()
+    recorder = take_at(clock, [(0.0, 0.0), (1.0, 50.0), (2.0, 150.0), (3.0, 180.0), (4.0, 80.0)])
+    assert [lap.section for lap in recorder.laps] == [0, 1, 0]
+    back = recorder.laps[1]
+    assert back.end == 4.0  # Not interpolated
+    assert back.end_words == pytest.approx(18)  # Last y read in that section
+    assert recorder.laps[2].start_words == pytest.approx(8)
+
+
+def test_jump_is_not_interpolated():
+    clock = FakeClock()
+    recorder = take_at(clock, [(0.0, 0.0), (1.0, 50.0), (2.0, 150.0, True)])
+    assert recorder.laps[0].end == 2.0
+    assert recorder.laps[0].end_words == pytest.approx(5)
+
+
+def test_invalidated_layout_is_not_interpolated():
+    clock = FakeClock()
+    recorder = take_at(clock, [(0.0, 0.0), (1.0, 50.0)])
+    recorder.invalidate()
+    take_at(clock, [(2.0, 150.0)], recorder)
+    assert recorder.laps[0].end == 2.0
+
+
+def test_finish_closes_the_open_lap_and_reports():
+    clock = FakeClock()
+    recorder = take_at(clock, [(0.0, 0.0), (1.0, 50.0), (2.0, 150.0)])
+    clock.now = 3.0
+    recorder.finish(words=25)
+    assert recorder.laps[-1].end == 3.0
+    rows = recorder.report_rows()
+    assert [row[0] for row in rows] == [0, 1, '']
+    assert rows[-1][5] == 25  # 10 words in section 0, 15 in section 1
+    assert rows[-1][3] == format_duration(3.0, 3)
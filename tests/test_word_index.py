@@ -0,0 +1,113 @@
+import random
+
+import pytest
+
+from PyQt6.QtGui import QTextDocument
+
+from document_sync import patch_document
+from word_index import FenwickTree, WordIndex, count_words
+
+
+def brute_prefix(values, end):
+    return sum(values[:end])
+
+
+def test_fenwick_tree_matches_brute_force():
+    generator = random.Random(7)
+    values = [generator.randint(0, 20) for _ in range(137)]
+    tree = FenwickTree(values)
+    for _ in range(500):
+        index = generator.randrange(len(values))
+        delta = generator.randint(-values[index], 10)
+        values[index] += delta
+        tree.add(index, delta)
+        end = generator.randint(0, len(values))
+        assert tree.prefix_sum(end) == brute_prefix(values, end)
+    assert tree.total() == sum(values)
+
+
+def test_fenwick_find():
+    values = [3, 0, 5, 2]
+    tree = FenwickTree(values)
+    assert tree.find(0) == (0, 0)
+    assert tree.find(3) == (2, 0)  # The zero-width value is passed too
+    assert tree.find(4) == (2, 1)
+    assert tree.find(100) == (4, 90)
+    assert FenwickTree().find(5) == (0, 5)
+
+
+def brute_words(document):
+    words = []
+    block = document.begin()
+    while block.isValid():
+        words.append(count_words(block.text()))
+        block = block.next()
+    return words
+
+
+def brute_heights(document):
+    layout = document.documentLayout()
+    heights = []
+    block = document.begin()
+    while block.isValid():
+        heights.append(layout.blockBoundingRect(block).height())
+        block = block.next()
+    return heights
+
+
+def random_line(generator):
+    return ' '.join(generator.choice(["one", "two", "camera", "cue", "x" * 60]) for _ in range(generator.randint(0, 12)))
+
+
+def test_word_index_follows_random_edits(qapp):
+    # Edits reach the display as patch_document changes; the trees are
+    # updated from them and must equal a count over the whole document
+    generator = random.Random(11)
+    lines = [random_line(generator) for _ in range(60)]
+    document = QTextDocument()
+    document.setTextWidth(300)
+    document.setPlainText('\n'.join(lines))
+    index = WordIndex(document)
+
+    for _ in range(60):
+        position = generator.randint(0, len(lines))
+        if generator.random() < 0.5 or len(lines) < 3:
+            lines[position:position] = [random_line(generator) for _ in range(generator.randint(1, 3))]
+        elif generator.random() < 0.5:
+            del lines[position:position + generator.randint(1, 3)]
+        else:
+            lines[min(position, len(lines) - 1)] = random_line(generator)  # Same block count
+        source = QTextDocument()
+        source.setPlainText('\n'.join(lines))
+        index.apply_changes(patch_document(source, document))
+
+        words = brute_words(document)
+        heights = brute_heights(document)
+        assert index.words == words
+        assert index.heights == pytest.approx(heights)
+        for end in range(0, len(words) + 1, 7):
+            assert index.word_tree.prefix_sum(end) == sum(words[:end])
+            assert index.height_tree.prefix_sum(end) == pytest.approx(sum(heights[:end]))
+        assert index.total_words() == sum(words)
+
+
+def test_words_before_interpolates_inside_a_block(qapp):
+    document = QTextDocument()
+    document.setTextWidth(300)
+    document.setPlainText("one two\nthree four five six")
+    index = WordIndex(document)
+    second = index.block_top(1)
+    assert index.words_before(index.top) == 0
+    assert index.words_before(second) == pytest.approx(2)
+    assert index.words_before(second + index.heights[1] / 2) == pytest.approx(4)
+    assert index.words_after(index.block_top(2)) == 0
+
+
+def test_words_per_minute_inverts_pixels_per_second(qapp):
+    document = QTextDocument()
+    document.setPlainText("one two three\nfour five")
+    index = WordIndex(document)
+    assert index.words_per_minute(index.pixels_per_second(150)) == pytest.approx(150)
+    document.setPlainText("")
+    index.rebuild()
+    assert index.words_per_minute(40) is None
@@ -0,0 +1,317 @@
+import time
+from collections import OrderedDict
+
+from PyQt6.QtWidgets import QWidget, QSizePolicy
+from PyQt6.QtCore import QRectF, QTimer, Qt, pyqtSignal
+from PyQt6.QtGui import QPainter, QPixmap, QPalette, QAbstractTextDocumentLayout
+
+TILE_HEIGHT = 128
+TILE_BUDGET_MB = 128  # Tiles are oversampled, see SUBPIXEL_OVERSAMPLE
+PREFETCH_TILES = 2  # Tiles produced ahead of the bottom edge of the view
+SUBPIXEL_OVERSAMPLE = 2  # Tile pixels per device pixel, see TileCache.draw
+TILE_PADDING = 1  # Rows rendered beyond each edge of a tile for the filter
+
+
+class TileCache:
+    # Fixed-height pixmap strips of a laid-out QTextDocument. Tiles are
+    # rendered on demand and kept in LRU order under a memory budget.
+
+    def __init__(self, document, tile_height=TILE_HEIGHT, budget_mb=TILE_BUDGET_MB):
+        self.document = document
+        self.tile_height = tile_height
+        self.budget_bytes = budget_mb * 1024 * 1024
+        self.width = 0
+        self.device_pixel_ratio = 1.0
+        self.palette = QPalette()
+        self.tiles = OrderedDict()  # tile index -> QPixmap, oldest first
+        self.height_hint = None  # Known height while the document is still being laid out
+        self.document.documentLayout().update.connect(self.invalidate_rect)
+
+    def set_document(self, document):
+        self.document.documentLayout().update.disconnect(self.invalidate_rect)
+        self.document = document
+        self.document.documentLayout().update.connect(self.invalidate_rect)
+        self.invalidate()
+
+    def set_geometry(self, width, device_pixel_ratio):
+        if width != self.width or device_pixel_ratio != self.device_pixel_ratio:
+            self.width = width
+            self.device_pixel_ratio = device_pixel_ratio
+            self.invalidate()
+
+    def set_palette(self, palette):
+        self.palette = QPalette(palette)
+        self.invalidate()
+
+    def set_budget_mb(self, budget_mb):
+        self.budget_bytes = budget_mb * 1024 * 1024
+        self.enforce_budget(())
+
+    def tile_ratio(self):
+        return self.device_pixel_ratio * SUBPIXEL_OVERSAMPLE
+
+    def tile_bytes(self):
+        ratio = self.tile_ratio()
+        return int(self.width * ratio) * int((self.tile_height + 2 * TILE_PADDING) * ratio) * 4
+
+    def document_height(self):
+        if self.height_hint is not None:
+            return self.height_hint  # documentSize() would finish the layout at once
+        return self.document.documentLayout().documentSize().height()
+
+    def tile_count(self):
+        return int(self.document_height() // self.tile_height) + 1
+
+    def tile_range(self, top, height):
+        first = max(0, int(top // self.tile_height))
+        last = min(self.tile_count() - 1, int((top + height) // self.tile_height))
+        return range(first, last + 1)
+
+    def invalidate(self):
+        self.tiles.clear()
+
+    def invalidate_rect(self, rect):
+        # Relayout below a change moves everything after it, so drop from the
+        # first touched tile onwards.
+        if rect.isNull() or rect.top() <= 0:
+            self.invalidate()
+            return
+        first = int(rect.top() // self.tile_height)
+        for index in [index for index in self.tiles if index >= first]:
+            del self.tiles[index]
+
+    def tile(self, index):
+        pixmap = self.tiles.get(index)
+        if pixmap is None:
+            pixmap = self.render_tile(index)
+            self.tiles[index] = pixmap
+        else:
+            self.tiles.move_to_end(index)
+        return pixmap
+
+    def render_tile(self, index):
+        ratio = self.tile_ratio()
+        pixmap = QPixmap(int(self.width * ratio), int((self.tile_height + 2 * TILE_PADDING) * ratio))
+        pixmap.setDevicePixelRatio(ratio)
+        pixmap.fill(self.palette.color(QPalette.ColorRole.Base))
+
+        top = index * self.tile_height - TILE_PADDING
+        painter = QPainter(pixmap)
+        painter.translate(0, -top)
+        context = QAbstractTextDocumentLayout.PaintContext()
+        context.palette = self.palette
+        context.clip = QRectF(0, top, self.width, self.tile_height + 2 * TILE_PADDING)
+        self.document.documentLayout().draw(painter, context)
+        painter.end()
+        return pixmap
+
+    def draw(self, painter, top, height):
+        # The visible tiles with the document's y = top at the painter's 0.
+        # A pixmap drawn at a pure translation is snapped to whole pixels;
+        # oversampled tiles are drawn scaled down, which the raster engine
+        # filters, so a fractional top moves the text by that fraction. The
+        # filter clamps at the edge of what it draws, so each tile is drawn
+        # with its padding rows and clipped to its own rows: where tiles
+        # meet, it reads the neighbour's pixels and leaves no seam.
+        painter.save()
+        painter.setRenderHint(QPainter.RenderHint.SmoothPixmapTransform)
+        ratio = self.tile_ratio()
+        for index in self.tile_range(top, height):
+            pixmap = self.tile(index)
+            y = index * self.tile_height - top
+            width = pixmap.width() / ratio
+            painter.setClipRect(QRectF(0, y, width, self.tile_height))
+            painter.drawPixmap(QRectF(0, y - TILE_PADDING, width, self.tile_height + 2 * TILE_PADDING), pixmap,
+                               QRectF(pixmap.rect()))
+        painter.restore()
+
+    def prefetch(self, top, height, ahead=PREFETCH_TILES):
+        # Render at most one missing tile per call so the cost is spread over frames
+        visible = self.tile_range(top, height)
+        for index in range(visible.stop, min(visible.stop + ahead, self.tile_count())):
+            if index not in self.tiles:
+                self.tile(index)
+                return True
+        return False
+
+    def evict(self, top, height, ahead=PREFETCH_TILES):
+        visible = self.tile_range(top, height)
+        keep = range(visible.start, visible.stop + ahead)
+        for index in [index for index in self.tiles if index < keep.start]:
+            del self.tiles[index]  # Sudah lewat dari layar
+        self.enforce_budget(keep)
+
+    def enforce_budget(self, keep):
+        tile_bytes = self.tile_bytes()
+        if not tile_bytes:
+            return
+        for index in list(self.tiles):
+            if len(self.tiles) * tile_bytes <= self.budget_bytes:
+                break
+            if index not in keep:
+                del self.tiles[index]
+
+
+class TiledScrollView(QWidget):
+    # Scrolls a pre-rendered TileCache by drawing the visible tiles at a
+    # fractional offset instead of repainting the text on every frame.
+
+    painted = pyqtSignal()
+
+    def __init__(self, document, parent=None):
+        super().__init__(parent)
+        self.tile_cache = TileCache(document)
+        self.position = 0.0
+        self.last_paint_time = 0.0  # Seconds spent in the last paintEvent
+        self.outputs = []  # TransformedTileViews drawing from the same cache
+        self.setAttribute(Qt.WidgetAttribute.WA_OpaquePaintEvent)
+        self.setSizePolicy(QSizePolicy.Policy.Expanding, QSizePolicy.Policy.Expanding)
+        self.document().documentLayout().documentSizeChanged.connect(self.update)
+
+        self.prefetch_timer = QTimer(self)
+        self.prefetch_timer.setSingleShot(True)
+        self.prefetch_timer.timeout.connect(self.prefetch_tiles)
+
+    def document(self):
+        return self.tile_cache.document
+
+    def set_document(self, document):
+        self.document().documentLayout().documentSizeChanged.disconnect(self.update)
+        self.tile_cache.set_document(document)
+        self.document().documentLayout().documentSizeChanged.connect(self.update)
+        self.sync_text_width()
+        self.update()
+
+    def set_palette(self, palette):
+        self.tile_cache.set_palette(palette)
+        self.update()
+
+    def sync_text_width(self):
+        # A hidden view (live render mode) must not rewrap the shared document
+        if self.isVisible() and self.width() > 0 and self.document().textWidth() != self.width():
+            self.document().setTextWidth(self.width())
+        self.tile_cache.set_geometry(self.width(), self.devicePixelRatioF())
+
+    def scroll_position(self):
+        return self.position
+
+    def maximum_scroll(self):
+        return max(0, int(self.tile_cache.document_height() - self.height()))
+
+    def set_scroll_position(self, position):
+        self.position = min(max(0.0, position), self.maximum_scroll())
+        self.update()
+
+    def resizeEvent(self, event):
+        super().resizeEvent(event)
+        self.sync_text_width()
+
+    def wheelEvent(self, event):
+        self.set_scroll_position(self.position - event.angleDelta().y() / 2)
+
+    def paintEvent(self, event):
+        start = time.perf_counter()
+        self.sync_text_width()
+        cache = self.tile_cache
+        painter = QPainter(self)
+        painter.fillRect(event.rect(), cache.palette.color(QPalette.ColorRole.Base))
+        cache.draw(painter, self.position, self.height())
+        painter.end()
+        self.last_paint_time = time.perf_counter() - start
+        self.painted.emit()
+
+        cache.evict(self.position, self.covered_height())
+        self.prefetch_timer.start(0)
+
+    def covered_height(self):
+        # Document height in sight of this view or any of its outputs; they
+        # share the top, so the union of their ranges is the tallest one.
+        # Eviction and prefetch use it so a zoomed output's tiles are kept.
+        return max([self.height()] + [output.visible_height() for output in self.outputs])
+
+    def prefetch_tiles(self):
+        if self.tile_cache.prefetch(self.position, self.covered_height()):
+            self.prefetch_timer.start(0)
+
+
+class TransformedTileView(QWidget):
+    # Extra output showing the tiles of another TiledScrollView mirrored,
+    # flipped and/or scaled at paint time: an output costs a transform, not
+    # another layout of the text. The position is set by the owner, so all
+    # outputs follow one scroll clock.
+
+    painted = pyqtSignal()
+    closed = pyqtSignal(object)
+
+    def __init__(self, source, mirror=False, flip=False, scale=None, parent=None):
+        super().__init__(parent)
+        self.source = source
+        self.mirror = mirror  # Horizontal, for beam-splitter glass
+        self.flip = flip  # Vertical
+        self.scale = scale  # None: fit the text width to the window
+        self.position = 0.0
+        self.last_paint_time = 0.0
+        self.setAttribute(Qt.WidgetAttribute.WA_OpaquePaintEvent)
+        source.outputs.append(self)
+
+    def set_transform(self, mirror, flip, scale=None):
+        self.mirror = mirror
+        self.flip = flip
+        self.scale = scale
+        self.update()
+
+    def zoom(self):
+        width = self.source.tile_cache.width
+        if self.scale:
+            return self.scale
+        return self.width() / width if width > 0 else 1.0
+
+    def visible_height(self):
+        return self.height() / self.zoom()
+
+    def set_scroll_position(self, position):
+        if position != self.position:
+            self.position = position
+            self.update()
+
+    def keyPressEvent(self, event):
+        if event.key() == Qt.Key.Key_F11:
+            if self.isFullScreen():
+                self.showNormal()
+            else:
+                self.showFullScreen()
+
+    def closeEvent(self, event):
+        if self in self.source.outputs:
+            self.source.outputs.remove(self)
+        self.closed.emit(self)
+        super().closeEvent(event)
+
+    def paintEvent(self, event):
+        start = time.perf_counter()
+        cache = self.source.tile_cache
+        # In live render mode the source view is hidden and does not keep
+        # the tile geometry in step with the wrap width
+        width = cache.document.textWidth()
+        if width > 0 and width != cache.width:
+            cache.set_geometry(width, cache.device_pixel_ratio)
+
+        painter = QPainter(self)
+        painter.fillRect(event.rect(), cache.palette.color(QPalette.ColorRole.Base))
+        if self.mirror:
+            painter.translate(self.width(), 0)
+            painter.scale(-1, 1)
+        if self.flip:
+            painter.translate(0, self.height())
+            painter.scale(1, -1)
+        zoom = self.zoom()
+        painter.scale(zoom, zoom)
+        cache.draw(painter, self.position, self.visible_height())
+        painter.end()
+        self.last_paint_time = time.perf_counter() - start
+        self.painted.emit()
+
+        if not self.source.isVisible():
+            # Live render mode: the source does not paint, so it cannot evict
+            cache.evict(self.position, self.source.covered_height())
+        self.source.prefetch_timer.start(0)
@@ -0,0 +1,253 @@
+import argparse
+import multiprocessing
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+
+# Headless export of the scroll as a frame sequence, e.g.
+#   python video_export.py talk.txt --output frames/ --width 1920 --height 1080 --fps 30
+#   python video_export.py talk.txt --output - | ffmpeg -f rawvideo -pix_fmt rgb24 -s 1920x1080 -r 30 -i - talk.mp4
+# Font, speed, unit, ramp and render mode default to the stored settings,
+# section speeds come from the script and its sidecar as on the live display.
+
+FRAME_NAME = 'frame_{:06d}.png'
+CHUNK_FRAMES = 8  # Frames per task; the raw stream holds at most two chunks per worker in memory
+MAX_FRAMES = 60 * 60 * 240  # Guard against scrolls that never reach the end (4 h at 60 fps)
+
+_worker = None  # Per-process FrameRenderer, see init_worker
+
+
+def build_document(text, font, width):
+    # The display's document: plain text, the display font, wrapped at the
+    # view width with QTextDocument's default margin
+    from PyQt6.QtGui import QTextDocument
+
+    document = QTextDocument()
+    document.setDefaultFont(font)
+    document.setPlainText(text)
+    document.setTextWidth(width)
+    return document
+
+
+def decode_font(description, size):
+    from PyQt6.QtGui import QFont
+
+    font = QFont()
+    font.fromString(description)
+    font.setPointSize(size)
+    return font
+
+
+def plan_positions(document, settings, section_speeds, width, height, fps, duration=None):
+    # Scroll position of every frame, from the live ScrollEngine driven by a
+    # frame clock instead of the wall clock: frame n shows t = n / fps
+    from scroll_engine import ScrollEngine, pixels_per_second, SPEED_UNIT_WORDS
+    from speed_profile import SpeedProfile, section_target
+    from word_index import WordIndex
+    from cue_index import CueIndex, cue_title
+    from take_timer import START_SECTION_TITLE
+    from teleprompter_display import READING_LINE
+
+    word_index = WordIndex(document)
+    cue_index = CueIndex(document)
+    font = document.defaultFont()
+    unit = settings['speed_unit']
+
+    def convert(speed):
+        if unit == SPEED_UNIT_WORDS:
+            return word_index.pixels_per_second(speed)
+        return pixels_per_second(speed, unit, font)
+
+    base = convert(settings['speed'])
+    starts = [0.0]
+    speeds = [section_target(0, START_SECTION_TITLE, None, base, convert, section_speeds)]
+    for number, block in enumerate(cue_index.blocks, 1):
+        text = document.findBlockByNumber(block).text()
+        starts.append(word_index.block_top(block) - height * READING_LINE)
+        speeds.append(section_target(number, cue_title(text), text, base, convert, section_speeds))
+
+    clock = FrameClock(fps)
+    engine = ScrollEngine(clock=clock, ramp=settings['speed_ramp'])
+    engine.set_maximum(max(0, int(document.documentLayout().documentSize().height() - height)))
+    engine.set_profile(SpeedProfile(starts, speeds))
+    engine.start()
+    limit = MAX_FRAMES if duration is None else int(round(duration * fps))
+    positions = [engine.position]
+    while len(positions) < limit and not engine.at_end():
+        clock.frame += 1
+        positions.append(engine.advance())
+    return positions
+
+
+class FrameClock:
+    def __init__(self, fps):
+        self.fps = fps
+        self.frame = 0
+
+    def __call__(self):
+        return self.frame / self.fps
+
+
+class FrameRenderer:
+    # Renders frames of one laid-out script. Every worker process builds
+    # its own copy from the same text, font and width, so the layout (and
+    # with it every frame) is the same whichever process renders it.
+
+    def __init__(self, text, font_description, font_size, width, height, render_mode):
+        from PyQt6.QtGui import QGuiApplication, QPalette
+        from tiled_surface import TileCache
+
+        self.app = QGuiApplication.instance() or QGuiApplication(sys.argv[:1])
+        self.width = width
+        self.height = height
+        self.document = build_document(text, decode_font(font_description, font_size), width)
+        self.palette = QGuiApplication.palette()
+        self.background = self.palette.color(QPalette.ColorRole.Base)
+        self.tile_cache = None
+        if render_mode == 'tiled':
+            self.tile_cache = TileCache(self.document)
+            self.tile_cache.set_geometry(width, 1.0)
+            self.tile_cache.set_palette(self.palette)
+
+    def render(self, position):
+        from PyQt6.QtCore import QRectF
+        from PyQt6.QtGui import QImage, QPainter, QAbstractTextDocumentLayout
+
+        image = QImage(self.width, self.height, QImage.Format.Format_RGB32)
+        image.fill(self.background)
+        painter = QPainter(image)
+        cache = self.tile_cache
+        if cache is not None:
+            # As TiledScrollView.paintEvent: oversampled tiles at the fractional offset
+            cache.draw(painter, position, self.height)
+            cache.evict(position, self.height)
+        else:
+            # As SmoothTextEdit.paintEvent: the text itself, on whole pixels
+            top = int(position)
+            painter.translate(0, -top)
+            context = QAbstractTextDocumentLayout.PaintContext()
+            context.palette = self.palette
+            context.clip = QRectF(0, top, self.width, self.height)
+            self.document.documentLayout().draw(painter, context)
+        painter.end()
+        return image
+
+
+def rgb_bytes(image):
+    from PyQt6.QtGui import QImage
+
+    image = image.convertToFormat(QImage.Format.Format_RGB888)
+    row = image.width() * 3
+    data = image.constBits().asstring(image.sizeInBytes())
+    if image.bytesPerLine() == row:
+        return data
+    # Scanlines are padded to 4 bytes
+    stride = image.bytesPerLine()
+    return b''.join(data[y * stride:y * stride + row] for y in range(image.height()))
+
+
+def init_worker(*args):
+    global _worker
+    _worker = FrameRenderer(*args)
+
+
+def render_chunk(first, positions, directory):
+    # directory None: the frames as one block of raw RGB24
+    if directory is None:
+        return b''.join(rgb_bytes(_worker.render(position)) for position in positions)
+    for offset, position in enumerate(positions):
+        _worker.render(position).save(os.path.join(directory, FRAME_NAME.format(first + offset)), 'PNG')
+    return len(positions)
+
+
+def export_frames(text, settings, section_speeds, width, height, fps, output, workers=None, duration=None,
+                  progress=None):
+    # output: a directory for numbered PNGs, or a binary stream for raw RGB24
+    from PyQt6.QtGui import QGuiApplication
+
+    QGuiApplication.instance() or QGuiApplication(sys.argv[:1])
+    render_mode = settings.get('render_mode', 'tiled')
+    font = decode_font(settings['font'].toString(), settings['font_size'])
+    document = build_document(text, font, width)
+    positions = plan_positions(document, settings, section_speeds, width, height, fps, duration)
+
+    directory = output if isinstance(output, str) else None
+    if directory is not None:
+        os.makedirs(directory, exist_ok=True)
+    workers = max(1, workers or os.cpu_count() or 1)
+    chunks = [(first, positions[first:first + CHUNK_FRAMES]) for first in range(0, len(positions), CHUNK_FRAMES)]
+    # Spawn, not fork: a forked child would inherit this process's Qt state
+    context = multiprocessing.get_context('spawn')
+    initargs = (text, font.toString(), settings['font_size'], width, height, render_mode)
+    with ProcessPoolExecutor(workers, mp_context=context, initializer=init_worker, initargs=initargs) as pool:
+        # A bounded window of chunks in flight, collected in frame order
+        pending = []
+        done = 0
+        for first, chunk in chunks:
+            pending.append((pool.submit(render_chunk, first, chunk, directory), len(chunk)))
+            while len(pending) > workers * 2 or (pending and first + len(chunk) == len(positions)):
+                future, count = pending.pop(0)
+                result = future.result()
+                if directory is None:
+                    output.write(result)
+                done += count
+                if progress:
+                    progress(done, len(positions))
+    return len(positions)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Render the teleprompter scroll to PNG frames or raw RGB24")
+    parser.add_argument('script', help="UTF-8 text file")
+    parser.add_argument('--output', required=True, help="directory for numbered PNG frames, or - for raw RGB24 on stdout")
+    parser.add_argument('--width', type=int, default=1920)
+    parser.add_argument('--height', type=int, default=1080)
+    parser.add_argument('--fps', type=float, default=30.0)
+    parser.add_argument('--duration', type=float, help="seconds to render (default: until the end of the script)")
+    parser.add_argument('--font', help="font family (default: from the settings)")
+    parser.add_argument('--font-size', type=int)
+    parser.add_argument('--speed', type=float)
+    parser.add_argument('--speed-unit', choices=['px', 'lines', 'wpm'])
+    parser.add_argument('--ramp', type=float, help="speed ramp in seconds")
+    parser.add_argument('--render-mode', choices=['tiled', 'live'])
+    parser.add_argument('--workers', type=int, help="render processes (default: one per core)")
+    args = parser.parse_args()
+
+    from PyQt6.QtGui import QGuiApplication, QFont
+    from settings_store import SettingsStore
+    from speed_profile import load_sidecar
+
+    app = QGuiApplication(sys.argv[:1])
+    app.setApplicationName("Teleprompter")  # Same settings file as the application
+    settings = SettingsStore().load()
+    if args.font:
+        settings['font'] = QFont(args.font)
+    for key, value in (('font_size', args.font_size), ('speed', args.speed), ('speed_unit', args.speed_unit),
+                       ('speed_ramp', args.ramp), ('render_mode', args.render_mode)):
+        if value is not None:
+            settings[key] = value
+    if args.width <= 0 or args.height <= 0 or args.fps <= 0 or settings['speed'] <= 0:
+        parser.error("width, height, fps and speed must be positive")
+
+    try:
+        with open(args.script, encoding='utf-8') as file:
+            text = file.read()
+        section_speeds = load_sidecar(args.script)
+    except (OSError, UnicodeDecodeError, ValueError) as error:
+        print(f"video_export: {error}", file=sys.stderr)
+        return 1
+
+    def progress(done, total):
+        print(f"\r{done}/{total} frames", end='', file=sys.stderr, flush=True)
+
+    output = sys.stdout.buffer if args.output == '-' else args.output
+    frames = export_frames(text, settings, section_speeds, args.width, args.height, args.fps, output,
+                           args.workers, args.duration, progress)
+    print(f"\n{frames} frames of {args.width}x{args.height} at {args.fps:g} fps", file=sys.stderr)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,203 @@
+class FenwickTree:
+    # Prefix sums with O(log n) point updates and O(log n) search; the tree
+    # is 1-based internally, the public indices are 0-based.
+
+    def __init__(self, values=()):
+        self.tree = [0] + list(values)
+        size = len(self.tree)
+        for index in range(1, size):
+            parent = index + (index & -index)
+            if parent < size:
+                self.tree[parent] += self.tree[index]
+
+    def __len__(self):
+        return len(self.tree) - 1
+
+    def add(self, index, delta):
+        index += 1
+        while index < len(self.tree):
+            self.tree[index] += delta
+            index += index & -index
+
+    def prefix_sum(self, end):
+        # Sum of values [0, end)
+        total = 0
+        while end > 0:
+            total += self.tree[end]
+            end -= end & -end
+        return total
+
+    def total(self):
+        return self.prefix_sum(len(self))
+
+    def find(self, value):
+        # (count, remainder): the number of leading values whose sum stays
+        # <= value, and how far value reaches into the next one
+        index = 0
+        step = 1 << (len(self).bit_length() - 1) if len(self) else 0
+        while step:
+            candidate = index + step
+            if candidate <= len(self) and self.tree[candidate] <= value:
+                index = candidate
+                value -= self.tree[candidate]
+            step >>= 1
+        return index, value
+
+
+def count_words(text):
+    return len(text.split())
+
+
+class WordIndex:
+    # Word counts and laid-out heights per block of a QTextDocument, each in
+    # a FenwickTree, so "how many words lie above y" is two O(log n) lookups.
+    # Edits update single blocks in place; only a change in the number of
+    # blocks rebuilds the trees. Heights are re-read when the layout no
+    # longer matches them (font or wrap width changed).
+
+    def __init__(self, document=None):
+        self.document = None
+        self.words = []
+        self.heights = []
+        self.word_tree = FenwickTree()
+        self.height_tree = FenwickTree()
+        self.top = 0.0  # y of the first block (document margin)
+        self.layout_key = None
+        self.layout_pending = False  # Heights from the script cache, layout still running
+        if document is not None:
+            self.set_document(document)
+
+    def set_document(self, document):
+        self.document = document
+        self.rebuild()
+
+    def rebuild(self):
+        self.words = []
+        block = self.document.begin()
+        while block.isValid():
+            self.words.append(count_words(block.text()))
+            block = block.next()
+        self.word_tree = FenwickTree(self.words)
+        self.rebuild_heights()
+
+    def rebuild_heights(self):
+        layout = self.document.documentLayout()
+        self.heights = []
+        block = self.document.begin()
+        self.top = layout.blockBoundingRect(block).top()
+        while block.isValid():
+            self.heights.append(layout.blockBoundingRect(block).height())
+            block = block.next()
+        self.height_tree = FenwickTree(self.heights)
+        self.layout_key = self.current_layout_key()
+        self.layout_pending = False
+
+    def set_heights(self, top, heights):
+        # Heights measured elsewhere, e.g. while ProgressiveLayout walked the blocks
+        self.top = top
+        self.heights = list(heights)
+        self.height_tree = FenwickTree(self.heights)
+        self.layout_key = self.current_layout_key()
+        self.layout_pending = False
+
+    def set_compiled(self, document, words, top, heights):
+        # A document laid out elsewhere together with its counts and heights,
+        # e.g. a preloaded playlist entry
+        self.document = document
+        self.words = list(words)
+        self.word_tree = FenwickTree(self.words)
+        self.set_heights(top, heights)
+
+    def set_metrics(self, words, top, heights):
+        # Counts and heights from the script cache, before the document is
+        # laid out; refresh() leaves them alone until set_heights()
+        self.words = list(words)
+        self.word_tree = FenwickTree(self.words)
+        self.top = top
+        self.heights = list(heights)
+        self.height_tree = FenwickTree(self.heights)
+        self.layout_key = None
+        self.layout_pending = True
+
+    def current_layout_key(self):
+        layout = self.document.documentLayout()
+        return (self.document.textWidth(), self.document.defaultFont().key(),
+                round(layout.blockBoundingRect(self.document.lastBlock()).bottom()))
+
+    def refresh(self):
+        # Returns True when the heights had to be re-read
+        if self.document is None or self.layout_pending or self.current_layout_key() == self.layout_key:
+            return False
+        self.rebuild_heights()
+        return True
+
+    def apply_changes(self, changes):
+        # changes as returned by document_sync.patch_document; after the
+        # patch, the rewritten blocks are [source_start, source_end)
+        if not changes:
+            return
+        layout = self.document.documentLayout()
+        resized = False
+        for t_start, t_end, s_start, s_end in changes:
+            words = []
+            heights = []
+            block = self.document.findBlockByNumber(s_start)
+            while block.isValid() and block.blockNumber() < s_end:
+                words.append(count_words(block.text()))
+                heights.append(layout.blockBoundingRect(block).height())
+                block = block.next()
+            if t_end - t_start == s_end - s_start:
+                for offset, (count, height) in enumerate(zip(words, heights)):
+                    self.word_tree.add(s_start + offset, count - self.words[s_start + offset])
+                    self.height_tree.add(s_start + offset, height - self.heights[s_start + offset])
+            else:
+                resized = True
+            self.words[s_start:s_start + t_end - t_start] = words
+            self.heights[s_start:s_start + t_end - t_start] = heights
+        if resized:
+            self.word_tree = FenwickTree(self.words)
+            self.height_tree = FenwickTree(self.heights)
+        self.layout_key = self.current_layout_key()
+
+    def total_words(self):
+        return self.word_tree.total()
+
+    def total_height(self):
+        return self.height_tree.total()
+
+    def words_before(self, y):
+        # Words above document y, interpolated by height inside the block
+        if y <= self.top:
+            return 0
+        block, remainder = self.height_tree.find(y - self.top)
+        if block >= len(self.words):
+            return self.total_words()
+        height = self.heights[block]
+        fraction = remainder / height if height > 0 else 0.0
+        return self.word_tree.prefix_sum(block) + self.words[block] * fraction
+
+    def words_after(self, y):
+        return max(0.0, self.total_words() - self.words_before(y))
+
+    def block_top(self, block_number):
+        # Document y of a block without asking the layout for it
+        return self.top + self.height_tree.prefix_sum(min(block_number, len(self.heights)))
+
+    def block_at(self, y):
+        # Number of the block at document y
+        block, _ = self.height_tree.find(max(0.0, y - self.top))
+        return min(block, len(self.heights) - 1)
+
+    def pixels_per_second(self, words_per_minute):
+        # Average density of the whole script at the current font and width
+        words = self.total_words()
+        if not words:
+            return 0.0
+        return words_per_minute / 60 * self.total_height() / words
+
+    def words_per_minute(self, pixels_per_second):
+        # Inverse of pixels_per_second; None while the script has no words
+        height = self.total_height()
+        if not self.total_words() or not height:
+            return None
+        return pixels_per_second * 60 * self.total_words() / height